@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the llms.txt mirror tooling.
+
+Usage:
+    python bench_llms.py archive [--file path/to/export.txt] [--repeat 5]
+    python bench_llms.py pages [--file path/to/export.txt] [--repeat 5]
+    python bench_llms.py fetch [--latency 0.05] [--bandwidth 5000000] [--jobs 8]
+    python bench_llms.py pipeline [--workers 4] [--archive-codec gzip]
+    python bench_llms.py commit [--files 2000] [--size 65536]
+    python bench_llms.py index [--repeat 20]
+    python bench_llms.py vectors [--queries 200] [--nprobe 4 --nprobe 8 --nprobe 16]
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List
+
+import llms_archive
+import llms_chunks
+import llms_generation
+import llms_index
+import llms_pages
+import llms_pipeline
+import llms_stub_server
+
+HERE = Path(__file__).resolve().parent
+DEFAULT_EXPORT = HERE / "core_context_pack" / "developer-platform" / "developer-platform-llms-full.txt"
+INDEX_QUERIES = [
+    "durable objects alarms",
+    "bind a kv namespace to a worker",
+    "r2 presigned url",
+    "vectorize metadata filtering",
+    "workers ai text generation models",
+    "d1 database migrations",
+    "queues consumer batch retry",
+    "hyperdrive connection pooling postgres",
+    "cloudflare workers",
+    "wrangler toml configuration environment variables",
+]
+
+
+def timed(fn: Callable[[], object], repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def fmt_ms(samples: List[float]) -> str:
+    return f"p50={statistics.median(samples) * 1000:8.1f}ms  max={max(samples) * 1000:8.1f}ms"
+
+
+def bench_archive(args) -> None:
+    src = Path(args.file)
+    original = src.stat().st_size
+    print(f"archive benchmark: {src} ({original:,} bytes, repeat={args.repeat})")
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        for codec in llms_archive.available_codecs():
+            work = tmp_dir / codec
+            work.mkdir()
+            current = work / src.name
+            shutil.copyfile(src, current)
+
+            start = time.perf_counter()
+            archived = llms_archive.archive_existing(current, work / "_archive", codec)
+            archive_s = time.perf_counter() - start
+
+            size = archived.stat().st_size
+            restore = timed(lambda: llms_archive.read_version(archived), args.repeat)
+            print(
+                f"  {codec:<5} size={size:>11,}  ratio={size / original:6.3f}  "
+                f"archive={archive_s * 1000:8.1f}ms  reconstruct {fmt_ms(restore)}"
+            )
+
+
+def bench_pages(args) -> None:
+    src = Path(args.file)
+    size = src.stat().st_size
+    counts = []
+
+    def parse():
+        n = 0
+        for _ in llms_pages.iter_file_pages(src):
+            n += 1
+        counts.append(n)
+
+    samples = timed(parse, args.repeat)
+    best = min(samples)
+    print(f"page parser benchmark: {src} ({size:,} bytes, repeat={args.repeat})")
+    print(
+        f"  pages={counts[0]}  {fmt_ms(samples)}  "
+        f"throughput={size / best / 1e6:7.1f} MB/s  {counts[0] / best:9.0f} pages/s"
+    )
+
+
+def run_downloader(base: Path, origin: str, extra: List[str]) -> dict:
+    """Run download_llms_txt.py in a child process; returns wall time and the child's peak RSS."""
+    cmd = [sys.executable, str(HERE / "download_llms_txt.py"), "--base", str(base), "--origin", origin, *extra]
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    output = proc.stdout.read()
+    _, status, usage = os.wait4(proc.pid, 0)
+    wall = time.perf_counter() - start
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    if proc.returncode != 0:
+        raise RuntimeError(f"downloader failed ({proc.returncode}):\n{output.decode(errors='replace')}")
+    # ru_maxrss is KiB on Linux
+    return {"wall": wall, "rss_mb": usage.ru_maxrss / 1024, "output": output.decode(errors="replace")}
+
+
+def edit_one_page(server: "llms_stub_server.StubServer") -> Path:
+    """Append a line to the first page body of the workers export the stub serves."""
+    path = server.routes["/workers/llms-full.txt"].path
+    data = path.read_bytes()
+    cut = data.index(b"</page>")
+    path.write_bytes(data[:cut] + b"Benchmark edit.\n" + data[cut:])
+    return path
+
+
+def bench_fetch(args) -> None:
+    extra = ["--jobs", str(args.jobs), "--per-host", str(args.per_host)]
+    for category in args.category:
+        extra += ["--category", category]
+    faults = llms_stub_server.Faults(latency=args.latency, bandwidth=args.bandwidth)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        root = tmp_dir / "origin"
+        print(f"fetch benchmark: copying corpus to {root}")
+        shutil.copytree(HERE, root, ignore=shutil.ignore_patterns("*.py", "__pycache__", "_*", ".*"))
+        server = llms_stub_server.serve(root, faults=faults)
+        base = tmp_dir / "mirror"
+        print(f"  stub {server.origin} latency={args.latency}s bandwidth={args.bandwidth or 'unlimited'} B/s  {' '.join(extra)}")
+
+        scenarios = [
+            ("full-refresh", []),
+            ("no-change", []),
+            ("no-change --revalidate", ["--revalidate"]),
+            ("single-page --revalidate", ["--revalidate"]),
+        ]
+        try:
+            for name, flags in scenarios:
+                if name.startswith("single-page"):
+                    edit_one_page(server)
+                    server.reload()
+                before = server.stats()
+                result = run_downloader(base, server.origin, extra + flags)
+                after = server.stats()
+                summary = next(line for line in result["output"].splitlines() if line.startswith("Done."))
+                print(
+                    f"  {name:<26} wall={result['wall']:6.2f}s  "
+                    f"bytes={after['bytes_sent'] - before['bytes_sent']:>11,}  "
+                    f"requests={after['requests'] - before['requests']:>3}  "
+                    f"304={after['not_modified'] - before['not_modified']:>3}  "
+                    f"peak_rss={result['rss_mb']:6.1f}MB  | {summary}"
+                )
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+def bench_pipeline(args) -> None:
+    workers = [1] + [w for w in args.workers or [llms_pipeline.CPU_COUNT] if w > 1]
+    codec = args.archive_codec
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        root = tmp_dir / "origin"
+        print(f"pipeline benchmark ({os.cpu_count()} CPUs): copying corpus to {root}")
+        shutil.copytree(HERE, root, ignore=shutil.ignore_patterns("*.py", "__pycache__", "_*", ".*"))
+        server = llms_stub_server.serve(root)
+        baseline: dict = {}
+        try:
+            for n in workers:
+                base = tmp_dir / f"mirror-{n}"
+                flags = ["--workers", str(n)]
+                timings = {
+                    "full-refresh": run_downloader(base, server.origin, flags)["wall"],
+                    f"--force ({codec})": run_downloader(base, server.origin, flags + ["--force", "--archive-codec", codec])["wall"],
+                }
+                start = time.perf_counter()
+                llms_chunks.build_chunks(HERE, tmp_dir / f"chunks-{n}.jsonl", full=True, workers=n)
+                timings["chunk --full"] = time.perf_counter() - start
+                baseline = baseline or timings
+                print(
+                    f"  workers={n:<3} "
+                    + "  ".join(f"{name}={t:6.2f}s (x{baseline[name] / t:4.2f})" for name, t in timings.items())
+                )
+        finally:
+            server.shutdown()
+            server.server_close()
+        outputs = [(tmp_dir / f"chunks-{n}.jsonl").read_bytes() for n in workers]
+        print(f"  chunk output identical across worker counts: {all(o == outputs[0] for o in outputs)}")
+
+
+def synthetic_tree(base: Path, files: int, size: int) -> List[Path]:
+    """files exports of size bytes spread over 10 categories x 20 services, as a large refresh would touch."""
+    paths = []
+    for i in range(files):
+        path = base / f"category-{i % 10}" / f"service-{i // 10 % 20}" / f"export-{i}.txt"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(os.urandom(size))
+        paths.append(path)
+    return paths
+
+
+def bench_commit(args) -> None:
+    """Write every file of a synthetic tree once per strategy; the tree (and its page cache) is shared."""
+    with tempfile.TemporaryDirectory(dir=args.dir or None) as tmp:
+        base = Path(tmp)
+        paths = synthetic_tree(base, args.files, args.size)
+        data = os.urandom(args.size)
+        print(f"commit benchmark: {args.files} files x {args.size:,} bytes in {base}")
+
+        def in_place():
+            for path in paths:
+                path.write_bytes(data)
+
+        def per_file_fsync():
+            for path in paths:
+                tmp_path = path.with_name(path.name + ".tmp")
+                with tmp_path.open("wb") as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                tmp_path.replace(path)
+                llms_generation.fsync_path(path.parent)
+
+        def batch(durable: bool, keep: int) -> Callable[[], object]:
+            def run():
+                b = llms_generation.Batch(base, durable=durable)
+                for path in paths:
+                    b.stage(path).write_bytes(data)
+                b.commit(keep)
+                for phase, t in b.timings.items():
+                    run.timings[phase] = run.timings.get(phase, 0.0) + t
+
+            run.timings = {}
+            return run
+
+        strategies = [
+            ("in place (no fsync)", in_place),
+            ("tmp+fsync+rename per file", per_file_fsync),
+            ("batch, no fsync", batch(False, 0)),
+            ("batch, fsync", batch(True, 0)),
+            (f"batch, fsync + snapshot (keep {llms_generation.DEFAULT_KEEP})", batch(True, llms_generation.DEFAULT_KEEP)),
+        ]
+        for name, fn in strategies:
+            samples = timed(fn, args.repeat)
+            phases = "  ".join(f"{k}={v / args.repeat * 1000:.1f}ms" for k, v in getattr(fn, "timings", {}).items())
+            print(f"  {name:<38} {fmt_ms(samples)}  per file={statistics.median(samples) / args.files * 1e6:7.1f}us  {phases}")
+
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def bench_index(args) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / llms_index.INDEX_NAME
+        stats = llms_index.build_index(HERE, path)
+        print(f"BM25 index benchmark: {stats['docs']} pages, {stats['terms']} terms")
+        print(
+            f"  build={stats['seconds']:6.2f}s  index={stats['index_bytes']:>11,} bytes  "
+            f"postings={stats['postings_bytes']:>11,}  pages={stats['source_bytes']:>11,} bytes  "
+            f"ratio={stats['index_bytes'] / stats['source_bytes']:6.3f}"
+        )
+        open_s = timed(lambda: llms_index.BM25Index(path).close(), args.repeat)
+        print(f"  open   {fmt_ms(open_s)}")
+        with llms_index.BM25Index(path) as index:
+            samples = []
+            for query in INDEX_QUERIES:
+                samples += timed(lambda: index.search(query, args.k), args.repeat)
+        print(
+            f"  query  {fmt_ms(samples)}  p99={percentile(samples, 0.99) * 1000:6.2f}ms  "
+            f"({len(INDEX_QUERIES)} queries x {args.repeat}, k={args.k})"
+        )
+
+
+def bench_vectors(args) -> None:
+    # NumPy is only needed here, so the other benchmarks run without it
+    import numpy as np
+
+    import llms_vectors
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        chunks = tmp_dir / llms_chunks.CHUNKS_NAME
+        llms_chunks.build_chunks(HERE, chunks)
+        stats = llms_vectors.build_vectors(HERE, chunks, tmp_dir / "vectors", args.dim or llms_vectors.DEFAULT_DIM)
+        print(f"vector index benchmark: {stats['chunks']} chunks, {stats['vocab']} terms -> {stats['dim']} dims")
+        print(
+            f"  build={stats['seconds']:6.2f}s (embed {stats['embed_seconds']:.2f}s)  "
+            f"nlist={stats['nlist']}  index={stats['index_bytes']:>11,} bytes"
+        )
+
+        index = llms_vectors.VectorIndex(tmp_dir / "vectors")
+        # Fixed queries plus the opening words of a sample of chunks
+        rng = np.random.default_rng(0)
+        records = list(llms_vectors.iter_chunk_records(chunks))
+        sample = rng.choice(len(records), min(args.queries, len(records)), replace=False)
+        queries = INDEX_QUERIES + [" ".join(records[i]["text"].split()[:12]) for i in sample]
+        embedded = [index.embed(q) for q in queries]
+        embed_s = timed(lambda: [index.embed(q) for q in queries], 1)[0] / len(queries)
+
+        exact = [{p for _, p in index.brute_force(v, args.k)} for v in embedded]
+        brute = [t for v in embedded for t in timed(lambda: index.brute_force(v, args.k), 1)]
+        print(
+            f"  embed  {embed_s * 1000:6.2f}ms/query   brute-force p50={percentile(brute, 0.5) * 1000:6.2f}ms  "
+            f"p99={percentile(brute, 0.99) * 1000:6.2f}ms  ({len(queries)} queries, k={args.k})"
+        )
+        for nprobe in args.nprobe or [1, 4, 8, 16, 32]:
+            samples = []
+            found = 0
+            for v, truth in zip(embedded, exact):
+                samples += timed(lambda: index.search_vector(v, args.k, nprobe), 1)
+                found += len(truth & {p for _, p in index.search_vector(v, args.k, nprobe)})
+            total = sum(len(t) for t in exact)
+            print(
+                f"  nprobe={nprobe:<3} p50={percentile(samples, 0.5) * 1000:6.2f}ms  "
+                f"p99={percentile(samples, 0.99) * 1000:6.2f}ms  recall@{args.k}={found / total:6.3f}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks for the llms.txt mirror tooling.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_archive = sub.add_parser("archive", help="Archive size and reconstruction latency per codec")
+    p_archive.add_argument("--file", default=str(DEFAULT_EXPORT), help="Export to archive (default: developer-platform)")
+    p_archive.add_argument("--repeat", type=int, default=5)
+    p_archive.set_defaults(func=bench_archive)
+
+    p_pages = sub.add_parser("pages", help="Streaming <page> parser throughput")
+    p_pages.add_argument("--file", default=str(DEFAULT_EXPORT), help="Export to parse (default: developer-platform)")
+    p_pages.add_argument("--repeat", type=int, default=5)
+    p_pages.set_defaults(func=bench_pages)
+
+    p_fetch = sub.add_parser("fetch", help="Downloader runs against a local stub: full, no-change, single-page change")
+    p_fetch.add_argument("--latency", type=float, default=0.0, help="Stub TTFB in seconds")
+    p_fetch.add_argument("--bandwidth", type=int, default=0, help="Stub per-response throttle in bytes/second")
+    p_fetch.add_argument("--jobs", type=int, default=8)
+    p_fetch.add_argument("--per-host", type=int, default=6)
+    p_fetch.add_argument("--category", action="append", default=[], help="Limit to a category (repeatable)")
+    p_fetch.set_defaults(func=bench_fetch)
+
+    p_pipeline = sub.add_parser("pipeline", help="Process-pool speed-up of the CPU stages (downloader rebuild, chunking)")
+    p_pipeline.add_argument("--workers", type=int, action="append", default=[], help="Worker counts to compare with 1 (repeatable)")
+    p_pipeline.add_argument("--archive-codec", choices=llms_archive.available_codecs(), default="gzip")
+    p_pipeline.set_defaults(func=bench_pipeline)
+
+    p_commit = sub.add_parser("commit", help="Cost of committing a large refresh: in place, per-file fsync, batched generations")
+    p_commit.add_argument("--files", type=int, default=2000)
+    p_commit.add_argument("--size", type=int, default=64 * 1024, help="Bytes per file")
+    p_commit.add_argument("--repeat", type=int, default=3)
+    p_commit.add_argument("--dir", default="", help="Where to build the tree (default: the temp dir; use a real disk)")
+    p_commit.set_defaults(func=bench_commit)
+
+    p_index = sub.add_parser("index", help="BM25 index build time, size and query latency")
+    p_index.add_argument("--repeat", type=int, default=20)
+    p_index.add_argument("-k", type=int, default=10)
+    p_index.set_defaults(func=bench_index)
+
+    p_vectors = sub.add_parser("vectors", help="Vector index build time, size, IVF latency and recall vs brute force")
+    p_vectors.add_argument("--dim", type=int, default=0, help="Embedding dimensions (default: llms_vectors.DEFAULT_DIM)")
+    p_vectors.add_argument("--queries", type=int, default=200, help="Chunk-derived queries on top of the fixed set")
+    p_vectors.add_argument("--nprobe", type=int, action="append", default=[], help="IVF lists to scan (repeatable)")
+    p_vectors.add_argument("-k", type=int, default=10)
+    p_vectors.set_defaults(func=bench_vectors)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,39 @@
 #!/usr/bin/env python3
 import argparse
-import hashlib
+import asyncio
+import io
 import os
-import re
-from datetime import datetime, timezone
+import shutil
+import signal
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, NamedTuple, Optional, Tuple
 from urllib.parse import urlparse
 
 import requests
 
+from llms_archive import DEFAULT_CODEC, available_codecs, list_versions, open_version, try_archive
+from llms_changes import diff_pages, index_pages, needs_sync, summarize, write_feed
+from llms_discover import DISCOVERY_CACHE, discover, fetch_llms_index, merge_category_maps
+from llms_fetch import DEFAULT_JOBS, DEFAULT_PER_HOST, CircuitBreaker, Fetched, RetryPolicy, fetch_all
+from llms_fts import DB_NAME as DOCS_DB_NAME
+from llms_fts import sync as sync_docs_db
+from llms_generation import DEFAULT_KEEP, Batch, current_generation
+from llms_header import CONTENT_SHA_KEY, artifact_description, build_header, parse_header, read_header
+from llms_index import build_index, index_path
+from llms_lock import mirror_lock
+from llms_manifest import MANIFEST_NAME, ArchiveRecord, FileRecord, Manifest
+from llms_objects import OBJECTS_DIR, link_object, store_object, sweep_objects, write_composed
+from llms_metrics import METRICS_DIR, PROFILE_NAME, RunMetrics, format_span, metrics_dir, profiled, write_metrics
+from llms_packed import available_codecs as packed_codecs
+from llms_packed import write_packed
+from llms_pipeline import DEFAULT_WORKERS, ordered_map, workers_arg
+from llms_watch import DEFAULT_INTERVAL, DEFAULT_JITTER, WATCH_STATE, Schedule, parse_intervals, watch_loop
+
 # -----------------------
 # Category → URLs mapping
 # -----------------------
@@ -72,17 +96,16 @@ BY_CATEGORY: Dict[str, List[str]] = {
     ],
 }
 
-ARTIFACT_DESCRIPTIONS = {
-    "llms-full": "LLM-optimized full context export of the docs",
-    "llms": "LLM-optimized brief context export",
-    "prompt": "Base prompt template for Workers docs",
-}
-
-HEADER_START = "# --- METADATA ---"
-HEADER_END = "# --- END METADATA ---"
-CONTENT_SHA_KEY = "Content-SHA256"
+class WritePlan(NamedTuple):
+    """A (category, URL) whose fetched body will replace the current file."""
 
-USER_AGENT = "CF-Docs-Fetcher/1.0 (+local script)"
+    category: str
+    url: str
+    service: str
+    artifact: str
+    current_path: Path
+    result: Fetched
+    prev_sha: str
 
 
 def now_iso_with_tz() -> str:
@@ -90,10 +113,6 @@ def now_iso_with_tz() -> str:
     return datetime.now().astimezone().isoformat()
 
 
-def sha256_text(text: str) -> str:
-    return hashlib.sha256(text.encode("utf-8")).hexdigest()
-
-
 def parse_url(url: str) -> Tuple[str, str]:
     """
     Returns (service, artifact) for naming.
@@ -112,72 +131,96 @@ def parse_url(url: str) -> Tuple[str, str]:
     return service, artifact
 
 
-def service_title(service: str) -> str:
-    if service == "root":
-        return "Developers (root)"
-    return service.replace("-", " ").title()
-
-
-def artifact_description(artifact: str) -> str:
-    return ARTIFACT_DESCRIPTIONS.get(artifact, artifact.replace("-", " ").title())
-
-
-def build_header(
-    url: str,
-    category: str,
-    service: str,
-    artifact: str,
-    retrieved_at: str,
-    content_sha: str,
-    last_modified: str = "",
-    etag: str = "",
-) -> str:
-    lines = [
-        HEADER_START,
-        f"# Source-URL: {url}",
-        f"# Category: {category}",
-        f"# Service: {service} ({service_title(service)})",
-        f"# Artifact: {artifact} — {artifact_description(artifact)}",
-        f"# Retrieved-At: {retrieved_at}",
-        f"# {CONTENT_SHA_KEY}: {content_sha}",
-    ]
-    if last_modified:
-        lines.append(f"# HTTP-Last-Modified: {last_modified}")
-    if etag:
-        lines.append(f"# HTTP-ETag: {etag}")
-    lines.append(HEADER_END)
-    return "\n".join(lines) + "\n\n"
-
-
-def extract_prev_content_sha(file_path: Path) -> str:
-    if not file_path.exists():
-        return ""
-    try:
-        with file_path.open("r", encoding="utf-8") as f:
-            for line in f:
-                if HEADER_END in line:
-                    # Stop after header area if present
-                    break
-                if CONTENT_SHA_KEY in line:
-                    m = re.search(rf"{CONTENT_SHA_KEY}:\s*([0-9a-fA-F]+)", line)
-                    if m:
-                        return m.group(1)
-    except Exception:
-        pass
-    return ""
+def record_from_header(manifest: Manifest, path: Path, category: str) -> Optional[FileRecord]:
+    """Backfill a manifest record by scraping an existing file's metadata header."""
+    fields, body_offset = read_header(path)
+    url = fields.get("Source-URL", "")
+    if not fields.get(CONTENT_SHA_KEY) or not url:
+        return None
+    service, artifact = parse_url(url)
+    st = path.stat()
+    return FileRecord(
+        path=manifest.relpath(path),
+        category=category,
+        service=service,
+        artifact=artifact,
+        url=url,
+        content_sha=fields[CONTENT_SHA_KEY],
+        etag=fields.get("HTTP-ETag", ""),
+        last_modified=fields.get("HTTP-Last-Modified", ""),
+        retrieved_at=fields.get("Retrieved-At", ""),
+        body_offset=body_offset,
+        size=st.st_size - body_offset,
+        mtime_ns=st.st_mtime_ns,
+    )
 
 
-def archive_existing(current_path: Path, archive_dir: Path) -> None:
-    archive_dir.mkdir(parents=True, exist_ok=True)
-    ts = datetime.now().astimezone().strftime("%Y%m%d-%H%M%S%z")
-    archived = archive_dir / f"{current_path.stem}.{ts}{current_path.suffix}"
-    current_path.replace(archived)
+def current_record(manifest: Manifest, path: Path, category: str) -> Optional[FileRecord]:
+    """Indexed manifest lookup; falls back to the file header (and backfills) when the row is missing or stale."""
+    record = manifest.current(path)
+    if record is None and path.exists():
+        record = record_from_header(manifest, path, category)
+        if record is not None:
+            manifest.upsert(record)
+    return record
 
 
-def fetch_text(session: requests.Session, url: str) -> Tuple[str, dict]:
-    resp = session.get(url, timeout=20)
-    resp.raise_for_status()
-    return resp.text, resp.headers
+def rebuild_manifest(manifest: Manifest, categories: List[str]) -> Tuple[int, int]:
+    """Backfill the manifest from the headers of existing files and their _archive/ versions."""
+    files = archives = 0
+    for category in categories:
+        cat_dir = manifest.base_dir / category
+        if not cat_dir.is_dir():
+            continue
+        for path in sorted(cat_dir.glob("*/*.txt")):
+            record = record_from_header(manifest, path, category)
+            if record is None:
+                print(f"[warn] no metadata header: {path}")
+                continue
+            manifest.upsert(record)
+            files += 1
+            for version in list_versions(path):
+                with open_version(version.path) as f:
+                    fields, _ = parse_header(io.BytesIO(f.read(8192)))
+                manifest.add_archive(
+                    ArchiveRecord(
+                        archived_path=manifest.relpath(version.path),
+                        path=record.path,
+                        content_sha=fields.get(CONTENT_SHA_KEY, ""),
+                        archived_at=version.archived_at.isoformat(),
+                    )
+                )
+                archives += 1
+    # Drop rows whose files are gone
+    for record in list(manifest.files()):
+        if not (manifest.base_dir / record.path).exists():
+            manifest.delete(manifest.base_dir / record.path)
+    return files, archives
+
+
+def target_path(base_dir: Path, category: str, url: str) -> Path:
+    service, artifact = parse_url(url)
+    filename = f"{service}-{artifact}.txt" if service != "root" else f"{artifact}.txt"
+    return base_dir / category / service / filename
+
+
+def conditional_headers(records: List[Optional[FileRecord]]) -> Tuple[Dict[str, str], int]:
+    """
+    Build If-None-Match / If-Modified-Since from the validators stored for the
+    existing copies of one URL. Only safe when every copy exists and holds the
+    same content, since a 304 skips all of them.
+    Returns (request headers, stored body size); empty headers mean "fetch normally".
+    """
+    if not records or any(r is None for r in records):
+        return {}, 0
+    if len({r.content_sha for r in records}) != 1:
+        return {}, 0
+    validators: Dict[str, str] = {}
+    if records[0].etag:
+        validators["If-None-Match"] = records[0].etag
+    if records[0].last_modified:
+        validators["If-Modified-Since"] = records[0].last_modified
+    return validators, records[0].size
 
 
 def dedupe_preserve_order(items: List[str]) -> List[str]:
@@ -195,94 +238,485 @@ def main():
     parser.add_argument("--base", default="cloudflare_docs", help="Base folder to store docs (default: cloudflare_docs)")
     parser.add_argument("--category", action="append", default=[], help="Category to process (can be repeated). Defaults to all.")
     parser.add_argument("--force", action="store_true", help="Write even if content hash unchanged (still archives old).")
+    parser.add_argument("--jobs", type=int, default=DEFAULT_JOBS, help=f"Max concurrent downloads (default: {DEFAULT_JOBS})")
+    parser.add_argument(
+        "--per-host", type=int, default=DEFAULT_PER_HOST, help=f"Max concurrent downloads per host (default: {DEFAULT_PER_HOST})"
+    )
+    parser.add_argument(
+        "--retries", type=int, default=RetryPolicy().attempts - 1, help="Retries per URL on transient errors (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=workers_arg,
+        default=DEFAULT_WORKERS,
+        help=f"Processes for archive compression and page hashing; 0 = one per CPU (default: {DEFAULT_WORKERS})",
+    )
+    parser.add_argument("--timeout", type=float, default=RetryPolicy().timeout, help="Per-request timeout in seconds")
+    parser.add_argument(
+        "--origin",
+        default="",
+        help="Fetch from this scheme://host (e.g. a local mirror) instead of the URLs' own; metadata keeps the real URL.",
+    )
+    parser.add_argument(
+        "--discover",
+        action="store_true",
+        help=f"Add exports discovered from the root llms.txt to BY_CATEGORY (cached in {DISCOVERY_CACHE}).",
+    )
+    parser.add_argument("--refresh-discovery", action="store_true", help="Re-probe discovery even if llms.txt is unchanged.")
+    parser.add_argument(
+        "--revalidate",
+        action="store_true",
+        help="Send stored HTTP-ETag/HTTP-Last-Modified as conditional GETs; a 304 skips the URL without downloading it.",
+    )
+    parser.add_argument(
+        "--object-store",
+        action="store_true",
+        help=f"Store each distinct body once under {OBJECTS_DIR}/ (keyed by {CONTENT_SHA_KEY}) and hardlink every category to it.",
+    )
+    parser.add_argument(
+        "--archive-codec",
+        choices=available_codecs(),
+        default=DEFAULT_CODEC,
+        help=f"Compression for versions moved into _archive/ (default: {DEFAULT_CODEC})",
+    )
+    parser.add_argument(
+        "--keep-generations",
+        type=int,
+        default=DEFAULT_KEEP,
+        metavar="N",
+        help=f"Committed generations to keep as snapshots readers can pin (llms_generation.py; 0 = none, default: {DEFAULT_KEEP})",
+    )
+    parser.add_argument(
+        "--no-fsync",
+        action="store_true",
+        help="Skip the fsyncs of the commit (faster on throwaway mirrors; a crash can then lose the last run).",
+    )
+    parser.add_argument(
+        "--packed",
+        default="",
+        metavar="PATH",
+        help="Write the processed categories as one packed corpus file (see llms_packed.py) after runs that changed pages.",
+    )
+    parser.add_argument(
+        "--packed-codec",
+        choices=packed_codecs(),
+        default="none",
+        help="Per-page compression for --packed (default: none, pages are served zero-copy)",
+    )
+    parser.add_argument(
+        "--fts",
+        action="store_true",
+        help=f"Sync the SQLite FTS5 docs database ({DOCS_DB_NAME}, see llms_fts.py) after runs that changed pages.",
+    )
+    parser.add_argument(
+        "--metrics-dir",
+        default="",
+        help=f"Where to write per-run metrics (JSON + Prometheus textfile; default: <base>/{METRICS_DIR})",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Run under cProfile; print the hottest functions and save the stats next to the metrics.",
+    )
+    parser.add_argument(
+        "--reindex",
+        action="store_true",
+        help="Rebuild the BM25 search index (llms_index.py) after runs that changed pages.",
+    )
+    parser.add_argument(
+        "--on-change",
+        action="append",
+        default=[],
+        metavar="CMD",
+        help="Shell command to run after runs that changed pages; gets LLMS_BASE, LLMS_CHANGES (the feed) and LLMS_GENERATION. Repeatable.",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help=f"Keep running and refresh each category on its interval (implies --revalidate; schedule in {WATCH_STATE}).",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=DEFAULT_INTERVAL,
+        help=f"--watch: seconds between refreshes of a category (default: {DEFAULT_INTERVAL:.0f})",
+    )
+    parser.add_argument(
+        "--category-interval",
+        action="append",
+        default=[],
+        metavar="CATEGORY=SECONDS",
+        help="--watch: per-category interval override (repeatable)",
+    )
+    parser.add_argument(
+        "--jitter",
+        type=float,
+        default=DEFAULT_JITTER,
+        help=f"--watch: randomise each interval by +/- this fraction (default: {DEFAULT_JITTER})",
+    )
+    parser.add_argument(
+        "--rebuild-manifest",
+        action="store_true",
+        help=f"Backfill {MANIFEST_NAME} from the headers of existing files and archives, then exit.",
+    )
     args = parser.parse_args()
+    if args.jobs < 1 or args.per_host < 1:
+        parser.error("--jobs and --per-host must be >= 1")
+    if args.keep_generations < 0:
+        parser.error("--keep-generations must be >= 0")
+    if args.retries < 0:
+        parser.error("--retries must be >= 0")
+    if args.revalidate and args.force:
+        parser.error("--revalidate and --force are mutually exclusive")
+    if args.watch:
+        if args.force or args.rebuild_manifest:
+            parser.error("--watch can't be combined with --force or --rebuild-manifest")
+        if args.interval <= 0 or not 0 <= args.jitter < 1:
+            parser.error("--interval must be > 0 and --jitter in [0, 1)")
+        try:
+            parse_intervals(args.category_interval)
+        except ValueError as e:
+            parser.error(f"--category-interval: {e}")
+        args.revalidate = True
 
     base_dir = Path(args.base)
     base_dir.mkdir(parents=True, exist_ok=True)
 
-    categories = args.category or list(BY_CATEGORY.keys())
-
-    # Build a cache so repeated URLs (across categories) fetch once
-    url_cache: Dict[str, Tuple[str, dict]] = {}
-    session = requests.Session()
-    session.headers.update({"User-Agent": USER_AGENT})
+    manifest = Manifest(base_dir)
+    try:
+        if args.watch:
+            # Locks per refresh, so llms_gc.py can run between them
+            watch(args, base_dir, manifest)
+            return
+        with mirror_lock(base_dir, "download_llms_txt.py"):
+            if args.rebuild_manifest:
+                existing = args.category or sorted(
+                    d.name for d in base_dir.iterdir() if d.is_dir() and not d.name.startswith(("_", "."))
+                )
+                files, archives = rebuild_manifest(manifest, existing)
+                manifest.commit()
+                print(f"Rebuilt {manifest.path}: files={files}, archives={archives}")
+            elif args.profile:
+                out_dir = Path(args.metrics_dir) if args.metrics_dir else metrics_dir(base_dir)
+                with profiled(out_dir / PROFILE_NAME):
+                    run(args, base_dir, manifest)
+            else:
+                run(args, base_dir, manifest)
+    finally:
+        manifest.close()
+
+
+def run(
+    args: argparse.Namespace, base_dir: Path, manifest: Manifest, executor: Optional[ThreadPoolExecutor] = None
+) -> Dict[str, object]:
+    """One refresh of args.category (all if empty); returns the categories processed and the change count."""
+    run_at = datetime.now().astimezone()
+    metrics = RunMetrics()
+    by_category = BY_CATEGORY
+    if args.discover:
+        try:
+            discovered = discover(
+                fetch_llms_index(args.origin, args.timeout),
+                BY_CATEGORY,
+                cache_path=base_dir / DISCOVERY_CACHE,
+                refresh=args.refresh_discovery,
+                jobs=args.jobs,
+                per_host=args.per_host,
+                origin=args.origin,
+            )
+            by_category = merge_category_maps(BY_CATEGORY, discovered)
+            print(f"[discover] {sum(len(u) for u in discovered.values())} extra exports in {len(discovered)} categories")
+        except requests.RequestException as e:
+            print(f"[warn] discovery failed, using BY_CATEGORY only: {e}")
+    categories = args.category or list(by_category.keys())
+
+    # Fetch every distinct URL (across categories) once, concurrently
+    all_urls = dedupe_preserve_order([u for c in categories for u in by_category.get(c, [])])
+
+    validators: Dict[str, Dict[str, str]] = {}
+    stored_sizes: Dict[str, int] = {}
+    if args.revalidate:
+        for url in all_urls:
+            records = [
+                current_record(manifest, target_path(base_dir, c, url), c)
+                for c in categories
+                if url in by_category.get(c, [])
+            ]
+            headers, body_size = conditional_headers(records)
+            if headers:
+                validators[url] = headers
+                stored_sizes[url] = body_size
 
     total_downloaded = 0
     total_skipped = 0
     total_archived = 0
+    total_not_modified = 0
+    bytes_saved = 0
+
+    metrics.lap("setup")
+    # Bodies are spooled to disk and referenced by path; nothing holds them in memory
+    spool_dir = Path(tempfile.mkdtemp(prefix=".fetch-", dir=base_dir))
+    batch = Batch(base_dir, durable=not args.no_fsync)
+    if batch.cleared:
+        print(f"[commit] cleared {batch.cleared} staged files left by an interrupted run")
+    try:
+        url_cache = asyncio.run(
+            fetch_all(
+                all_urls,
+                spool_dir,
+                jobs=args.jobs,
+                per_host=args.per_host,
+                request_headers=validators,
+                policy=RetryPolicy(attempts=args.retries + 1, timeout=args.timeout),
+                breaker=CircuitBreaker(),
+                origin=args.origin,
+                spans=metrics.spans,
+                executor=executor,
+            )
+        )
+        metrics.lap("fetch")
+        for url, result in url_cache.items():
+            if not isinstance(result, Exception) and result.body_path is None:
+                total_not_modified += 1
+                bytes_saved += stored_sizes.get(url, 0)
+
+        retrieved_ats: Dict[str, str] = {}
+        plans: List[WritePlan] = []
+
+        for category in categories:
+            urls = dedupe_preserve_order(by_category.get(category, []))
+            if not urls:
+                print(f"[warn] No URLs for category: {category}")
+                continue
 
-    for category in categories:
-        urls = dedupe_preserve_order(BY_CATEGORY.get(category, []))
-        if not urls:
-            print(f"[warn] No URLs for category: {category}")
-            continue
+            for url in urls:
+                service, artifact = parse_url(url)
+                current_path = target_path(base_dir, category, url)
+                current_path.parent.mkdir(parents=True, exist_ok=True)
+                filename = current_path.name
 
-        for url in urls:
-            service, artifact = parse_url(url)
-            cat_dir = base_dir / category / service
-            archive_dir = cat_dir / "_archive"
-            cat_dir.mkdir(parents=True, exist_ok=True)
-
-            filename = f"{service}-{artifact}.txt" if service != "root" else f"{artifact}.txt"
-            current_path = cat_dir / filename
-
-            # Fetch (cache if repeated)
-            if url not in url_cache:
-                try:
-                    text, headers = fetch_text(session, url)
-                    url_cache[url] = (text, headers)
-                except requests.RequestException as e:
-                    print(f"[error] {url}: {e}")
+                result = url_cache[url]
+                if isinstance(result, Exception):
+                    print(f"[error] {url}: {result}")
+                    continue
+                if result.body_path is None:
+                    total_skipped += 1
+                    print(f"[skip] {category}/{service}/{filename} (304 not modified)")
                     continue
-            else:
-                text, headers = url_cache[url]
-
-            retrieved_at = now_iso_with_tz()
-            content_sha = sha256_text(text)
-            prev_sha = extract_prev_content_sha(current_path)
 
-            last_modified = headers.get("Last-Modified", "")
-            etag = headers.get("ETag", "")
+                content_sha = result.content_sha
+                retrieved_ats.setdefault(url, now_iso_with_tz())
+                prev = current_record(manifest, current_path, category)
+                prev_sha = prev.content_sha if prev else ""
 
+                # Decide write/archive
+                should_write = args.force or (content_sha != prev_sha) or (not current_path.exists())
+                if not should_write:
+                    total_skipped += 1
+                    print(f"[skip] {category}/{service}/{filename} (no change)")
+                    continue
+                plans.append(WritePlan(category, url, service, artifact, current_path, result, prev_sha))
+
+        metrics.lap("plan")
+        # New content goes to staged files; current files are only replaced by batch.commit()
+        staged: List[WritePlan] = []
+        for plan in plans:
+            category, url, service, artifact, current_path, result, _ = plan
+            content_sha = result.content_sha
+            retrieved_at = retrieved_ats[url] if args.object_store else now_iso_with_tz()
             header = build_header(
                 url=url,
-                category=category,
+                # Object-store blobs are shared by every category: the category is the path's (and the manifest's)
+                category="" if args.object_store else category,
                 service=service,
                 artifact=artifact,
                 retrieved_at=retrieved_at,
                 content_sha=content_sha,
-                last_modified=last_modified,
-                etag=etag,
+                last_modified=result.headers.get("Last-Modified", ""),
+                etag=result.headers.get("ETag", ""),
             )
-            composed = header + text
-
-            # Decide write/archive
-            should_write = args.force or (content_sha != prev_sha) or (not current_path.exists())
-            if not should_write:
-                total_skipped += 1
-                print(f"[skip] {category}/{service}/{filename} (no change)")
-                continue
-
-            if current_path.exists():
-                try:
-                    archive_existing(current_path, archive_dir)
-                    total_archived += 1
-                    print(f"[archive] -> {archive_dir}")
-                except Exception as e:
-                    print(f"[warn] failed to archive {current_path}: {e}")
-
             try:
-                with current_path.open("w", encoding="utf-8") as f:
-                    f.write(composed)
+                staged_path = batch.stage(current_path)
+                obj_path = store_object(base_dir, content_sha, url, header, result.body_path) if args.object_store else None
+                if obj_path is not None:
+                    link_object(obj_path, staged_path)
+                else:
+                    with staged_path.open("wb") as f:
+                        write_composed(f, header, result.body_path)
+                st = staged_path.stat()
+                manifest.upsert(
+                    FileRecord(
+                        path=manifest.relpath(current_path),
+                        category=category,
+                        service=service,
+                        artifact=artifact,
+                        url=url,
+                        content_sha=content_sha,
+                        etag=result.headers.get("ETag", ""),
+                        last_modified=result.headers.get("Last-Modified", ""),
+                        retrieved_at=retrieved_at,
+                        body_offset=st.st_size - result.size,
+                        size=result.size,
+                        mtime_ns=st.st_mtime_ns,
+                    )
+                )
+                staged.append(plan)
                 total_downloaded += 1
                 desc = artifact_description(artifact)
-                print(f"[write] {category}/{service}/{filename}  ({desc})")
+                print(f"[write] {category}/{service}/{current_path.name}  ({desc})")
             except Exception as e:
+                batch.discard(current_path)
                 print(f"[error] writing {current_path}: {e}")
 
+        metrics.lap("write")
+        # Compress the versions being replaced in worker processes (they stay in place until the
+        # commit renames over them); results come back in plan order
+        to_archive = [plan for plan in staged if plan.current_path.exists()]
+        tasks = ((plan.current_path, plan.current_path.parent / "_archive", args.archive_codec, True) for plan in to_archive)
+        for plan, archived in zip(to_archive, ordered_map(try_archive, tasks, args.workers)):
+            if isinstance(archived, Exception):
+                print(f"[warn] failed to archive {plan.current_path}: {archived}")
+                continue
+            manifest.add_archive(
+                ArchiveRecord(
+                    archived_path=manifest.relpath(archived),
+                    path=manifest.relpath(plan.current_path),
+                    content_sha=plan.prev_sha,
+                    archived_at=now_iso_with_tz(),
+                )
+            )
+            total_archived += 1
+            print(f"[archive] -> {archived.parent}")
+
+        metrics.lap("archive")
+        if batch.staged or (args.keep_generations and not current_generation(base_dir)):
+            snapshot_dir = batch.commit(
+                args.keep_generations, {"run_at": run_at.isoformat(), "categories": categories}
+            )
+            print(
+                f"[commit] {len(staged)} files"
+                + (f", generation {batch.generation} -> {snapshot_dir}" if snapshot_dir else "")
+                + "  ("
+                + " ".join(f"{name}={t:.3f}s" for name, t in batch.timings.items())
+                + ")"
+            )
+            metrics.counters["generation"] = batch.generation if snapshot_dir else 0
+        if args.object_store:
+            # Blobs of replaced versions are unreferenced once the commit and generation pruning dropped their links
+            swept = sweep_objects(base_dir)
+            if swept["blobs"]:
+                print(f"[objects] removed {swept['blobs']} unreferenced blobs ({swept['bytes']:,} bytes)")
+        metrics.lap("commit")
+        # Page-level change feed: hash each <page> (in worker processes) and diff against the stored per-page index
+        changes: List[dict] = []
+        feed: Optional[Path] = None
+        to_index = [
+            (url, result)
+            for url, result in url_cache.items()
+            if not isinstance(result, Exception)
+            and result.body_path is not None
+            and needs_sync(manifest, url, result.content_sha)
+        ]
+        body_paths = (result.body_path for _, result in to_index)
+        for (url, result), pages in zip(to_index, ordered_map(index_pages, body_paths, args.workers)):
+            url_categories = [c for c in categories if url in by_category.get(c, [])]
+            changes += diff_pages(manifest, url, result.content_sha, pages, url_categories)
+        if changes:
+            counts = summarize(changes)
+            feed = write_feed(base_dir, changes, run_at)
+            print(
+                f"[changes] added={counts['added']}, modified={counts['modified']}, "
+                f"removed={counts['removed']} -> {feed}"
+            )
+
+        manifest.commit()
+        metrics.lap("changes")
+    finally:
+        batch.abort()
+        shutil.rmtree(spool_dir, ignore_errors=True)
+
     print(
-        f"\nDone. wrote={total_downloaded}, archived={total_archived}, skipped={total_skipped}\nBase: {base_dir.resolve()}"
+        f"\nDone. wrote={total_downloaded}, archived={total_archived}, skipped={total_skipped}, "
+        f"not_modified={total_not_modified}, bytes_saved={bytes_saved}\nBase: {base_dir.resolve()}"
+    )
+
+    run_hooks(args, base_dir, categories, feed, metrics)
+
+    metrics.counters.update(
+        wrote=total_downloaded,
+        archived=total_archived,
+        skipped=total_skipped,
+        not_modified=total_not_modified,
+        errors=sum(1 for result in url_cache.values() if isinstance(result, Exception)),
+        bytes_saved=bytes_saved,
     )
+    paths = write_metrics(metrics, Path(args.metrics_dir) if args.metrics_dir else metrics_dir(base_dir))
+    for span in metrics.slowest(3):
+        print(f"[slow] {format_span(span)}")
+    print(f"[metrics] {paths['json']}, {paths['prom']}")
+    return {"categories": categories, "changes": len(changes)}
+
+
+def run_hooks(
+    args: argparse.Namespace, base_dir: Path, categories: List[str], feed: Optional[Path], metrics: RunMetrics
+) -> None:
+    """Downstream stages; each runs only if pages changed this run (feed is set) or its output doesn't exist yet."""
+    if args.packed and (feed or not Path(args.packed).exists()):
+        # Packed from the tree, not the spool: URLs skipped or answered 304 this run still belong in it
+        stats = write_packed(base_dir, Path(args.packed), categories, args.packed_codec)
+        print(
+            f"[packed] {stats['pages']} pages from {stats['exports']} exports, "
+            f"{stats['packed_bytes']:,} bytes ({args.packed_codec}) -> {args.packed}"
+        )
+        metrics.lap("packed")
+    if args.fts and (feed or not (base_dir / DOCS_DB_NAME).exists()):
+        # Always the whole mirror: limiting it to this run's categories would drop the others' rows
+        stats = sync_docs_db(base_dir)
+        print(
+            f"[fts] pages={stats['pages']}, added={stats['added']}, updated={stats['updated']}, "
+            f"moved={stats['moved']}, removed={stats['removed']} -> {base_dir / DOCS_DB_NAME}"
+        )
+        metrics.lap("fts")
+    if args.reindex and (feed or not index_path(base_dir).exists()):
+        stats = build_index(base_dir)
+        print(f"[reindex] {stats['docs']} pages in {stats['seconds']:.2f}s -> {index_path(base_dir)}")
+        metrics.lap("reindex")
+    if feed and args.on_change:
+        env = {
+            **os.environ,
+            "LLMS_BASE": str(base_dir),
+            "LLMS_CHANGES": str(feed),
+            "LLMS_GENERATION": str(current_generation(base_dir)),
+        }
+        for command in args.on_change:
+            code = subprocess.run(command, shell=True, env=env).returncode
+            print(f"[hook] {command} -> exit {code}")
+        metrics.lap("hooks")
+
+
+def watch(args: argparse.Namespace, base_dir: Path, manifest: Manifest) -> None:
+    """Refresh categories on their schedule until SIGTERM/SIGINT, reusing one manifest connection and fetch pool."""
+    schedule = Schedule(base_dir / WATCH_STATE, args.interval, parse_intervals(args.category_interval), args.jitter)
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    # The fetch threads outlive each refresh, and with them their sessions' keep-alive connections
+    with ThreadPoolExecutor(max_workers=args.jobs) as executor:
+
+        def refresh(categories: Optional[List[str]]) -> List[str]:
+            run_args = argparse.Namespace(**{**vars(args), "category": categories or []})
+            try:
+                with mirror_lock(base_dir, "download_llms_txt.py --watch"):
+                    return run(run_args, base_dir, manifest, executor)["categories"]
+            except Exception as e:
+                manifest.rollback()
+                print(f"[error] refresh of {', '.join(categories or ['all categories'])} failed: {e}")
+                return []
+
+        try:
+            runs = watch_loop(refresh, schedule, args.category or None, stop)
+        except KeyboardInterrupt:
+            runs = None
+    print(f"[watch] stopped{f' after {runs} refreshes' if runs is not None else ''}")
 
 
 if __name__ == "__main__":
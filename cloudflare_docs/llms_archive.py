@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Compressed `_archive/` storage for download_llms_txt.py.
+
+Previous versions of an export are stored as `<stem>.<timestamp><suffix><ext>`,
+where ext is ".gz" (stdlib gzip), ".zst" (optional `zstandard` package) or empty
+for legacy uncompressed copies. Any version can be rebuilt with read_version().
+
+Usage:
+    python llms_archive.py list cloudflare_docs/core_context_pack/workers/workers-llms-full.txt
+    python llms_archive.py show <archived-file> > old.txt
+"""
+
+import argparse
+import gzip
+import io
+import os
+import shutil
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, List, NamedTuple, Tuple, Union
+
+try:
+    import zstandard
+except ImportError:  # optional; gzip is always available
+    zstandard = None
+
+TIMESTAMP_FORMAT = "%Y%m%d-%H%M%S%z"
+CODEC_EXTENSIONS = {"gzip": ".gz", "zstd": ".zst", "none": ""}
+DEFAULT_CODEC = "gzip"
+CHUNK_SIZE = 256 * 1024
+
+
+class ArchivedVersion(NamedTuple):
+    path: Path
+    archived_at: datetime
+    codec: str
+
+
+def available_codecs() -> List[str]:
+    return [c for c in CODEC_EXTENSIONS if c != "zstd" or zstandard is not None]
+
+
+def codec_for(path: Path) -> str:
+    for codec, ext in CODEC_EXTENSIONS.items():
+        if ext and path.name.endswith(ext):
+            return codec
+    return "none"
+
+
+def _open_writer(path: Path, codec: str) -> BinaryIO:
+    if codec == "gzip":
+        return gzip.open(path, "wb", compresslevel=6)
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstd archives need the 'zstandard' package (pip install zstandard)")
+        return zstandard.ZstdCompressor(level=10).stream_writer(path.open("wb"), closefd=True)
+    return path.open("wb")
+
+
+def open_version(path: Path) -> BinaryIO:
+    """Open an archived version for reading as the original, uncompressed bytes."""
+    codec = codec_for(path)
+    if codec == "gzip":
+        return gzip.open(path, "rb")
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstd archives need the 'zstandard' package (pip install zstandard)")
+        # Buffered so callers can iterate lines, as with the gzip and plain readers
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(path.open("rb"), closefd=True))
+    return path.open("rb")
+
+
+def read_version(path: Path) -> bytes:
+    with open_version(path) as f:
+        return f.read()
+
+
+def archive_existing(current_path: Path, archive_dir: Path, codec: str = DEFAULT_CODEC, keep_source: bool = False) -> Path:
+    """
+    Move current_path into archive_dir, compressing it with codec on the way.
+    The source is only removed once the compressed copy is complete, and not at
+    all with keep_source (when a staged file is about to be renamed over it).
+    """
+    if codec not in CODEC_EXTENSIONS:
+        raise ValueError(f"unknown archive codec: {codec}")
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    ts = datetime.now().astimezone().strftime(TIMESTAMP_FORMAT)
+    archived = archive_dir / f"{current_path.stem}.{ts}{current_path.suffix}{CODEC_EXTENSIONS[codec]}"
+    if codec == "none":
+        if not keep_source:
+            current_path.replace(archived)
+        else:
+            try:
+                os.link(current_path, archived)
+            except OSError:
+                shutil.copyfile(current_path, archived)
+        return archived
+
+    tmp = archived.with_name(archived.name + ".tmp")
+    with current_path.open("rb") as src, _open_writer(tmp, codec) as dst:
+        shutil.copyfileobj(src, dst, CHUNK_SIZE)
+    tmp.replace(archived)
+    if not keep_source:
+        current_path.unlink()
+    return archived
+
+
+def recompress(path: Path, codec: str) -> Path:
+    """Rewrite an archived version with another codec; the old file is removed once the new one is complete."""
+    old_ext = CODEC_EXTENSIONS[codec_for(path)]
+    target = path.with_name(path.name[: len(path.name) - len(old_ext)] + CODEC_EXTENSIONS[codec])
+    if target == path:
+        return path
+    tmp = target.with_name(target.name + ".tmp")
+    with open_version(path) as src, _open_writer(tmp, codec) as dst:
+        shutil.copyfileobj(src, dst, CHUNK_SIZE)
+    tmp.replace(target)
+    path.unlink()
+    return target
+
+
+def try_archive(task: Tuple[Path, Path, str, bool]) -> Union[Path, Exception]:
+    """archive_existing() as a process-pool task: its arguments in, archived path or the error out."""
+    try:
+        return archive_existing(*task)
+    except Exception as e:
+        return e
+
+
+def list_versions(current_path: Path) -> List[ArchivedVersion]:
+    """All archived versions of current_path (in its sibling _archive/), oldest first."""
+    archive_dir = current_path.parent / "_archive"
+    if not archive_dir.is_dir():
+        return []
+    prefix = current_path.stem + "."
+    versions = []
+    for path in archive_dir.iterdir():
+        if not path.name.startswith(prefix) or path.name.endswith(".tmp"):
+            continue
+        ts = path.name[len(prefix):].split(".", 1)[0]
+        try:
+            archived_at = datetime.strptime(ts, TIMESTAMP_FORMAT)
+        except ValueError:
+            continue
+        versions.append(ArchivedVersion(path, archived_at, codec_for(path)))
+    versions.sort(key=lambda v: v.archived_at)
+    return versions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect and reconstruct archived llms.txt exports.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_list = sub.add_parser("list", help="List archived versions of a current export file")
+    p_list.add_argument("file", type=Path)
+    p_show = sub.add_parser("show", help="Write the reconstructed content of an archived version to stdout")
+    p_show.add_argument("archived", type=Path)
+    args = parser.parse_args()
+
+    if args.command == "list":
+        for v in list_versions(args.file):
+            print(f"{v.archived_at.isoformat()}  {v.codec:<5} {v.path.stat().st_size:>10}  {v.path}")
+    elif args.command == "show":
+        with open_version(args.archived) as f:
+            shutil.copyfileobj(f, sys.stdout.buffer, CHUNK_SIZE)
+
+
+if __name__ == "__main__":
+    main()
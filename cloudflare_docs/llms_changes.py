@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Page-level change detection for the llms.txt mirror.
+
+For each freshly downloaded export whose body changed (needs_sync()), the
+downloader hashes every <page> with index_pages(), which is pure so it runs in
+a process pool, then diff_pages() compares the result with the per-page index
+in the manifest, replaces that index and returns added / modified / removed
+records. Each run's records go to a JSONL change feed under _changes/
+(write_feed()), so indexes, embeddings and context packs only reprocess the
+pages that actually changed.
+
+Usage:
+    python llms_changes.py [--base cloudflare_docs] [--since 20250101-000000]
+"""
+
+import argparse
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+from llms_manifest import Manifest, PageRecord
+from llms_pages import iter_file_pages
+
+CHANGES_DIR = "_changes"
+FEED_TIMESTAMP_FORMAT = "%Y%m%d-%H%M%S-%f"
+
+
+def unique_key(key: str, seen: Dict[str, int]) -> str:
+    """Exports occasionally repeat a page; suffix repeats so keys stay unique within a URL."""
+    n = seen.get(key, 0)
+    seen[key] = n + 1
+    return key if n == 0 else f"{key}#{n}"
+
+
+def index_pages(body_path: Path) -> List[Tuple[str, int, str, str]]:
+    """(key, index, sha, title) of every <page> of body_path; pure, so it can run in a worker process."""
+    seen: Dict[str, int] = {}
+    return [(unique_key(page.key, seen), page.index, page.sha, page.title) for page in iter_file_pages(body_path)]
+
+
+def needs_sync(manifest: Manifest, url: str, content_sha: str) -> bool:
+    return manifest.page_source_sha(url) != content_sha
+
+
+def diff_pages(
+    manifest: Manifest, url: str, content_sha: str, pages: List[Tuple[str, int, str, str]], categories: List[str]
+) -> List[dict]:
+    """Diff index_pages() output against the stored index for url, replace the index and return change records."""
+    previous = manifest.pages(url)
+    current: List[PageRecord] = []
+    changes: List[dict] = []
+    for key, index, sha, title in pages:
+        current.append(PageRecord(url, key, index, sha, title))
+        old = previous.pop(key, None)
+        if old is None:
+            op = "added"
+        elif old.sha != sha:
+            op = "modified"
+        else:
+            continue
+        changes.append(
+            {
+                "op": op,
+                "url": url,
+                "key": key,
+                "title": title,
+                "index": index,
+                "sha": sha,
+                "prev_sha": old.sha if old else "",
+                "categories": categories,
+            }
+        )
+    for old in previous.values():
+        changes.append(
+            {
+                "op": "removed",
+                "url": url,
+                "key": old.key,
+                "title": old.title,
+                "index": old.page_index,
+                "sha": "",
+                "prev_sha": old.sha,
+                "categories": categories,
+            }
+        )
+
+    manifest.replace_pages(url, content_sha, current)
+    return changes
+
+
+def write_feed(base_dir: Path, changes: List[dict], run_at: datetime) -> Path:
+    """Write one run's change records as _changes/<timestamp>.jsonl."""
+    feed_dir = base_dir / CHANGES_DIR
+    feed_dir.mkdir(parents=True, exist_ok=True)
+    path = feed_dir / f"{run_at.strftime(FEED_TIMESTAMP_FORMAT)}.jsonl"
+    tmp = path.with_name(path.name + ".tmp")
+    run_iso = run_at.isoformat()
+    with tmp.open("w", encoding="utf-8") as f:
+        for change in changes:
+            f.write(json.dumps({"run_at": run_iso, **change}, ensure_ascii=False) + "\n")
+    tmp.replace(path)
+    return path
+
+
+def iter_feed(base_dir: Path, since: str = "") -> Iterator[dict]:
+    """Replay change records from every feed file whose timestamp is after `since` (same format)."""
+    feed_dir = base_dir / CHANGES_DIR
+    if not feed_dir.is_dir():
+        return
+    for path in sorted(feed_dir.glob("*.jsonl")):
+        if since and path.stem <= since:
+            continue
+        with path.open("r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def summarize(changes: List[dict]) -> Dict[str, int]:
+    counts = {"added": 0, "modified": 0, "removed": 0}
+    for change in changes:
+        counts[change["op"]] += 1
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print page-level changes recorded by download_llms_txt.py.")
+    parser.add_argument("--base", default="cloudflare_docs", help="Base folder of the mirror (default: cloudflare_docs)")
+    parser.add_argument("--since", default="", help="Only feeds newer than this timestamp prefix, e.g. 20250101-000000")
+    args = parser.parse_args()
+
+    for change in iter_feed(Path(args.base), args.since):
+        print(f"{change['run_at']}  {change['op']:<8}  {change['title']}  <{change['key']}>")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Split the mirrored pages into token-budgeted retrieval chunks (JSONL).
+
+Chunks never cross a <page> boundary. Within a page the body is cut into
+blocks - paragraphs, list runs, whole ``` code fences - which are packed
+greedily up to --max-tokens. A heading starts a new chunk once the current
+one is at least half full, and a chunk that continues the same section opens
+with up to --overlap tokens of the previous chunk's tail (whole blocks or
+trailing sentences; code is never cut for overlap). Blocks larger than the
+budget are split by lines (code is re-fenced; tables, lists) or sentences.
+
+Each record carries category, service, export URL, page title, source_url,
+the heading trail, the page's SHA-256 and the chunk's own content hash.
+
+Re-runs are incremental: <out>.pages.json maps every page (source + page
+SHA) to its byte span in the previous output, and pages whose hash has not
+changed are copied over instead of re-chunked. Token counts come from
+tiktoken's cl100k_base when it is installed, else from a word/punctuation
+estimate; changing the tokenizer or budgets re-chunks everything.
+
+Usage:
+    python llms_chunks.py [--base cloudflare_docs] [--max-tokens 512] [--overlap 64] [--full] [--workers 0]
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from llms_corpus import MirrorExport, iter_unique_pages
+from llms_pages import Page
+from llms_pipeline import DEFAULT_WORKERS, batched, ordered_map, workers_arg
+
+try:
+    import tiktoken
+except ImportError:  # optional: fall back to the estimate below
+    tiktoken = None
+
+CHUNKS_DIR = "_chunks"
+CHUNKS_NAME = "chunks.jsonl"
+CHUNKER_VERSION = 1
+DEFAULT_MAX_TOKENS = 512
+DEFAULT_OVERLAP = 64
+PAGES_PER_TASK = 32
+
+_WORD_RE = re.compile(r"\w+|[^\w\s]")
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_FENCE_RE = re.compile(r"^\s*(```+|~~~+)")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+_encoding = None
+
+
+def tokenizer_name() -> str:
+    return "cl100k_base" if tiktoken is not None else "approx-words"
+
+
+def count_tokens(text: str) -> int:
+    global _encoding
+    if tiktoken is not None:
+        if _encoding is None:
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        return len(_encoding.encode(text, disallowed_special=()))
+    # Words and punctuation marks each count as one token: close to BPE for prose, a little low for code
+    return len(_WORD_RE.findall(text))
+
+
+class Block(NamedTuple):
+    text: str
+    tokens: int
+    kind: str  # "heading", "code" or "text"
+    headings: Tuple[str, ...]  # heading trail the block sits under
+
+
+class Chunk(NamedTuple):
+    text: str
+    tokens: int
+    headings: Tuple[str, ...]
+
+
+def iter_blocks(body: str) -> Iterator[Block]:
+    """Cut a page body into headings, whole code fences and blank-line separated text blocks."""
+    trail: List[Tuple[int, str]] = []
+    lines: List[str] = []
+    fence = ""
+
+    def flush(kind: str = "text") -> Iterator[Block]:
+        text = "\n".join(lines).strip("\n")
+        lines.clear()
+        if text.strip():
+            yield Block(text, count_tokens(text), kind, tuple(t for _, t in trail))
+
+    for line in body.split("\n"):
+        if fence:
+            lines.append(line)
+            if line.strip().startswith(fence):
+                fence = ""
+                yield from flush("code")
+            continue
+        m = _FENCE_RE.match(line)
+        if m:
+            yield from flush()
+            fence = m.group(1)
+            lines.append(line)
+            continue
+        m = _HEADING_RE.match(line)
+        if m:
+            yield from flush()
+            level = len(m.group(1))
+            while trail and trail[-1][0] >= level:
+                trail.pop()
+            trail.append((level, m.group(2)))
+            lines.append(line)
+            yield from flush("heading")
+            continue
+        if not line.strip():
+            yield from flush()
+            continue
+        lines.append(line)
+    # An unterminated fence still counts as code
+    yield from flush("code" if fence else "text")
+
+
+def hard_cut(text: str, budget: int) -> List[str]:
+    """Cut one over-budget line/sentence into word windows that fit."""
+    parts: List[str] = []
+    words: List[str] = []
+    tokens = 0
+    for word in text.split(" "):
+        n = count_tokens(word)
+        if words and tokens + n > budget:
+            parts.append(" ".join(words))
+            words, tokens = [], 0
+        words.append(word)
+        tokens += n
+    if words:
+        parts.append(" ".join(words))
+    return parts
+
+
+def split_block(block: Block, max_tokens: int) -> List[Block]:
+    """Split a block over budget into pieces that fit: code (re-fenced), tables and lists by lines, prose by sentences."""
+    if block.tokens <= max_tokens:
+        return [block]
+    if block.kind == "code":
+        lines = block.text.split("\n")
+        closed = len(lines) > 1 and _FENCE_RE.match(lines[-1]) is not None
+        units = lines[1:-1] if closed else lines[1:]
+        opener, closer = lines[0], lines[-1] if closed else _FENCE_RE.match(lines[0]).group(1)
+        joiner = "\n"
+        budget = max(1, max_tokens - count_tokens(f"{opener}\n{closer}"))
+    else:
+        joiner = "\n" if "\n" in block.text else " "
+        units = block.text.split("\n") if joiner == "\n" else _SENTENCE_RE.split(block.text)
+        opener = closer = ""
+        budget = max_tokens
+
+    pieces: List[Block] = []
+    current: List[str] = []
+    current_tokens = 0
+
+    def emit() -> None:
+        text = joiner.join(current)
+        if opener:
+            text = f"{opener}\n{text}\n{closer}"
+        pieces.append(Block(text, count_tokens(text), block.kind, block.headings))
+
+    for unit in units:
+        unit_tokens = count_tokens(unit)
+        for part in hard_cut(unit, budget) if unit_tokens > budget else [unit]:
+            part_tokens = unit_tokens if part is unit else count_tokens(part)
+            if current and current_tokens + part_tokens > budget:
+                emit()
+                current, current_tokens = [], 0
+            current.append(part)
+            current_tokens += part_tokens
+    if current:
+        emit()
+    return pieces
+
+
+def overlap_tail(blocks: List[Block], overlap: int) -> List[Block]:
+    """Trailing whole blocks (or trailing sentences of the last prose block) worth up to `overlap` tokens."""
+    tail: List[Block] = []
+    total = 0
+    for block in reversed(blocks):
+        if total + block.tokens <= overlap:
+            tail.insert(0, block)
+            total += block.tokens
+            continue
+        if block.kind == "text" and not tail:
+            sentences = _SENTENCE_RE.split(block.text)
+            kept: List[str] = []
+            for sentence in reversed(sentences[1:]):
+                n = count_tokens(sentence)
+                if total + n > overlap:
+                    break
+                kept.insert(0, sentence)
+                total += n
+            if kept:
+                text = " ".join(kept)
+                tail.insert(0, Block(text, count_tokens(text), "text", block.headings))
+        break
+    return tail
+
+
+def chunk_page(page: Page, max_tokens: int = DEFAULT_MAX_TOKENS, overlap: int = DEFAULT_OVERLAP) -> List[Chunk]:
+    chunks: List[Chunk] = []
+    current: List[Block] = []
+    tokens = 0
+
+    def flush() -> None:
+        nonlocal current, tokens
+        # A run of bare headings is not worth a chunk; the trail is kept in the next block's metadata
+        if any(b.kind != "heading" for b in current):
+            chunks.append(Chunk("\n\n".join(b.text for b in current), tokens, current[0].headings))
+        current, tokens = [], 0
+
+    for big in iter_blocks(page.body):
+        for block in split_block(big, max_tokens):
+            if block.kind == "heading" and tokens >= max_tokens // 2:
+                flush()
+            elif current and tokens + block.tokens > max_tokens:
+                same_section = current[-1].headings == block.headings
+                carried = overlap_tail(current, overlap) if overlap and same_section else []
+                flush()
+                carried_tokens = sum(b.tokens for b in carried)
+                if carried and carried_tokens + block.tokens <= max_tokens:
+                    current, tokens = list(carried), carried_tokens
+            current.append(block)
+            tokens += block.tokens
+    flush()
+    return chunks
+
+
+def page_records(export: MirrorExport, page: Page, max_tokens: int, overlap: int) -> List[dict]:
+    source = page.source_html or page.source_md
+    records = []
+    for n, chunk in enumerate(chunk_page(page, max_tokens, overlap)):
+        chunk_sha = hashlib.sha256(chunk.text.encode("utf-8")).hexdigest()
+        records.append(
+            {
+                "id": f"{page.sha[:16]}-{n}",
+                "category": export.category,
+                "categories": export.categories,
+                "service": export.service,
+                "url": export.url,
+                "title": page.title,
+                "source_url": source,
+                "headings": list(chunk.headings),
+                "chunk_index": n,
+                "tokens": chunk.tokens,
+                "page_sha": page.sha,
+                "sha": chunk_sha,
+                "text": chunk.text,
+            }
+        )
+    return records
+
+
+def chunks_path(base_dir: Path) -> Path:
+    return base_dir / CHUNKS_DIR / CHUNKS_NAME
+
+
+def page_id(export: MirrorExport, page: Page) -> str:
+    """
+    Key of a page's span in the previous output. The placement fields copied into
+    every record are part of it, so a page that moved to another export is re-chunked.
+    """
+    source = page.source_html or page.source_md or page.title
+    placement = f"{export.category}|{','.join(export.categories)}|{export.service}|{export.url}"
+    return f"{source}|{page.sha}|{placement}"
+
+
+def load_previous(out_path: Path, params: dict) -> Dict[str, List[int]]:
+    """Page id -> [offset, length] in the previous output, if it was built with the same params."""
+    spans_path = out_path.with_name(out_path.name + ".pages.json")
+    if not out_path.exists() or not spans_path.exists():
+        return {}
+    try:
+        saved = json.loads(spans_path.read_text(encoding="utf-8"))
+    except ValueError:
+        return {}
+    if saved.get("params") != params or saved.get("size") != out_path.stat().st_size:
+        return {}
+    return saved["pages"]
+
+
+def encode_batch(task: Tuple[int, int, List[tuple]]) -> List[Tuple[str, Optional[List[int]], Optional[bytes]]]:
+    """Pool task: the JSONL bytes of each page in a batch (None for pages reused from the previous output)."""
+    max_tokens, overlap, batch = task
+    results = []
+    for pid, span, export, page in batch:
+        data = None
+        if page is not None:
+            records = page_records(export, page, max_tokens, overlap)
+            data = b"".join(json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n" for record in records)
+        results.append((pid, span, data))
+    return results
+
+
+def build_chunks(
+    base_dir: Path,
+    out_path: Optional[Path] = None,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    overlap: int = DEFAULT_OVERLAP,
+    categories: Optional[List[str]] = None,
+    full: bool = False,
+    skip_near_duplicates: bool = False,
+    workers: int = 1,
+) -> Dict[str, float]:
+    """
+    Write chunk JSONL for every page, reusing unchanged pages' chunks from the previous output.
+    With workers > 1 pages are chunked in a process pool; output order is unchanged.
+    """
+    out_path = out_path or chunks_path(base_dir)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    params = {
+        "version": CHUNKER_VERSION,
+        "tokenizer": tokenizer_name(),
+        "max_tokens": max_tokens,
+        "overlap": overlap,
+        "categories": sorted(categories or []),
+        "skip_near_duplicates": skip_near_duplicates,
+    }
+    previous = {} if full else load_previous(out_path, params)
+    started = time.perf_counter()
+    stats = {"pages": 0, "reused": 0, "chunked": 0, "chunks": 0}
+    spans: Dict[str, List[int]] = {}
+
+    def entries() -> Iterator[tuple]:
+        # Reused pages travel without their body: the worker only passes them through, in order
+        for export, page in iter_unique_pages(base_dir, categories, skip_near_duplicates):
+            pid = page_id(export, page)
+            span = previous.get(pid)
+            yield pid, span, export, page if span is None else None
+
+    tasks = ((max_tokens, overlap, batch) for batch in batched(entries(), PAGES_PER_TASK))
+
+    tmp = out_path.with_name(out_path.name + ".tmp")
+    old = out_path.open("rb") if previous else None
+    try:
+        with tmp.open("wb") as out:
+            for results in ordered_map(encode_batch, tasks, workers):
+                for pid, span, data in results:
+                    stats["pages"] += 1
+                    start = out.tell()
+                    if data is None:
+                        old.seek(span[0])
+                        data = old.read(span[1])
+                        stats["reused"] += 1
+                    else:
+                        stats["chunked"] += 1
+                    out.write(data)
+                    stats["chunks"] += data.count(b"\n")
+                    spans[pid] = [start, out.tell() - start]
+    finally:
+        if old is not None:
+            old.close()
+    tmp.replace(out_path)
+
+    spans_path = out_path.with_name(out_path.name + ".pages.json")
+    spans_tmp = spans_path.with_name(spans_path.name + ".tmp")
+    payload = {"params": params, "size": out_path.stat().st_size, "pages": spans}
+    spans_tmp.write_text(json.dumps(payload) + "\n", encoding="utf-8")
+    spans_tmp.replace(spans_path)
+
+    stats["seconds"] = time.perf_counter() - started
+    stats["bytes"] = out_path.stat().st_size
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chunk the llms.txt mirror into RAG-ready JSONL.")
+    parser.add_argument("--base", default="cloudflare_docs", help="Base folder of the mirror (default: cloudflare_docs)")
+    parser.add_argument("--out", default="", help="Output JSONL (default: <base>/_chunks/chunks.jsonl)")
+    parser.add_argument("--max-tokens", type=int, default=DEFAULT_MAX_TOKENS, help="Token budget per chunk")
+    parser.add_argument("--overlap", type=int, default=DEFAULT_OVERLAP, help="Tokens carried over between chunks of a section")
+    parser.add_argument("--category", action="append", default=[], help="Limit to a category (repeatable)")
+    parser.add_argument("--full", action="store_true", help="Re-chunk every page instead of reusing unchanged ones")
+    parser.add_argument("--skip-near-duplicates", action="store_true", help="Leave out pages in llms_dedupe.py's canonical map")
+    parser.add_argument("--workers", type=workers_arg, default=DEFAULT_WORKERS, help=f"Processes for chunking; 0 = one per CPU (default: {DEFAULT_WORKERS})")
+    args = parser.parse_args()
+
+    if args.overlap >= args.max_tokens:
+        parser.error("--overlap must be smaller than --max-tokens")
+    base_dir = Path(args.base)
+    out_path = Path(args.out) if args.out else chunks_path(base_dir)
+    stats = build_chunks(base_dir, out_path, args.max_tokens, args.overlap, args.category or None, args.full, args.skip_near_duplicates, args.workers)
+    print(
+        f"Done. pages={stats['pages']}, reused={stats['reused']}, chunked={stats['chunked']}, "
+        f"chunks={stats['chunks']}, bytes={stats['bytes']:,} in {stats['seconds']:.2f}s ({tokenizer_name()}) -> {out_path}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Walk the mirror tree (<base>/<category>/<service>/*.txt) as exports and pages.
+
+The same export is usually mirrored into several categories; iter_exports()
+yields each Source-URL once (first category in sorted order) unless
+unique_urls=False, and records every category it appears in. Pages repeat
+across exports too (developer-platform bundles product pages), so consumers
+that want each page once use iter_unique_pages(). It attributes a shared page
+to the export of its own product, merges the categories of every export that
+contains it, and can also drop the near-duplicates listed in the canonical map
+written by llms_dedupe.py.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+from llms_header import CONTENT_SHA_KEY, read_header
+from llms_pages import Page, iter_file_pages
+
+CANONICAL_MAP = "_dedupe/canonical.json"
+
+
+class MirrorExport(NamedTuple):
+    path: Path
+    category: str
+    service: str
+    url: str
+    content_sha: str
+    categories: List[str]  # every category this URL is mirrored into
+
+
+def is_mirror_dir(path: Path) -> bool:
+    return path.is_dir() and not path.name.startswith(("_", "."))
+
+
+def iter_exports(
+    base_dir: Path, categories: Optional[List[str]] = None, unique_urls: bool = True
+) -> Iterator[MirrorExport]:
+    exports: List[MirrorExport] = []
+    by_url: Dict[str, MirrorExport] = {}
+    for cat_dir in sorted(p for p in base_dir.iterdir() if is_mirror_dir(p)):
+        if categories and cat_dir.name not in categories:
+            continue
+        for service_dir in sorted(p for p in cat_dir.iterdir() if is_mirror_dir(p)):
+            for path in sorted(service_dir.glob("*.txt")):
+                fields, _ = read_header(path)
+                url = fields.get("Source-URL", "")
+                first = by_url.get(url) if url and unique_urls else None
+                if first is not None:
+                    first.categories.append(cat_dir.name)
+                    continue
+                export = MirrorExport(
+                    path, cat_dir.name, service_dir.name, url, fields.get(CONTENT_SHA_KEY, ""), [cat_dir.name]
+                )
+                if url:
+                    by_url[url] = export
+                exports.append(export)
+    yield from exports
+
+
+def iter_corpus_pages(
+    base_dir: Path, categories: Optional[List[str]] = None, unique_urls: bool = True
+) -> Iterator[Tuple[MirrorExport, Page]]:
+    """Every <page> of every export, streamed one page at a time."""
+    for export in iter_exports(base_dir, categories, unique_urls):
+        for page in iter_file_pages(export.path):
+            yield export, page
+
+
+def near_duplicates(base_dir: Path) -> Set[str]:
+    """Source URLs of pages llms_dedupe.py mapped onto another (canonical) page; empty if it never ran."""
+    path = base_dir / CANONICAL_MAP
+    if not path.exists():
+        return set()
+    return set(json.loads(path.read_text(encoding="utf-8"))["canonical"])
+
+
+def page_product(source: str) -> str:
+    """First path segment of a page's source URL ("kv" for https://developers.cloudflare.com/kv/api/)."""
+    return urlparse(source).path.strip("/").split("/")[0]
+
+
+def iter_unique_pages(
+    base_dir: Path, categories: Optional[List[str]] = None, skip_near_duplicates: bool = False
+) -> Iterator[Tuple[MirrorExport, Page]]:
+    """Each page once (and, optionally, without near-duplicates), attributed to its own product's export.
+
+    A page bundled into several exports is yielded from the export whose service matches the
+    page's product (kv pages from kv/, not developer-platform/), falling back to the first one,
+    with categories merged across every export that contains it.
+    """
+    exports = list(iter_exports(base_dir, categories))
+    containing: Dict[str, List[MirrorExport]] = {}
+    for export in exports:
+        for page in iter_file_pages(export.path):
+            source = page.source_html or page.source_md
+            if source and export not in containing.setdefault(source, []):
+                containing[source].append(export)
+
+    home: Dict[str, Tuple[Path, List[str]]] = {}
+    for source, found in containing.items():
+        product = page_product(source)
+        best = next((e for e in found if e.service == product), found[0])
+        home[source] = (best.path, sorted({c for e in found for c in e.categories}))
+
+    seen = near_duplicates(base_dir) if skip_near_duplicates else set()
+    for export in exports:
+        for page in iter_file_pages(export.path):
+            source = page.source_html or page.source_md
+            if source:
+                path, merged = home[source]
+                if path != export.path or source in seen:
+                    continue
+                seen.add(source)
+                yield export._replace(categories=merged), page
+            else:
+                yield export, page
+
+
+def corpus_fingerprint(base_dir: Path, categories: Optional[List[str]] = None) -> str:
+    """SHA-256 over every export's (Source-URL, Content-SHA256); changes whenever any export's body does."""
+    digest = hashlib.sha256()
+    for export in iter_exports(base_dir, categories):
+        digest.update(f"{export.url}\0{export.content_sha}\0{','.join(export.categories)}\n".encode("utf-8"))
+    return digest.hexdigest()
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate page detection over the mirror with MinHash + LSH.
+
+Every page is reduced to its set of word 5-gram shingles and a 128-value
+MinHash signature (NumPy, multiply-shift hashing). Signatures are split
+into 16 bands of 8 rows; pages sharing any band bucket are candidates,
+and candidates whose exact shingle Jaccard is >= --threshold are similar.
+Clusters are formed around leaders, longest page first: the leader is the
+canonical page (it carries the most content) and only pages similar to the
+leader itself join it, so chains of gradually differing pages stay apart.
+
+Pages repeated verbatim across exports (same source URL) are counted
+separately: llms_corpus.iter_unique_pages already drops those.
+
+The result is written to <base>/_dedupe/canonical.json:
+
+    {"threshold": 0.8, "corpus_sha": ..., "canonical": {page source URL: canonical source URL}, ...}
+
+llms_corpus.iter_unique_pages(skip_near_duplicates=True) (used by
+`llms_index.py build --skip-near-duplicates` and `llms_chunks.py
+--skip-near-duplicates`) drops every page listed there. At the default 0.8
+the Workers AI model cards, which are mostly the shared API schema, cluster
+together; raise --threshold to keep them apart.
+
+Usage:
+    python llms_dedupe.py [--base cloudflare_docs] [--threshold 0.8] [--show 10]
+"""
+
+import argparse
+import json
+import time
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from llms_chunks import count_tokens
+from llms_corpus import CANONICAL_MAP, corpus_fingerprint, iter_corpus_pages
+from llms_index import tokenize
+
+SHINGLE_SIZE = 5
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+DEFAULT_THRESHOLD = 0.8
+SEED = 0
+
+_MASK32 = np.uint64(0xFFFFFFFF)
+
+
+class PageInfo(NamedTuple):
+    source: str
+    title: str
+    export: str
+    length: int
+    tokens: int
+
+
+def token_hashes(tokens: List[str], cache: Dict[str, int]) -> np.ndarray:
+    out = np.empty(len(tokens), dtype=np.uint64)
+    for i, token in enumerate(tokens):
+        h = cache.get(token)
+        if h is None:
+            h = cache[token] = zlib.crc32(token.encode("utf-8"))
+        out[i] = h
+    return out
+
+
+def shingle_hashes(hashes: np.ndarray) -> np.ndarray:
+    """Sorted unique 32-bit hashes of every SHINGLE_SIZE-token window (the whole page if shorter)."""
+    if len(hashes) == 0:
+        return np.zeros(0, dtype=np.uint64)
+    width = min(SHINGLE_SIZE, len(hashes))
+    n = len(hashes) - width + 1
+    acc = np.zeros(n, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for j in range(width):
+            acc = acc * np.uint64(0x100000001B3) + hashes[j : j + n]
+    return np.unique((acc >> np.uint64(16)) & _MASK32)
+
+
+def make_permutations(rng: np.random.Generator) -> np.ndarray:
+    """NUM_PERM (a, b) pairs for h(x) = (a*x + b) >> 32 over uint64; a is odd."""
+    a = rng.integers(1, 2**63, size=NUM_PERM, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 2**63, size=NUM_PERM, dtype=np.uint64)
+    return np.stack([a, b])
+
+
+def minhash(shingles: np.ndarray, perms: np.ndarray) -> np.ndarray:
+    if len(shingles) == 0:
+        return np.full(NUM_PERM, 0xFFFFFFFF, dtype=np.uint32)
+    with np.errstate(over="ignore"):
+        hashed = (perms[0][:, None] * shingles[None, :] + perms[1][:, None]) >> np.uint64(32)
+    return hashed.min(axis=1).astype(np.uint32)
+
+
+def jaccard(a: np.ndarray, b: np.ndarray) -> float:
+    if len(a) == 0 and len(b) == 0:
+        return 1.0
+    inter = len(np.intersect1d(a, b, assume_unique=True))
+    return inter / (len(a) + len(b) - inter)
+
+
+def find_duplicates(base_dir: Path, threshold: float = DEFAULT_THRESHOLD) -> Dict[str, object]:
+    """Cluster near-duplicate pages; returns the canonical map plus a report."""
+    started = time.perf_counter()
+    perms = make_permutations(np.random.default_rng(SEED))
+    cache: Dict[str, int] = {}
+    pages: List[PageInfo] = []
+    shingle_sets: List[np.ndarray] = []
+    signatures: List[np.ndarray] = []
+    exact = {"pages": 0, "bytes": 0, "tokens": 0}
+    seen = set()
+    total_bytes = total_tokens = 0
+
+    for export, page in iter_corpus_pages(base_dir):
+        source = page.source_html or page.source_md or f"{export.url}#{page.index}"
+        text = f"{page.title}\n{page.body}"
+        tokens = count_tokens(text)
+        total_bytes += page.length
+        total_tokens += tokens
+        if source in seen:
+            exact["pages"] += 1
+            exact["bytes"] += page.length
+            exact["tokens"] += tokens
+            continue
+        seen.add(source)
+        shingles = shingle_hashes(token_hashes(tokenize(text), cache))
+        pages.append(PageInfo(source, page.title, export.url, page.length, tokens))
+        shingle_sets.append(shingles)
+        signatures.append(minhash(shingles, perms))
+
+    # LSH: pages that agree on all ROWS values of any band land in the same bucket
+    similar: Dict[int, List[int]] = {}
+    compared = set()
+    sig = np.stack(signatures) if signatures else np.zeros((0, NUM_PERM), dtype=np.uint32)
+    for band in range(BANDS):
+        buckets: Dict[bytes, List[int]] = {}
+        for i, row in enumerate(sig[:, band * ROWS : (band + 1) * ROWS]):
+            buckets.setdefault(row.tobytes(), []).append(i)
+        for members in buckets.values():
+            for x in range(1, len(members)):
+                for y in range(x):
+                    pair = (members[y], members[x])
+                    if pair in compared:
+                        continue
+                    compared.add(pair)
+                    if jaccard(shingle_sets[pair[0]], shingle_sets[pair[1]]) >= threshold:
+                        similar.setdefault(pair[0], []).append(pair[1])
+                        similar.setdefault(pair[1], []).append(pair[0])
+
+    # Leader clustering, longest page first: every duplicate is similar to its canonical page
+    # itself, so chains of slightly different pages (A~B~C, A!~C) don't collapse into one
+    canonical: Dict[str, str] = {}
+    cluster_list = []
+    near = {"pages": 0, "bytes": 0, "tokens": 0}
+    assigned = set()
+    for keep in sorted(similar, key=lambda i: (-pages[i].length, i)):
+        if keep in assigned:
+            continue
+        dropped = sorted(i for i in similar[keep] if i not in assigned)
+        if not dropped:
+            continue
+        assigned.add(keep)
+        assigned.update(dropped)
+        for i in dropped:
+            canonical[pages[i].source] = pages[keep].source
+            near["pages"] += 1
+            near["bytes"] += pages[i].length
+            near["tokens"] += pages[i].tokens
+        cluster_list.append(
+            {"canonical": pages[keep].source, "title": pages[keep].title, "duplicates": [pages[i].source for i in dropped]}
+        )
+    cluster_list.sort(key=lambda c: -len(c["duplicates"]))
+
+    return {
+        "threshold": threshold,
+        "corpus_sha": corpus_fingerprint(base_dir),
+        "generated_at": datetime.now().astimezone().isoformat(),
+        "seconds": round(time.perf_counter() - started, 3),
+        "totals": {"pages": len(pages) + exact["pages"], "bytes": total_bytes, "tokens": total_tokens},
+        "exact": exact,
+        "near": near,
+        "candidate_pairs": len(compared),
+        "similar_pairs": sum(len(v) for v in similar.values()) // 2,
+        "clusters": cluster_list,
+        "canonical": canonical,
+    }
+
+
+def write_map(base_dir: Path, result: Dict[str, object], out_path: Optional[Path] = None) -> Path:
+    out_path = out_path or base_dir / CANONICAL_MAP
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out_path.with_name(out_path.name + ".tmp")
+    tmp.write_text(json.dumps(result, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    tmp.replace(out_path)
+    return out_path
+
+
+def pct(part: int, whole: int) -> str:
+    return f"{100 * part / whole:5.1f}%" if whole else "  n/a"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find near-duplicate pages with MinHash/LSH and write a canonical-page map.")
+    parser.add_argument("--base", default="cloudflare_docs", help="Base folder of the mirror (default: cloudflare_docs)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Shingle Jaccard for a near-duplicate")
+    parser.add_argument("--show", type=int, default=10, help="Largest clusters to list")
+    args = parser.parse_args()
+
+    base_dir = Path(args.base)
+    result = find_duplicates(base_dir, args.threshold)
+    path = write_map(base_dir, result)
+
+    totals, exact, near = result["totals"], result["exact"], result["near"]
+    print(f"{totals['pages']} pages, {totals['bytes']:,} bytes, {totals['tokens']:,} tokens ({result['seconds']:.1f}s)")
+    for name, part in (("exact repeats", exact), ("near-duplicates", near)):
+        print(
+            f"  {name:<16} pages={part['pages']:>5}  bytes={part['bytes']:>11,} ({pct(part['bytes'], totals['bytes'])})  "
+            f"tokens={part['tokens']:>10,} ({pct(part['tokens'], totals['tokens'])})"
+        )
+    both_bytes = exact["bytes"] + near["bytes"]
+    both_tokens = exact["tokens"] + near["tokens"]
+    print(
+        f"  {'eliminated':<16} pages={exact['pages'] + near['pages']:>5}  bytes={both_bytes:>11,} "
+        f"({pct(both_bytes, totals['bytes'])})  tokens={both_tokens:>10,} ({pct(both_tokens, totals['tokens'])})"
+    )
+    print(f"  {len(result['clusters'])} clusters from {result['candidate_pairs']} LSH candidate pairs")
+    for cluster in result["clusters"][: args.show]:
+        print(f"    {len(cluster['duplicates']) + 1:3d}x  {cluster['title']}  <{cluster['canonical']}>")
+    print(f"Canonical map: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Discover llms.txt exports from the root index instead of a hand-kept URL list.
+
+The root https://developers.cloudflare.com/llms.txt links every product's docs
+(`https://developers.cloudflare.com/<product>/...`). For each product we probe
+the candidate exports (<product>/llms-full.txt, <product>/prompt.txt) with
+concurrent HEAD requests and assign the ones that exist to categories:
+
+- URLs already in download_llms_txt.BY_CATEGORY are left where they are
+- a new llms-full.txt for a known product joins that product's categories
+- prompt.txt files go to global_prompt_assets
+- anything else is placed by the first matching CATEGORY_RULES pattern
+
+The result is cached in <base>/_discovered.json keyed by the hash of llms.txt
+and of the known URL set, so unchanged indexes are not re-probed. A run in
+which any probe failed (network error, 429, 5xx) is not cached: the next run
+probes again instead of hiding the product until llms.txt changes.
+
+Usage:
+    python llms_discover.py [--base cloudflare_docs] [--origin http://127.0.0.1:8799] [--refresh]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from llms_fetch import DEFAULT_JOBS, DEFAULT_PER_HOST, probe_all, thread_session, with_origin
+
+DOCS_ORIGIN = "https://developers.cloudflare.com"
+ROOT_LLMS_URL = f"{DOCS_ORIGIN}/llms.txt"
+CANDIDATE_ARTIFACTS = ["llms-full.txt", "prompt.txt"]
+DISCOVERY_CACHE = "_discovered.json"
+PROMPT_CATEGORY = "global_prompt_assets"
+FALLBACK_CATEGORY = "other_products"
+
+# Checked in order against "<product slug> <section title>", lowercased
+CATEGORY_RULES: List[Tuple[str, "re.Pattern[str]"]] = [
+    ("ai_and_rag", re.compile(r"\bai\b|ai-|vector|agent|\brag\b|autorag|constellation|llm")),
+    ("storage_and_databases", re.compile(r"\br2\b|\bkv\b|\bd1\b|database|storage|hyperdrive|durable|catalog")),
+    ("messaging_and_eventing", re.compile(r"queue|pub-sub|pub/sub|event")),
+    ("rendering_and_media", re.compile(r"image|stream|browser|render|realtime|video|media")),
+    ("observability", re.compile(r"\blogs?\b|analytics|observ|trac(e|ing)")),
+    ("integrations_and_routing", re.compile(r"routing|zaraz|gateway|platforms|dns|email")),
+    ("compute_and_runtime", re.compile(r"worker|pages|container|workflow|function|sandbox")),
+    ("meta_and_docs", re.compile(r"spotlight|developer|docs")),
+]
+
+_LINK_RE = re.compile(r"\]\((https?://[^)\s]+)\)")
+
+
+def product_of(url: str) -> str:
+    parts = [p for p in urlparse(url).path.split("/") if p]
+    return parts[0] if len(parts) > 1 else ""
+
+
+def parse_products(llms_text: str) -> Dict[str, str]:
+    """Product slug -> title of the first `## Section` that links to it, in index order."""
+    products: Dict[str, str] = {}
+    section = ""
+    for line in llms_text.splitlines():
+        if line.startswith("## "):
+            section = line[3:].strip()
+            continue
+        for link in _LINK_RE.findall(line):
+            if urlparse(link).netloc != urlparse(DOCS_ORIGIN).netloc:
+                continue
+            product = product_of(link)
+            if product and product not in products:
+                products[product] = section
+    return products
+
+
+def rule_category(product: str, title: str) -> str:
+    subject = f"{product} {title}".lower()
+    for category, pattern in CATEGORY_RULES:
+        if pattern.search(subject):
+            return category
+    return FALLBACK_CATEGORY
+
+
+def assign_categories(url: str, title: str, known: Dict[str, List[str]]) -> List[str]:
+    """Categories a newly discovered export belongs in (see module docstring)."""
+    if url.endswith("/prompt.txt"):
+        return [PROMPT_CATEGORY]
+    product = product_of(url)
+    existing = [
+        c for c, urls in known.items() if c != PROMPT_CATEGORY and any(product_of(u) == product for u in urls)
+    ]
+    return existing or [rule_category(product, title)]
+
+
+def discover(
+    llms_text: str,
+    known: Dict[str, List[str]],
+    cache_path: Optional[Path] = None,
+    refresh: bool = False,
+    jobs: int = DEFAULT_JOBS,
+    per_host: int = DEFAULT_PER_HOST,
+    origin: str = "",
+) -> Dict[str, List[str]]:
+    """Returns category -> newly discovered URLs (never repeating a URL already in `known`)."""
+    llms_sha = hashlib.sha256(llms_text.encode("utf-8")).hexdigest()
+    known_sha = hashlib.sha256("\n".join(sorted({u for urls in known.values() for u in urls})).encode("utf-8")).hexdigest()
+    if cache_path is not None and cache_path.exists() and not refresh:
+        try:
+            cached = json.loads(cache_path.read_text(encoding="utf-8"))
+            if cached.get("llms_sha") == llms_sha and cached.get("known_sha") == known_sha:
+                return cached["categories"]
+        except (ValueError, KeyError):
+            pass
+
+    known_urls = {u for urls in known.values() for u in urls}
+    products = parse_products(llms_text)
+    candidates = [
+        f"{DOCS_ORIGIN}/{product}/{artifact}"
+        for product in products
+        for artifact in CANDIDATE_ARTIFACTS
+        if f"{DOCS_ORIGIN}/{product}/{artifact}" not in known_urls
+    ]
+    found = asyncio.run(probe_all(candidates, jobs=jobs, per_host=per_host, origin=origin))
+
+    categories: Dict[str, List[str]] = {}
+    for url in candidates:
+        if not found[url]:
+            continue
+        for category in assign_categories(url, products[product_of(url)], known):
+            categories.setdefault(category, []).append(url)
+
+    failed = [url for url in candidates if found[url] is None]
+    if failed:
+        print(f"[discover] {len(failed)} probes failed (e.g. {failed[0]}); not caching this result")
+    elif cache_path is not None:
+        payload = {
+            "generated_at": datetime.now().astimezone().isoformat(),
+            "llms_sha": llms_sha,
+            "known_sha": known_sha,
+            "probed": len(candidates),
+            "categories": categories,
+        }
+        tmp = cache_path.with_name(cache_path.name + ".tmp")
+        tmp.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+        tmp.replace(cache_path)
+    return categories
+
+
+def merge_category_maps(base: Dict[str, List[str]], extra: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    merged = {c: list(urls) for c, urls in base.items()}
+    for category, urls in extra.items():
+        target = merged.setdefault(category, [])
+        target.extend(u for u in urls if u not in target)
+    return merged
+
+
+def fetch_llms_index(origin: str = "", timeout: float = 20.0) -> str:
+    resp = thread_session().get(with_origin(ROOT_LLMS_URL, origin), timeout=timeout)
+    resp.raise_for_status()
+    return resp.content.decode("utf-8", "replace")
+
+
+def main():
+    from download_llms_txt import BY_CATEGORY
+
+    parser = argparse.ArgumentParser(description="Discover llms-full.txt / prompt.txt exports listed in the root llms.txt.")
+    parser.add_argument("--base", default="cloudflare_docs", help="Folder holding the discovery cache (default: cloudflare_docs)")
+    parser.add_argument("--origin", default="", help="Probe this scheme://host instead (e.g. a local stub)")
+    parser.add_argument("--refresh", action="store_true", help="Ignore the cache and probe again")
+    parser.add_argument("--jobs", type=int, default=DEFAULT_JOBS)
+    parser.add_argument("--per-host", type=int, default=DEFAULT_PER_HOST)
+    args = parser.parse_args()
+
+    base_dir = Path(args.base)
+    base_dir.mkdir(parents=True, exist_ok=True)
+    found = discover(
+        fetch_llms_index(args.origin),
+        BY_CATEGORY,
+        cache_path=base_dir / DISCOVERY_CACHE,
+        refresh=args.refresh,
+        jobs=args.jobs,
+        per_host=args.per_host,
+        origin=args.origin,
+    )
+    if not found:
+        print("No exports beyond BY_CATEGORY.")
+    for category, urls in found.items():
+        print(f"{category}:")
+        for url in urls:
+            print(f"  {url}")
+
+
+if __name__ == "__main__":
+    main()
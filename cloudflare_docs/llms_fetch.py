@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+"""
+Resilient concurrent fetch layer for download_llms_txt.py.
+
+- fetch_all(): asyncio fan-out with a global and a per-host concurrency limit
+- fetch_to_file(): streams a body to a spool file with incremental SHA-256,
+  retrying transient failures with capped exponential backoff + full jitter
+  and resuming partial bodies with HTTP Range requests
+- probe_all(): concurrent HEAD probes with the same limits (URL discovery)
+- CircuitBreaker: per-host; once a host keeps failing, further requests to it
+  fail fast until a cooldown has passed
+"""
+
+import asyncio
+import hashlib
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Union
+from urllib.parse import urlparse, urlunparse
+
+import requests
+import urllib3
+
+USER_AGENT = "CF-Docs-Fetcher/1.0 (+local script)"
+
+CHUNK_SIZE = 256 * 1024
+
+DEFAULT_JOBS = 8
+DEFAULT_PER_HOST = 6
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+TRANSIENT_ERRORS = (
+    requests.ConnectionError,
+    requests.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+)
+# Only these mean the host itself is unreachable; 5xx and cut-off bodies come from a live host
+HOST_DOWN_ERRORS = (requests.ConnectionError, requests.Timeout)
+
+_thread_local = threading.local()
+
+
+class RetryPolicy(NamedTuple):
+    attempts: int = 4
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+    timeout: float = 20.0
+
+    def delay(self, retry: int) -> float:
+        """Full-jitter backoff: uniform in [0, min(max_delay, base_delay * 2**retry)]."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2**retry)))
+
+
+DEFAULT_RETRY = RetryPolicy()
+
+
+class RetryableStatus(requests.HTTPError):
+    """A 429/5xx response that is worth retrying."""
+
+
+class RangeMismatch(requests.RequestException):
+    """A 206 that does not continue where the partial body stopped; the next attempt refetches it whole."""
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised without touching the network while a host's breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Per-host breaker shared by all fetch threads.
+    After `threshold` consecutive connection failures or timeouts the host is "open" and
+    requests fail fast for `cooldown` seconds; the next request after that is
+    let through as a probe, and a success closes the breaker again.
+    """
+
+    def __init__(self, threshold: int = 5, cooldown: float = 30.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._failures: Dict[str, int] = {}
+        self._opened_at: Dict[str, float] = {}
+
+    def check(self, host: str) -> None:
+        with self._lock:
+            opened_at = self._opened_at.get(host)
+            if opened_at is None:
+                return
+            remaining = opened_at + self.cooldown - time.monotonic()
+            if remaining > 0:
+                raise CircuitOpenError(f"circuit open for {host} ({remaining:.0f}s left)")
+            # Half-open: let this request probe; a failure re-opens immediately
+            del self._opened_at[host]
+
+    def record_success(self, host: str) -> None:
+        with self._lock:
+            self._failures.pop(host, None)
+            self._opened_at.pop(host, None)
+
+    def record_failure(self, host: str) -> None:
+        with self._lock:
+            failures = self._failures.get(host, 0) + 1
+            self._failures[host] = failures
+            if failures >= self.threshold:
+                self._opened_at[host] = time.monotonic()
+
+    def is_open(self, host: str) -> bool:
+        with self._lock:
+            return host in self._opened_at
+
+
+class FetchSpan:
+    """
+    Where one URL's fetch spent its time, summed over attempts (seconds).
+    ttfb covers DNS, connect, TLS and waiting for the response headers:
+    requests does not expose those separately.
+    """
+
+    __slots__ = ("url", "queued", "ttfb", "body", "hash", "disk", "backoff", "total", "attempts", "status", "bytes", "error")
+
+    def __init__(self, url: str):
+        self.url = url
+        self.queued = self.ttfb = self.body = self.hash = self.disk = self.backoff = self.total = 0.0
+        self.attempts = self.status = self.bytes = 0
+        self.error = ""
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class Fetched(NamedTuple):
+    """A downloaded body spooled to disk. body_path is None when the server answered 304."""
+
+    body_path: Optional[Path]
+    content_sha: str
+    size: int
+    headers: dict
+
+
+def _retry_after(resp: requests.Response, policy: RetryPolicy) -> Optional[float]:
+    value = resp.headers.get("Retry-After", "")
+    if value.isdigit():
+        return min(float(value), policy.max_delay)
+    return None
+
+
+def _resume_validator(headers) -> str:
+    # The spool holds decoded bytes, but Range counts bytes of the encoded body: only identity bodies resume
+    if headers.get("Content-Encoding", "identity") != "identity":
+        return ""
+    # If-Range needs a strong validator; fall back to Last-Modified for weak ETags
+    etag = headers.get("ETag", "")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return headers.get("Last-Modified", "")
+
+
+def _range_start(resp: requests.Response) -> int:
+    m = re.match(r"bytes (\d+)-", resp.headers.get("Content-Range", ""))
+    return int(m.group(1)) if m else -1
+
+
+def iter_body(resp: requests.Response) -> Iterator[bytes]:
+    """
+    The body in pieces of up to CHUNK_SIZE as they arrive. Unlike iter_content, a
+    body cut off part-way still yields every byte received before the error is
+    raised, so a retry can resume exactly where it stopped.
+    """
+    try:
+        while True:
+            chunk = resp.raw.read1(CHUNK_SIZE, decode_content=True)
+            if not chunk:
+                return
+            yield chunk
+    except urllib3.exceptions.ReadTimeoutError as e:
+        raise requests.ConnectionError(e)
+    except urllib3.exceptions.ProtocolError as e:
+        raise requests.exceptions.ChunkedEncodingError(e)
+    except urllib3.exceptions.DecodeError as e:
+        raise requests.exceptions.ContentDecodingError(e)
+
+
+def fetch_to_file(
+    session: requests.Session,
+    url: str,
+    dest: Path,
+    request_headers: Optional[Dict[str, str]] = None,
+    policy: RetryPolicy = DEFAULT_RETRY,
+    breaker: Optional[CircuitBreaker] = None,
+    span: Optional[FetchSpan] = None,
+) -> Fetched:
+    """
+    Stream url into dest chunk by chunk, hashing as it goes, so memory stays flat.
+    Transient failures are retried; if an unencoded body was cut off part-way,
+    the next attempt asks for the rest with Range/If-Range (and Accept-Encoding:
+    identity, so offsets stay in decoded bytes) and keeps the running hash.
+    Timings are accumulated into span when one is given.
+    """
+    span = span if span is not None else FetchSpan(url)
+    host = urlparse(url).netloc
+    digest = hashlib.sha256()
+    size = 0
+    validator = ""
+    wait: Optional[float] = None
+    last_error: Optional[Exception] = None
+
+    for attempt in range(policy.attempts):
+        if attempt:
+            delay = wait if wait is not None else policy.delay(attempt - 1)
+            time.sleep(delay)
+            span.backoff += delay
+        wait = None
+        span.attempts += 1
+        if breaker:
+            breaker.check(host)
+
+        headers = dict(request_headers or {})
+        if size and validator:
+            headers["Range"] = f"bytes={size}-"
+            headers["If-Range"] = validator
+            headers["Accept-Encoding"] = "identity"
+        try:
+            started = time.perf_counter()
+            with session.get(url, timeout=policy.timeout, headers=headers, stream=True) as resp:
+                span.ttfb += time.perf_counter() - started
+                span.status = resp.status_code
+                if resp.status_code == 304:
+                    if breaker:
+                        breaker.record_success(host)
+                    return Fetched(None, "", 0, resp.headers)
+                if resp.status_code in RETRYABLE_STATUS:
+                    wait = _retry_after(resp, policy)
+                    raise RetryableStatus(f"{resp.status_code} Server Error for url: {url}", response=resp)
+                resp.raise_for_status()
+
+                if resp.status_code == 206:
+                    # Only an unencoded 206 that continues the spool byte for byte can be appended to it
+                    start = _range_start(resp)
+                    encoding = resp.headers.get("Content-Encoding", "identity")
+                    if "Range" not in headers or start != size or encoding != "identity":
+                        size, validator = 0, ""
+                        raise RangeMismatch(f"206 starting at byte {start} for url: {url}", response=resp)
+                    mode = "ab"
+                else:
+                    # Full body (first attempt, or the server ignored/refused the range)
+                    digest = hashlib.sha256()
+                    size = 0
+                    mode = "wb"
+                validator = _resume_validator(resp.headers)
+
+                with dest.open(mode) as f:
+                    mark = time.perf_counter()
+                    for chunk in iter_body(resp):
+                        received = time.perf_counter()
+                        span.body += received - mark
+                        digest.update(chunk)
+                        hashed = time.perf_counter()
+                        span.hash += hashed - received
+                        size += len(chunk)
+                        span.bytes += len(chunk)
+                        f.write(chunk)
+                        mark = time.perf_counter()
+                        span.disk += mark - hashed
+                    span.body += time.perf_counter() - mark
+
+            if breaker:
+                breaker.record_success(host)
+            return Fetched(dest, digest.hexdigest(), size, resp.headers)
+        except (RetryableStatus, RangeMismatch) + TRANSIENT_ERRORS as e:
+            last_error = e
+            if breaker and isinstance(e, HOST_DOWN_ERRORS):
+                breaker.record_failure(host)
+            resumable = f", resuming at {size} bytes" if size and validator else ""
+            print(f"[retry] {url} attempt {attempt + 1}/{policy.attempts} failed: {e}{resumable}")
+
+    raise last_error
+
+
+def probe_url(session: requests.Session, url: str, timeout: float = 10.0) -> Optional[bool]:
+    """
+    True if url exists, False if the server says it doesn't, None if that couldn't be told
+    (429 or a 5xx). HEAD first; servers that refuse HEAD get a streamed GET that is closed unread.
+    """
+    resp = session.head(url, timeout=timeout, allow_redirects=True)
+    if resp.status_code in (405, 501):
+        resp.close()
+        resp = session.get(url, timeout=timeout, stream=True)
+        resp.close()
+    if resp.status_code == 429 or resp.status_code >= 500:
+        return None
+    return resp.ok
+
+
+def thread_session() -> requests.Session:
+    # requests.Session is not thread-safe, so each worker thread gets its own pool
+    session = getattr(_thread_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        session.headers.update({"User-Agent": USER_AGENT})
+        _thread_local.session = session
+    return session
+
+
+def with_origin(url: str, origin: str) -> str:
+    """Point url at another scheme://host (e.g. a local mirror), keeping its path."""
+    if not origin:
+        return url
+    o = urlparse(origin)
+    return urlunparse(urlparse(url)._replace(scheme=o.scheme, netloc=o.netloc))
+
+
+def spool_name(url: str) -> str:
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()[:16] + ".part"
+
+
+async def fetch_all(
+    urls: List[str],
+    spool_dir: Path,
+    jobs: int = DEFAULT_JOBS,
+    per_host: int = DEFAULT_PER_HOST,
+    request_headers: Optional[Dict[str, Dict[str, str]]] = None,
+    policy: RetryPolicy = DEFAULT_RETRY,
+    breaker: Optional[CircuitBreaker] = None,
+    origin: str = "",
+    spans: Optional[Dict[str, FetchSpan]] = None,
+    executor: Optional[ThreadPoolExecutor] = None,
+) -> Dict[str, Union[Fetched, Exception]]:
+    """
+    Fetch every URL concurrently, spooling each body to a file in spool_dir.
+    - jobs: global cap on in-flight requests
+    - per_host: cap on in-flight requests to any single host
+    - request_headers: optional per-URL extra headers (e.g. conditional GET validators)
+    - origin: fetch from this scheme://host instead (results stay keyed by the original URL)
+    - spans: if given, filled with url -> FetchSpan (queue wait included), failures too
+    - executor: reuse these threads (and their keep-alive sessions) instead of a pool per call
+    Returns url -> Fetched, or the exception raised for that URL.
+    """
+    request_headers = request_headers or {}
+    spans = spans if spans is not None else {}
+    breaker = breaker if breaker is not None else CircuitBreaker()
+    loop = asyncio.get_running_loop()
+    global_limit = asyncio.Semaphore(jobs)
+    host_limits: Dict[str, asyncio.Semaphore] = {}
+
+    def fetch_in_thread(url: str, queued_at: float) -> Fetched:
+        span = spans[url] = FetchSpan(url)
+        started = time.perf_counter()
+        span.queued = started - queued_at
+        try:
+            return fetch_to_file(
+                thread_session(),
+                with_origin(url, origin),
+                spool_dir / spool_name(url),
+                request_headers.get(url),
+                policy,
+                breaker,
+                span,
+            )
+        except Exception as e:
+            span.error = str(e)
+            raise
+        finally:
+            span.total = time.perf_counter() - started
+
+    owned = executor is None
+    executor = executor or ThreadPoolExecutor(max_workers=jobs)
+
+    async def fetch_one(url: str):
+        queued_at = time.perf_counter()
+        host = urlparse(with_origin(url, origin)).netloc
+        host_limit = host_limits.setdefault(host, asyncio.Semaphore(per_host))
+        # Take the host slot first so a busy host doesn't hold global slots idle
+        async with host_limit, global_limit:
+            return await loop.run_in_executor(executor, fetch_in_thread, url, queued_at)
+
+    try:
+        results = await asyncio.gather(*(fetch_one(u) for u in urls), return_exceptions=True)
+    finally:
+        if owned:
+            executor.shutdown()
+
+    return dict(zip(urls, results))
+
+
+async def probe_all(
+    urls: List[str],
+    jobs: int = DEFAULT_JOBS,
+    per_host: int = DEFAULT_PER_HOST,
+    origin: str = "",
+    timeout: float = 10.0,
+) -> Dict[str, Optional[bool]]:
+    """HEAD-probe every URL concurrently (same limits as fetch_all); None where the probe failed (see probe_url)."""
+    loop = asyncio.get_running_loop()
+    global_limit = asyncio.Semaphore(jobs)
+    host_limits: Dict[str, asyncio.Semaphore] = {}
+
+    def probe_in_thread(url: str) -> Optional[bool]:
+        try:
+            return probe_url(thread_session(), with_origin(url, origin), timeout)
+        except requests.RequestException:
+            return None
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+
+        async def probe_one(url: str) -> Optional[bool]:
+            host = urlparse(with_origin(url, origin)).netloc
+            host_limit = host_limits.setdefault(host, asyncio.Semaphore(per_host))
+            async with host_limit, global_limit:
+                return await loop.run_in_executor(executor, probe_in_thread, url)
+
+        results = await asyncio.gather(*(probe_one(u) for u in urls))
+
+    return dict(zip(urls, results))
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+SQLite FTS5 database of the mirrored docs, for ad-hoc querying from other tools.
+
+<base>/_docs.sqlite holds one row per page (each source URL once, see
+llms_corpus.iter_unique_pages, so service is the page's own product and
+categories lists every category of every export that contains it):
+
+    pages       id, source_url, export_url, category, categories, service,
+                title, description, last_updated, sha
+    pages_fts   FTS5 (title, body), rowid = pages.id, porter stemming
+    docs        view joining the two: every pages column plus body
+
+sync() walks the mirror and only touches pages whose sha (or export /
+category placement) changed, deletes pages that disappeared, and does it all
+in one transaction. When the corpus fingerprint matches the last sync the
+walk is skipped entirely. `download_llms_txt.py --fts` runs it after each
+download.
+
+Example queries (sqlite3 _docs.sqlite):
+
+    SELECT title, snippet(pages_fts, 1, '[', ']', '…', 12) FROM pages_fts
+    JOIN pages ON pages.id = pages_fts.rowid
+    WHERE pages_fts MATCH 'durable NEAR(alarm storage)' ORDER BY bm25(pages_fts, 3.0, 1.0) LIMIT 10;
+
+    SELECT service, count(*) FROM pages GROUP BY service;
+
+Usage:
+    python llms_fts.py sync [--base cloudflare_docs] [--full]
+    python llms_fts.py query "durable objects alarms" [--k 10] [--service durable-objects]
+"""
+
+import argparse
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from llms_corpus import corpus_fingerprint, iter_unique_pages
+
+DB_NAME = "_docs.sqlite"
+SCHEMA_VERSION = "2"  # 2: service/categories from every export containing the page
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    id           INTEGER PRIMARY KEY,
+    source_url   TEXT NOT NULL UNIQUE,
+    export_url   TEXT NOT NULL,
+    category     TEXT NOT NULL,
+    categories   TEXT NOT NULL,
+    service      TEXT NOT NULL,
+    title        TEXT NOT NULL DEFAULT '',
+    description  TEXT NOT NULL DEFAULT '',
+    last_updated TEXT NOT NULL DEFAULT '',
+    sha          TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_service ON pages(service);
+CREATE INDEX IF NOT EXISTS pages_category ON pages(category);
+CREATE VIRTUAL TABLE IF NOT EXISTS pages_fts USING fts5(title, body, tokenize = 'porter unicode61');
+CREATE VIEW IF NOT EXISTS docs AS
+    SELECT pages.*, pages_fts.body AS body FROM pages JOIN pages_fts ON pages_fts.rowid = pages.id;
+"""
+
+
+class SearchHit(NamedTuple):
+    score: float
+    title: str
+    source_url: str
+    service: str
+    category: str
+    snippet: str
+
+
+def db_path(base_dir: Path) -> Path:
+    return base_dir / DB_NAME
+
+
+def connect(path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def get_meta(conn: sqlite3.Connection, key: str) -> str:
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else ""
+
+
+def sync(base_dir: Path, path: Optional[Path] = None, full: bool = False) -> Dict[str, float]:
+    """Bring the database in line with the mirror in one transaction; returns counts of what changed."""
+    started = time.perf_counter()
+    stats: Dict[str, float] = {"pages": 0, "added": 0, "updated": 0, "moved": 0, "removed": 0, "unchanged": 0}
+    conn = connect(path or db_path(base_dir))
+    try:
+        fingerprint = corpus_fingerprint(base_dir)
+        if not full and get_meta(conn, "schema") == SCHEMA_VERSION and get_meta(conn, "corpus_sha") == fingerprint:
+            stats["pages"] = conn.execute("SELECT count(*) FROM pages").fetchone()[0]
+            stats["unchanged"] = stats["pages"]
+            stats["seconds"] = time.perf_counter() - started
+            return stats
+
+        with conn:  # one transaction: readers see the previous state until it commits
+            if full:
+                conn.execute("DELETE FROM pages")
+                conn.execute("DELETE FROM pages_fts")
+            existing: Dict[str, Tuple[int, str, Tuple[str, ...]]] = {
+                row[0]: (row[1], row[2], tuple(row[3:]))
+                for row in conn.execute("SELECT source_url, id, sha, export_url, category, categories, service FROM pages")
+            }
+            for export, page in iter_unique_pages(base_dir):
+                source = page.source_html or page.source_md or f"{export.url}#{page.index}"
+                placement = (export.url, export.category, ",".join(export.categories), export.service)
+                fields = (page.title, page.description, page.last_updated, page.sha)
+                stats["pages"] += 1
+                current = existing.pop(source, None)
+                if current is None:
+                    cursor = conn.execute(
+                        "INSERT INTO pages (source_url, export_url, category, categories, service, title, description, "
+                        "last_updated, sha) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (source, *placement, *fields),
+                    )
+                    conn.execute(
+                        "INSERT INTO pages_fts (rowid, title, body) VALUES (?, ?, ?)", (cursor.lastrowid, page.title, page.body)
+                    )
+                    stats["added"] += 1
+                    continue
+                page_id, sha, old_placement = current
+                if sha != page.sha:
+                    conn.execute(
+                        "UPDATE pages SET export_url = ?, category = ?, categories = ?, service = ?, title = ?, "
+                        "description = ?, last_updated = ?, sha = ? WHERE id = ?",
+                        (*placement, *fields, page_id),
+                    )
+                    conn.execute("DELETE FROM pages_fts WHERE rowid = ?", (page_id,))
+                    conn.execute("INSERT INTO pages_fts (rowid, title, body) VALUES (?, ?, ?)", (page_id, page.title, page.body))
+                    stats["updated"] += 1
+                elif old_placement != placement:
+                    conn.execute(
+                        "UPDATE pages SET export_url = ?, category = ?, categories = ?, service = ? WHERE id = ?",
+                        (*placement, page_id),
+                    )
+                    stats["moved"] += 1
+                else:
+                    stats["unchanged"] += 1
+            for page_id, _, _ in existing.values():
+                conn.execute("DELETE FROM pages WHERE id = ?", (page_id,))
+                conn.execute("DELETE FROM pages_fts WHERE rowid = ?", (page_id,))
+                stats["removed"] += 1
+            conn.execute("INSERT OR REPLACE INTO meta VALUES ('schema', ?)", (SCHEMA_VERSION,))
+            conn.execute("INSERT OR REPLACE INTO meta VALUES ('corpus_sha', ?)", (fingerprint,))
+    finally:
+        conn.close()
+    stats["seconds"] = time.perf_counter() - started
+    return stats
+
+
+def search(
+    path: Path, query: str, k: int = 10, service: str = "", category: str = "", raw: bool = False
+) -> List[SearchHit]:
+    """Best-first FTS5 matches (title weighted 3x); query is plain words unless raw (FTS5 syntax)."""
+    if not raw:
+        query = " ".join('"' + word.replace('"', '""') + '"' for word in query.split())
+    sql = (
+        "SELECT bm25(pages_fts, 3.0, 1.0), pages.title, source_url, service, category, "
+        "snippet(pages_fts, 1, '[', ']', '…', 16) FROM pages_fts JOIN pages ON pages.id = pages_fts.rowid "
+        "WHERE pages_fts MATCH ?"
+    )
+    params: List[object] = [query]
+    if service:
+        sql += " AND service = ?"
+        params.append(service)
+    if category:
+        sql += " AND (',' || categories || ',') LIKE ?"
+        params.append(f"%,{category},%")
+    sql += " ORDER BY bm25(pages_fts, 3.0, 1.0) LIMIT ?"
+    params.append(k)
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        # bm25() is lower-is-better; flip the sign so scores read like llms_index.py's
+        return [SearchHit(-row[0], *row[1:]) for row in conn.execute(sql, params)]
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain and query a SQLite FTS5 database of the mirrored docs.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_sync = sub.add_parser("sync", help="Update the database from the mirror")
+    p_sync.add_argument("--base", default="cloudflare_docs", help="Base folder of the mirror (default: cloudflare_docs)")
+    p_sync.add_argument("--full", action="store_true", help="Rebuild every row instead of syncing by page hash")
+    p_query = sub.add_parser("query", help="Full-text search with snippets")
+    p_query.add_argument("query")
+    p_query.add_argument("--base", default="cloudflare_docs", help="Base folder of the mirror (default: cloudflare_docs)")
+    p_query.add_argument("--k", type=int, default=10, help="Number of results")
+    p_query.add_argument("--service", default="", help="Only pages from this service")
+    p_query.add_argument("--category", default="", help="Only pages mirrored into this category")
+    p_query.add_argument("--raw", action="store_true", help="Pass the query through as FTS5 syntax (AND/OR/NEAR, prefix*)")
+    args = parser.parse_args()
+
+    base_dir = Path(args.base)
+    path = db_path(base_dir)
+    if args.command == "sync":
+        stats = sync(base_dir, path, args.full)
+        print(
+            f"Synced {stats['pages']} pages: added={stats['added']}, updated={stats['updated']}, moved={stats['moved']}, "
+            f"removed={stats['removed']}, unchanged={stats['unchanged']} in {stats['seconds']:.2f}s -> {path}"
+        )
+        return
+
+    if not path.exists():
+        raise SystemExit(f"No database at {path}; run: python llms_fts.py sync --base {base_dir}")
+    started = time.perf_counter()
+    hits = search(path, args.query, args.k, args.service, args.category, args.raw)
+    elapsed = time.perf_counter() - started
+    for hit in hits:
+        print(f"{hit.score:7.2f}  {hit.title}\n         {hit.source_url}\n         {hit.snippet}")
+    print(f"{len(hits)} hits in {elapsed * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
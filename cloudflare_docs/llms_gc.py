@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Retention policy and garbage collector for the `_archive/` directories.
+
+Every archived version of every export is kept if any rule keeps it:
+
+    --keep-last N     the N newest versions of each file
+    --daily D         the newest version of each day, for the last D days
+    --weekly W        the newest version of each ISO week, for the last W weeks
+    --monthly M       the newest version of each month, for the last M months
+
+so "--keep-last 3 --daily 7 --weekly 8" keeps a week of dailies, then two
+months of weeklies. --max-bytes then caps the archives plus the object store
+(--object-store blobs, after sweeping unreferenced ones; see llms_objects.py)
+by dropping the oldest kept versions across all files, but never a file's
+newest archived version. --compact zstd recompresses the versions that
+stay (legacy uncompressed or gzip copies). Everything else is deleted in
+one pass, manifest rows included, and the space reclaimed is reported.
+
+Uncompressed archives can be hardlinks shared with generation snapshots or
+blobs (st_nlink > 1): deleting one frees nothing, so they count as neither
+kept nor reclaimed bytes.
+
+The collector holds the mirror lock (llms_lock.py) while it plans and
+deletes, so it can run from cron next to a downloader or a --watch daemon:
+whichever comes second waits for the other to finish.
+
+Usage:
+    python llms_gc.py --keep-last 3 --daily 7 --weekly 8 [--max-bytes 200M] [--compact zstd] [--dry-run]
+"""
+
+import argparse
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Set, Tuple
+
+from llms_archive import ArchivedVersion, available_codecs, list_versions, recompress
+from llms_corpus import is_mirror_dir
+from llms_lock import MirrorBusy, mirror_lock
+from llms_manifest import Manifest
+from llms_objects import objects_size, sweep_objects
+
+ARCHIVE_NAME_RE = re.compile(r"^(?P<stem>.+?)\.\d{8}-\d{6}[+-]\d{4}(?P<suffix>\.[^.]+)(?:\.gz|\.zst)?$")
+SIZE_UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3}
+
+
+class Policy(NamedTuple):
+    keep_last: int = 0
+    daily: int = 0
+    weekly: int = 0
+    monthly: int = 0
+    max_bytes: int = 0
+
+    def describe(self) -> str:
+        rules = [f"{name.replace('_', '-')}={value}" for name, value in self._asdict().items() if value]
+        return " ".join(rules) or "none"
+
+
+class Version(NamedTuple):
+    current: Path  # the export this is a version of
+    path: Path
+    archived_at: datetime
+    codec: str
+    size: int
+    shared: bool  # other links hold the same inode: removing this path frees nothing
+
+    @property
+    def own_bytes(self) -> int:
+        return 0 if self.shared else self.size
+
+
+def parse_size(value: str) -> int:
+    """"200M" -> bytes (K/M/G are powers of 1024)."""
+    m = re.fullmatch(r"(\d+(?:\.\d+)?)\s*([KMG]?)I?B?", value.strip().upper())
+    if not m:
+        raise ValueError(f"not a size: {value!r}")
+    return int(float(m.group(1)) * SIZE_UNITS[m.group(2)])
+
+
+def iter_archived(base_dir: Path) -> Dict[Path, List[Version]]:
+    """Current export path -> its archived versions, oldest first, for every _archive/ in the mirror."""
+    found: Dict[Path, List[Version]] = {}
+    for cat_dir in sorted(p for p in base_dir.iterdir() if is_mirror_dir(p)):
+        for service_dir in sorted(p for p in cat_dir.iterdir() if is_mirror_dir(p)):
+            archive_dir = service_dir / "_archive"
+            if not archive_dir.is_dir():
+                continue
+            currents = set()
+            for path in archive_dir.iterdir():
+                m = ARCHIVE_NAME_RE.match(path.name)
+                if m:
+                    currents.add(service_dir / f"{m.group('stem')}{m.group('suffix')}")
+            for current in sorted(currents):
+                found[current] = [to_version(current, v) for v in list_versions(current)]
+    return found
+
+
+def to_version(current: Path, version: ArchivedVersion) -> Version:
+    st = version.path.stat()
+    return Version(current, version.path, version.archived_at, version.codec, st.st_size, st.st_nlink > 1)
+
+
+def _months(d: datetime) -> int:
+    return d.year * 12 + d.month
+
+
+# (policy field, bucket of a timestamp, age of a timestamp in that rule's units relative to now)
+RULES: List[Tuple[str, Callable[[datetime], object], Callable[[datetime, datetime], int]]] = [
+    ("daily", lambda d: d.date(), lambda d, now: (now.date() - d.date()).days),
+    ("weekly", lambda d: d.isocalendar()[:2], lambda d, now: (now.date() - d.date()).days // 7),
+    ("monthly", lambda d: (d.year, d.month), lambda d, now: _months(now) - _months(d)),
+]
+
+
+def keep_by_policy(versions: List[Version], policy: Policy, now: datetime) -> Set[Path]:
+    """Versions (oldest first) of one file that the per-file rules keep."""
+    keep = {v.path for v in versions[len(versions) - policy.keep_last :]} if policy.keep_last else set()
+    newest_first = versions[::-1]
+    for field, bucket, age in RULES:
+        count = getattr(policy, field)
+        if not count:
+            continue
+        seen = set()
+        for v in newest_first:
+            local = v.archived_at.astimezone(now.tzinfo)
+            key = bucket(local)
+            if age(local, now) < count and key not in seen:
+                seen.add(key)
+                keep.add(v.path)
+    return keep
+
+
+def plan(archived: Dict[Path, List[Version]], policy: Policy, now: datetime, fixed_bytes: int = 0) -> Dict[str, object]:
+    """Split every version into keep / delete; fixed_bytes (the object store) counts against --max-bytes too."""
+    per_file_rules = policy.keep_last or policy.daily or policy.weekly or policy.monthly
+    keep: List[Version] = []
+    delete: List[Version] = []
+    for versions in archived.values():
+        kept = keep_by_policy(versions, policy, now) if per_file_rules else {v.path for v in versions}
+        for v in versions:
+            (keep if v.path in kept else delete).append(v)
+
+    over_budget = 0
+    if policy.max_bytes:
+        total = sum(v.own_bytes for v in keep) + fixed_bytes
+        newest = {versions[-1].path for versions in archived.values() if versions}
+        # Oldest first across all files; a file's newest archived version is never dropped for space
+        for v in sorted(keep, key=lambda v: v.archived_at):
+            if total <= policy.max_bytes:
+                break
+            if v.path in newest:
+                continue
+            keep.remove(v)
+            delete.append(v)
+            total -= v.own_bytes
+        over_budget = max(0, total - policy.max_bytes)
+
+    return {
+        "keep": keep,
+        "delete": delete,
+        "kept_bytes": sum(v.own_bytes for v in keep),
+        "deleted_bytes": sum(v.own_bytes for v in delete),
+        "over_budget": over_budget,
+    }
+
+
+def collect(
+    base_dir: Path, policy: Policy, compact: str = "", dry_run: bool = False, verbose: bool = False
+) -> Dict[str, object]:
+    """Apply policy to every archive under base_dir; returns the plan plus what was done."""
+    now = datetime.now().astimezone()
+    swept = sweep_objects(base_dir, dry_run)
+    archived = iter_archived(base_dir)
+    objects = objects_size(base_dir) - (swept["bytes"] if dry_run else 0)
+    result = plan(archived, policy, now, objects)
+    to_compact = [v for v in result["keep"] if compact and v.codec != compact]
+    result.update(
+        files=len(archived), compacted=0, compact_saved=0, objects_bytes=objects, objects_swept=swept["bytes"]
+    )
+    if verbose:
+        deleted_by_file: Dict[Path, List[Version]] = {}
+        for v in result["delete"]:
+            deleted_by_file.setdefault(v.current, []).append(v)
+        for current, versions in sorted(archived.items()):
+            gone = deleted_by_file.get(current, [])
+            print(
+                f"  {current.relative_to(base_dir)}: {len(versions)} versions, keep {len(versions) - len(gone)}, "
+                f"delete {len(gone)} ({sum(v.size for v in gone):,} bytes)"
+            )
+    if dry_run:
+        result["compacted"] = len(to_compact)
+        return result
+
+    with Manifest(base_dir) as manifest:
+        for v in result["delete"]:
+            v.path.unlink(missing_ok=True)
+            manifest.delete_archive(v.path)
+        for v in to_compact:
+            new_path = recompress(v.path, compact)
+            manifest.move_archive(v.path, new_path)
+            result["compacted"] += 1
+            result["compact_saved"] += v.own_bytes - new_path.stat().st_size
+        manifest.commit()
+    result["kept_bytes"] -= result["compact_saved"]
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply a retention policy to the _archive/ versions of the mirror.")
+    parser.add_argument("--base", default="cloudflare_docs", help="Base folder of the mirror (default: cloudflare_docs)")
+    parser.add_argument("--keep-last", type=int, default=0, help="Keep the N newest versions of each file")
+    parser.add_argument("--daily", type=int, default=0, help="Keep the newest version per day for the last D days")
+    parser.add_argument("--weekly", type=int, default=0, help="Keep the newest version per ISO week for the last W weeks")
+    parser.add_argument("--monthly", type=int, default=0, help="Keep the newest version per month for the last M months")
+    parser.add_argument("--max-bytes", default="", help="Cap on kept archives plus the object store, e.g. 200M or 2G")
+    parser.add_argument("--compact", choices=[c for c in available_codecs() if c != "none"], default="", help="Recompress kept versions with this codec")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be deleted without touching anything")
+    parser.add_argument("--wait", type=float, default=None, help="Seconds to wait for a running fetch (default: forever)")
+    parser.add_argument("--verbose", action="store_true", help="Report every file")
+    args = parser.parse_args()
+
+    try:
+        max_bytes = parse_size(args.max_bytes) if args.max_bytes else 0
+    except ValueError as e:
+        parser.error(str(e))
+    policy = Policy(args.keep_last, args.daily, args.weekly, args.monthly, max_bytes)
+    if min(policy) < 0:
+        parser.error("retention counts must be >= 0")
+    if not any(policy) and not args.compact:
+        parser.error("give at least one of --keep-last, --daily, --weekly, --monthly, --max-bytes or --compact")
+
+    base_dir = Path(args.base)
+    print(f"[gc] policy: {policy.describe()}{f' compact={args.compact}' if args.compact else ''}")
+    try:
+        if args.dry_run:
+            result = collect(base_dir, policy, args.compact, dry_run=True, verbose=args.verbose)
+        else:
+            with mirror_lock(base_dir, "llms_gc.py", args.wait):
+                result = collect(base_dir, policy, args.compact, verbose=args.verbose)
+    except MirrorBusy as e:
+        raise SystemExit(f"[gc] {e}")
+
+    kept, deleted = result["keep"], result["delete"]
+    print(
+        f"{'Dry run' if args.dry_run else 'Done'}. files={result['files']}, kept={len(kept)} ({result['kept_bytes']:,} bytes), "
+        f"deleted={len(deleted)}, reclaimed={result['deleted_bytes'] + result['compact_saved'] + result['objects_swept']:,} bytes, "
+        f"compacted={result['compacted']}, objects={result['objects_bytes']:,} bytes"
+    )
+    if result["over_budget"]:
+        print(f"[warn] still {result['over_budget']:,} bytes over --max-bytes: newest versions and linked objects are never dropped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Staged, batched writes to the mirror tree, committed as numbered generations.
+
+download_llms_txt.py no longer rewrites exports in place. Each run opens a
+Batch: every new export is written to a staged file next to its target
+(.<name>.gen<N>.staged), the staged files are fsynced together once the
+write phase is done, and commit() renames them over their targets back to
+back, fsyncs each touched directory once, and only then publishes
+generation N:
+
+    _generations/<N>/<category>/<service>/<file>.txt   hardlinks to the exports
+    _generations/CURRENT                              "N", replaced atomically
+
+A crash before commit() leaves every current file untouched (stale staged
+files are cleared by the next Batch); a crash during the renames leaves
+CURRENT on the previous generation, whose snapshot is intact. Because a
+committed file is never modified in place, a snapshot costs a directory
+of hardlinks, not a copy.
+
+Readers that need a consistent corpus (indexers, exports, ad-hoc scripts)
+pin a generation instead of taking the mirror lock: pinned() holds a shared
+flock on the generation's .pin file, and pruning skips pinned generations.
+Every tool that takes --base works on a snapshot directory.
+
+Usage:
+    python llms_generation.py list [--base cloudflare_docs]
+    python llms_generation.py path [--base cloudflare_docs] [--generation N]   # print the snapshot dir
+    python llms_generation.py exec -- python llms_packed.py build --base '$LLMS_BASE' --out corpus.llmpack
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from llms_corpus import is_mirror_dir
+
+try:
+    import fcntl
+except ImportError:  # not POSIX: pins are not enforced
+    fcntl = None
+
+GENERATIONS_DIR = "_generations"
+CURRENT_NAME = "CURRENT"
+INFO_NAME = "GENERATION.json"
+PIN_NAME = ".pin"
+STAGED_SUFFIX = ".staged"
+DEFAULT_KEEP = 3
+
+
+def generations_dir(base_dir: Path) -> Path:
+    return base_dir / GENERATIONS_DIR
+
+
+def generation_dir(base_dir: Path, generation: int) -> Path:
+    return generations_dir(base_dir) / str(generation)
+
+
+def current_generation(base_dir: Path) -> int:
+    """The last committed generation, 0 if none."""
+    try:
+        return int((generations_dir(base_dir) / CURRENT_NAME).read_text(encoding="utf-8").strip())
+    except (FileNotFoundError, ValueError):
+        return 0
+
+
+def list_generations(base_dir: Path) -> List[int]:
+    root = generations_dir(base_dir)
+    if not root.is_dir():
+        return []
+    return sorted(int(p.name) for p in root.iterdir() if p.is_dir() and p.name.isdigit())
+
+
+def fsync_path(path: Path) -> None:
+    """fsync a file or a directory (the latter makes renames and new entries durable)."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def iter_tree_files(base_dir: Path) -> Iterator[Path]:
+    """Every export in the live tree: <base>/<category>/<service>/*.txt."""
+    for cat_dir in sorted(p for p in base_dir.iterdir() if is_mirror_dir(p)):
+        for service_dir in sorted(p for p in cat_dir.iterdir() if is_mirror_dir(p)):
+            yield from sorted(service_dir.glob("*.txt"))
+
+
+def _write_atomic(path: Path, text: str, durable: bool) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        f.write(text)
+        if durable:
+            f.flush()
+            os.fsync(f.fileno())
+    tmp.replace(path)
+
+
+def snapshot(base_dir: Path, generation: int, info: dict, durable: bool = True) -> Tuple[Path, int]:
+    """Hardlink the live tree into _generations/<generation>/ (copy where links fail); returns (dir, files)."""
+    root = generations_dir(base_dir)
+    tmp = root / f".{generation}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    files = 0
+    dirs = set()
+    for path in iter_tree_files(base_dir):
+        dest = tmp / path.relative_to(base_dir)
+        if dest.parent not in dirs:
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            dirs.add(dest.parent)
+        try:
+            os.link(path, dest)
+        except OSError:
+            shutil.copyfile(path, dest)
+        files += 1
+    tmp.mkdir(parents=True, exist_ok=True)
+    (tmp / PIN_NAME).touch()
+    _write_atomic(tmp / INFO_NAME, json.dumps({**info, "generation": generation, "files": files}, indent=2) + "\n", durable)
+    if durable:
+        # Links are metadata only: syncing the directories makes the snapshot durable
+        for d in sorted(dirs, key=lambda p: -len(p.parts)):
+            fsync_path(d)
+        fsync_path(tmp)
+    final = generation_dir(base_dir, generation)
+    shutil.rmtree(final, ignore_errors=True)
+    tmp.rename(final)
+    return final, files
+
+
+def publish(base_dir: Path, generation: int, durable: bool = True) -> None:
+    root = generations_dir(base_dir)
+    _write_atomic(root / CURRENT_NAME, f"{generation}\n", durable)
+    if durable:
+        fsync_path(root)
+
+
+def prune(base_dir: Path, keep: int) -> List[int]:
+    """Remove all but the newest keep generations, skipping pinned ones; returns the removed numbers."""
+    removed = []
+    for generation in list_generations(base_dir)[:-keep] if keep else list_generations(base_dir):
+        if generation == current_generation(base_dir):
+            continue
+        path = generation_dir(base_dir, generation)
+        with (path / PIN_NAME).open("a+") as pin:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(pin, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue
+            # Out of the numbered namespace first, so a reader resolving it now finds it gone
+            trash = path.with_name(f".{generation}.trash")
+            path.rename(trash)
+        shutil.rmtree(trash, ignore_errors=True)
+        removed.append(generation)
+    return removed
+
+
+@contextmanager
+def pinned(base_dir: Path, generation: Optional[int] = None) -> Iterator[Path]:
+    """
+    Yield the snapshot dir of a generation (the current one by default) and keep
+    prune() away from it until the block exits. Raises FileNotFoundError if it is gone.
+    """
+    for _ in range(3):
+        number = generation or current_generation(base_dir)
+        path = generation_dir(base_dir, number)
+        if not number or not path.is_dir():
+            break
+        try:
+            pin = (path / PIN_NAME).open("r")
+        except FileNotFoundError:
+            continue  # pruned between resolving and opening: resolve again
+        with pin:
+            if fcntl is not None:
+                fcntl.flock(pin, fcntl.LOCK_SH)
+            if (path / PIN_NAME).exists():
+                yield path
+                return
+        if generation:
+            break
+    raise FileNotFoundError(f"no generation {generation or 'committed'} under {generations_dir(base_dir)}")
+
+
+class Batch:
+    """One run's staged replacements of mirror files, committed together as the next generation."""
+
+    def __init__(self, base_dir: Path, durable: bool = True):
+        self.base_dir = base_dir
+        self.durable = durable
+        self.generation = max([current_generation(base_dir), *list_generations(base_dir)]) + 1
+        self.staged: Dict[Path, Path] = {}  # target -> staged file
+        self.timings: Dict[str, float] = {}
+        self.cleared = self.clear_stale()
+
+    def clear_stale(self) -> int:
+        """Staged files and snapshot dirs left by a run that died before committing."""
+        cleared = 0
+        if not self.base_dir.is_dir():
+            return cleared
+        for cat_dir in (p for p in self.base_dir.iterdir() if is_mirror_dir(p)):
+            for service_dir in (p for p in cat_dir.iterdir() if is_mirror_dir(p)):
+                for path in service_dir.glob(f".*{STAGED_SUFFIX}"):
+                    path.unlink(missing_ok=True)
+                    cleared += 1
+        root = generations_dir(self.base_dir)
+        if root.is_dir():
+            for path in root.glob(".*"):
+                if path.is_dir():
+                    shutil.rmtree(path, ignore_errors=True)
+        return cleared
+
+    def stage(self, target: Path) -> Path:
+        """Path to write target's new content to; it replaces target on commit()."""
+        staged = target.with_name(f".{target.name}.gen{self.generation}{STAGED_SUFFIX}")
+        staged.unlink(missing_ok=True)
+        self.staged[target] = staged
+        return staged
+
+    def discard(self, target: Path) -> None:
+        staged = self.staged.pop(target, None)
+        if staged is not None:
+            staged.unlink(missing_ok=True)
+
+    def abort(self) -> None:
+        for target in list(self.staged):
+            self.discard(target)
+
+    def _lap(self, name: str, start: float) -> float:
+        now = time.perf_counter()
+        self.timings[name] = self.timings.get(name, 0.0) + now - start
+        return now
+
+    def sync(self) -> None:
+        """fsync every staged file, in one pass after all of them are written."""
+        start = time.perf_counter()
+        if self.durable:
+            for staged in self.staged.values():
+                fsync_path(staged)
+        self._lap("fsync", start)
+
+    def commit(self, keep: int = DEFAULT_KEEP, info: Optional[dict] = None) -> Optional[Path]:
+        """
+        Rename every staged file over its target, then snapshot and publish the
+        generation (unless keep is 0) and prune old ones. Returns the snapshot dir.
+        """
+        self.sync()
+        start = time.perf_counter()
+        parents = set()
+        for target, staged in self.staged.items():
+            staged.replace(target)
+            parents.add(target.parent)
+        if self.durable:
+            for parent in parents:
+                fsync_path(parent)
+        start = self._lap("rename", start)
+        committed = len(self.staged)
+        self.staged = {}
+        if not keep:
+            return None
+
+        generations_dir(self.base_dir).mkdir(exist_ok=True)
+        info = {"committed_at": datetime.now().astimezone().isoformat(), "changed": committed, **(info or {})}
+        path, _ = snapshot(self.base_dir, self.generation, info, self.durable)
+        publish(self.base_dir, self.generation, self.durable)
+        start = self._lap("snapshot", start)
+        prune(self.base_dir, keep)
+        self._lap("prune", start)
+        return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect and pin the committed generations of the mirror.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_list = sub.add_parser("list", help="List the kept generations")
+    p_path = sub.add_parser("path", help="Print the snapshot directory of a generation")
+    p_path.add_argument("--generation", type=int, default=0, help="Generation (default: current)")
+    p_exec = sub.add_parser("exec", help="Run a command with a generation pinned; $LLMS_BASE is its snapshot dir")
+    p_exec.add_argument("--generation", type=int, default=0, help="Generation (default: current)")
+    for p in (p_list, p_path, p_exec):
+        p.add_argument("--base", default="cloudflare_docs", help="Base folder of the mirror (default: cloudflare_docs)")
+    p_exec.add_argument("cmd", nargs=argparse.REMAINDER, help="Command (after --), run through the shell")
+    args = parser.parse_args()
+
+    base_dir = Path(args.base)
+    if args.command == "list":
+        current = current_generation(base_dir)
+        for generation in list_generations(base_dir):
+            info_path = generation_dir(base_dir, generation) / INFO_NAME
+            info = json.loads(info_path.read_text(encoding="utf-8")) if info_path.exists() else {}
+            print(
+                f"{'*' if generation == current else ' '} {generation:>6}  {info.get('committed_at', '-')}  "
+                f"files={info.get('files', '?')}  changed={info.get('changed', '?')}"
+            )
+        return
+
+    try:
+        with pinned(base_dir, args.generation or None) as path:
+            if args.command == "path":
+                print(path)
+                return
+            cmd = args.cmd[1:] if args.cmd[:1] == ["--"] else args.cmd
+            if not cmd:
+                parser.error("exec needs a command")
+            env = {**os.environ, "LLMS_BASE": str(path), "LLMS_GENERATION": path.name}
+            code = subprocess.run(" ".join(cmd), shell=True, env=env).returncode
+    except FileNotFoundError as e:
+        raise SystemExit(str(e))
+    raise SystemExit(code)
+
+
+if __name__ == "__main__":
+    main()
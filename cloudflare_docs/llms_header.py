@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+The metadata block download_llms_txt.py writes at the top of every export:
+
+    # --- METADATA ---
+    # Source-URL: https://developers.cloudflare.com/workers/llms-full.txt
+    # Category: core_context_pack
+    # ...
+    # Content-SHA256: <hex>
+    # --- END METADATA ---
+
+build_header() writes it; parse_header()/read_header() read it back.
+"""
+
+import re
+from pathlib import Path
+from typing import BinaryIO, Dict, Tuple
+
+ARTIFACT_DESCRIPTIONS = {
+    "llms-full": "LLM-optimized full context export of the docs",
+    "llms": "LLM-optimized brief context export",
+    "prompt": "Base prompt template for Workers docs",
+}
+
+HEADER_START = "# --- METADATA ---"
+HEADER_END = "# --- END METADATA ---"
+CONTENT_SHA_KEY = "Content-SHA256"
+
+
+def service_title(service: str) -> str:
+    if service == "root":
+        return "Developers (root)"
+    return service.replace("-", " ").title()
+
+
+def artifact_description(artifact: str) -> str:
+    return ARTIFACT_DESCRIPTIONS.get(artifact, artifact.replace("-", " ").title())
+
+
+def build_header(
+    url: str,
+    category: str,
+    service: str,
+    artifact: str,
+    retrieved_at: str,
+    content_sha: str,
+    last_modified: str = "",
+    etag: str = "",
+) -> str:
+    lines = [
+        HEADER_START,
+        f"# Source-URL: {url}",
+    ]
+    # Shared object-store blobs omit the category; it is implied by each linked path
+    if category:
+        lines.append(f"# Category: {category}")
+    lines += [
+        f"# Service: {service} ({service_title(service)})",
+        f"# Artifact: {artifact} — {artifact_description(artifact)}",
+        f"# Retrieved-At: {retrieved_at}",
+        f"# {CONTENT_SHA_KEY}: {content_sha}",
+    ]
+    if last_modified:
+        lines.append(f"# HTTP-Last-Modified: {last_modified}")
+    if etag:
+        lines.append(f"# HTTP-ETag: {etag}")
+    lines.append(HEADER_END)
+    return "\n".join(lines) + "\n\n"
+
+
+def parse_header(f: BinaryIO) -> Tuple[Dict[str, str], int]:
+    """
+    Parse the metadata block written by build_header() from the start of a binary stream.
+    Returns (fields, body_offset): fields maps e.g. "HTTP-ETag" -> value and
+    body_offset is the byte offset where the fetched content starts (0 if no header).
+    """
+    fields: Dict[str, str] = {}
+    first = f.readline()
+    if first.decode("utf-8", "replace").strip() != HEADER_START:
+        return {}, 0
+    offset = len(first)
+    for raw in iter(f.readline, b""):
+        offset += len(raw)
+        line = raw.decode("utf-8", "replace").rstrip("\n")
+        if HEADER_END in line:
+            # build_header() terminates the block with one blank line
+            return fields, offset + len(f.readline())
+        m = re.match(r"#\s*([A-Za-z0-9-]+):\s?(.*)$", line)
+        if m:
+            fields[m.group(1)] = m.group(2).strip()
+    return {}, 0
+
+
+def read_header(file_path: Path) -> Tuple[Dict[str, str], int]:
+    if not file_path.exists():
+        return {}, 0
+    try:
+        with file_path.open("rb") as f:
+            return parse_header(f)
+    except Exception:
+        return {}, 0
@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+BM25 inverted index over the <page> records of the mirror.
+
+build_index() streams every page once (see llms_corpus.iter_unique_pages),
+tokenizes title + description + body and writes a single read-only file,
+<base>/_index/bm25.idx:
+
+    header      magic, version, counts, avgdl, corpus fingerprint, build
+                parameters digest, section offsets
+    doclens     uint32 per page (token count)
+    terms       sorted term dictionary: uint32 offsets + utf-8 blob
+    postings    uint64 offsets + uint32 df per term, then per term a varint
+                stream of (doc id delta, tf) pairs
+    docs        uint64 offsets + one JSON record per page (url, title, file span)
+
+BM25Index memory-maps the file; a query binary-searches the term dictionary,
+decodes only the postings of its own terms and reads metadata only for the
+top-k pages, so opening and querying stay cheap regardless of corpus size.
+open_current_index() rebuilds the file first when the mirror has changed
+since it was written (llms_corpus.corpus_fingerprint) or when it was built
+with other parameters (category filter, --skip-near-duplicates).
+
+Usage:
+    python llms_index.py build [--base cloudflare_docs] [--category ai_and_rag]
+    python llms_index.py query "durable objects alarms" [-k 10]
+"""
+
+import argparse
+import hashlib
+import heapq
+import json
+import math
+import mmap
+import re
+import struct
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from llms_corpus import corpus_fingerprint, iter_unique_pages
+
+INDEX_DIR = "_index"
+INDEX_NAME = "bm25.idx"
+MAGIC = b"LLBM"
+VERSION = 3
+# magic, version, n_docs, n_terms, avgdl, corpus fingerprint, build parameters digest, then offsets
+# of doclens, term offsets, term blob, postings offsets, dfs, postings, doc offsets, doc blob
+HEADER = struct.Struct("<4sIIId32s32s8Q")
+
+TITLE_WEIGHT = 3  # title tokens count this many times toward tf
+K1 = 1.2
+B = 0.75
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by can for from has have if in into is it its of on or that the their then "
+    "there these this to was were will with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if len(t) > 1 and t not in STOPWORDS]
+
+
+def encode_varint(n: int, out: bytearray) -> None:
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def decode_postings(buf, start: int, end: int) -> Iterable[Tuple[int, int]]:
+    """Yield (doc id, tf) from the varint stream buf[start:end]."""
+    doc = 0
+    pos = start
+    first = True
+    while pos < end:
+        # doc id delta
+        b = buf[pos]
+        pos += 1
+        delta = b & 0x7F
+        shift = 7
+        while b & 0x80:
+            b = buf[pos]
+            pos += 1
+            delta |= (b & 0x7F) << shift
+            shift += 7
+        # tf
+        b = buf[pos]
+        pos += 1
+        tf = b & 0x7F
+        shift = 7
+        while b & 0x80:
+            b = buf[pos]
+            pos += 1
+            tf |= (b & 0x7F) << shift
+            shift += 7
+        doc = delta if first else doc + delta
+        first = False
+        yield doc, tf
+
+
+class Hit(NamedTuple):
+    score: float
+    doc_id: int
+    url: str
+    title: str
+    source: str  # source_html / source_md of the page, if any
+    path: str  # export file, relative to the mirror base
+    offset: int  # byte span of the <page> block in that file
+    length: int
+
+
+def index_path(base_dir: Path) -> Path:
+    return base_dir / INDEX_DIR / INDEX_NAME
+
+
+def params_fingerprint(categories: Optional[List[str]] = None, skip_near_duplicates: bool = False) -> str:
+    """SHA-256 of the parameters that change which pages an index covers."""
+    params = {"categories": sorted(categories) if categories else None, "skip_near_duplicates": skip_near_duplicates}
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def build_index(
+    base_dir: Path,
+    out_path: Optional[Path] = None,
+    categories: Optional[List[str]] = None,
+    skip_near_duplicates: bool = False,
+) -> Dict[str, float]:
+    """Index every page under base_dir and write the index atomically. Returns build stats."""
+    out_path = out_path or index_path(base_dir)
+    started = time.perf_counter()
+    corpus_sha = corpus_fingerprint(base_dir, categories)
+    params_sha = params_fingerprint(categories, skip_near_duplicates)
+
+    postings: Dict[str, bytearray] = {}
+    last_doc: Dict[str, int] = {}
+    dfs: Dict[str, int] = {}
+    doclens = array("I")
+    doc_blob = bytearray()
+    doc_offsets = array("Q")
+    source_bytes = 0
+
+    for export, page in iter_unique_pages(base_dir, categories, skip_near_duplicates):
+        doc_id = len(doclens)
+        counts: Dict[str, int] = {}
+        for token in tokenize(page.title):
+            counts[token] = counts.get(token, 0) + TITLE_WEIGHT
+        for token in tokenize(page.description):
+            counts[token] = counts.get(token, 0) + 1
+        for token in tokenize(page.body):
+            counts[token] = counts.get(token, 0) + 1
+        doclens.append(sum(counts.values()))
+        source_bytes += page.length
+
+        for term, tf in counts.items():
+            out = postings.get(term)
+            if out is None:
+                out = postings[term] = bytearray()
+                encode_varint(doc_id, out)
+                dfs[term] = 1
+            else:
+                encode_varint(doc_id - last_doc[term], out)
+                dfs[term] += 1
+            encode_varint(tf, out)
+            last_doc[term] = doc_id
+
+        doc_offsets.append(len(doc_blob))
+        doc_blob += json.dumps(
+            [
+                export.url,
+                page.title,
+                page.source_html or page.source_md,
+                export.path.relative_to(base_dir).as_posix(),
+                page.offset,
+                page.length,
+            ],
+            ensure_ascii=False,
+        ).encode("utf-8")
+    doc_offsets.append(len(doc_blob))
+
+    terms = sorted(postings)
+    term_offsets = array("I")
+    term_blob = bytearray()
+    post_offsets = array("Q")
+    df_array = array("I")
+    post_blob = bytearray()
+    for term in terms:
+        term_offsets.append(len(term_blob))
+        term_blob += term.encode("utf-8")
+        post_offsets.append(len(post_blob))
+        df_array.append(dfs[term])
+        post_blob += postings[term]
+    term_offsets.append(len(term_blob))
+    post_offsets.append(len(post_blob))
+
+    n_docs = len(doclens)
+    avgdl = sum(doclens) / n_docs if n_docs else 0.0
+    # Every section is 8-byte aligned so the arrays can be cast straight off the mmap
+    sections = [doclens, term_offsets, term_blob, post_offsets, df_array, post_blob, doc_offsets, doc_blob]
+    offsets = []
+    pos = HEADER.size
+    for section in sections:
+        pos += -pos % 8
+        offsets.append(pos)
+        pos += len(section) * (section.itemsize if isinstance(section, array) else 1)
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out_path.with_name(out_path.name + ".tmp")
+    with tmp.open("wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, n_docs, len(terms), avgdl, bytes.fromhex(corpus_sha), bytes.fromhex(params_sha), *offsets))
+        for offset, section in zip(offsets, sections):
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(section.tobytes() if isinstance(section, array) else section)
+    tmp.replace(out_path)
+
+    return {
+        "docs": n_docs,
+        "terms": len(terms),
+        "source_bytes": source_bytes,
+        "index_bytes": out_path.stat().st_size,
+        "postings_bytes": len(post_blob),
+        "seconds": time.perf_counter() - started,
+    }
+
+
+class BM25Index:
+    """Read-only view of an index file; cheap to open, safe to share between threads."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        with path.open("rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mm) < HEADER.size or self._mm[:4] != MAGIC:
+            raise ValueError(f"{path}: not a BM25 index")
+        magic, version, self.n_docs, self.n_terms, self.avgdl, corpus_sha, params_sha, *offsets = HEADER.unpack_from(self._mm, 0)
+        if version != VERSION:
+            raise ValueError(f"{path}: BM25 index version {version}, expected {VERSION}")
+        self.corpus_sha = corpus_sha.hex()
+        self.params_sha = params_sha.hex()
+        doclens_at, term_offsets_at, terms_at, post_offsets_at, dfs_at, postings_at, doc_offsets_at, docs_at = offsets
+        view = memoryview(self._mm)
+        self._doclens = view[doclens_at : doclens_at + 4 * self.n_docs].cast("I")
+        self._term_offsets = view[term_offsets_at : term_offsets_at + 4 * (self.n_terms + 1)].cast("I")
+        self._terms_at = terms_at
+        self._post_offsets = view[post_offsets_at : post_offsets_at + 8 * (self.n_terms + 1)].cast("Q")
+        self._dfs = view[dfs_at : dfs_at + 4 * self.n_terms].cast("I")
+        self._postings_at = postings_at
+        self._doc_offsets = view[doc_offsets_at : doc_offsets_at + 8 * (self.n_docs + 1)].cast("Q")
+        self._docs_at = docs_at
+
+    def close(self) -> None:
+        for name in ("_doclens", "_term_offsets", "_post_offsets", "_dfs", "_doc_offsets"):
+            getattr(self, name).release()
+        self._mm.close()
+
+    def __enter__(self) -> "BM25Index":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _term(self, i: int) -> bytes:
+        return self._mm[self._terms_at + self._term_offsets[i] : self._terms_at + self._term_offsets[i + 1]]
+
+    def term_id(self, term: str) -> int:
+        """Binary search of the sorted term dictionary; -1 if absent."""
+        key = term.encode("utf-8")
+        lo, hi = 0, self.n_terms
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._term(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo if lo < self.n_terms and self._term(lo) == key else -1
+
+    def postings(self, term_id: int) -> Iterable[Tuple[int, int]]:
+        start = self._postings_at + self._post_offsets[term_id]
+        end = self._postings_at + self._post_offsets[term_id + 1]
+        return decode_postings(self._mm, start, end)
+
+    def doc(self, doc_id: int) -> list:
+        start = self._docs_at + self._doc_offsets[doc_id]
+        end = self._docs_at + self._doc_offsets[doc_id + 1]
+        return json.loads(self._mm[start:end])
+
+    def search(self, query: str, k: int = 10) -> List[Hit]:
+        scores: Dict[int, float] = {}
+        doclens = self._doclens
+        norm = K1 / self.avgdl if self.avgdl else 0.0
+        for term in dict.fromkeys(tokenize(query)):
+            term_id = self.term_id(term)
+            if term_id < 0:
+                continue
+            df = self._dfs[term_id]
+            idf = math.log(1 + (self.n_docs - df + 0.5) / (df + 0.5))
+            base = K1 * (1 - B)
+            scale = norm * B
+            for doc_id, tf in self.postings(term_id):
+                s = idf * tf * (K1 + 1) / (tf + base + scale * doclens[doc_id])
+                scores[doc_id] = scores.get(doc_id, 0.0) + s
+
+        hits = []
+        for doc_id, score in heapq.nlargest(k, scores.items(), key=lambda item: item[1]):
+            url, title, source, path, offset, length = self.doc(doc_id)
+            hits.append(Hit(score, doc_id, url, title, source, path, offset, length))
+        return hits
+
+
+def open_current_index(
+    base_dir: Path,
+    path: Optional[Path] = None,
+    categories: Optional[List[str]] = None,
+    skip_near_duplicates: bool = False,
+) -> BM25Index:
+    """
+    Open the index (whole mirror by default), (re)building it if it is missing,
+    outdated, from another corpus state or built with other parameters.
+    """
+    path = path or index_path(base_dir)
+    wanted = (corpus_fingerprint(base_dir, categories), params_fingerprint(categories, skip_near_duplicates))
+    try:
+        index = BM25Index(path)
+        if (index.corpus_sha, index.params_sha) == wanted:
+            return index
+        index.close()
+    except (OSError, ValueError):
+        pass
+    stats = build_index(base_dir, path, categories, skip_near_duplicates)
+    print(f"[index] rebuilt {path}: {stats['docs']} pages in {stats['seconds']:.1f}s")
+    return BM25Index(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query the BM25 index of the llms.txt mirror.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_build = sub.add_parser("build", help="Index every page in the mirror")
+    p_build.add_argument("--category", action="append", default=[], help="Limit to a category (repeatable)")
+    p_build.add_argument("--skip-near-duplicates", action="store_true", help="Leave out pages in llms_dedupe.py's canonical map")
+    p_query = sub.add_parser("query", help="Top-k pages for a query")
+    p_query.add_argument("query")
+    p_query.add_argument("-k", type=int, default=10)
+    for p in (p_build, p_query):
+        p.add_argument("--base", default="cloudflare_docs", help="Base folder of the mirror (default: cloudflare_docs)")
+        p.add_argument("--index", default="", help="Index file (default: <base>/_index/bm25.idx)")
+    args = parser.parse_args()
+
+    base_dir = Path(args.base)
+    path = Path(args.index) if args.index else index_path(base_dir)
+    if args.command == "build":
+        stats = build_index(base_dir, path, args.category or None, args.skip_near_duplicates)
+        print(
+            f"Indexed {stats['docs']} pages, {stats['terms']} terms in {stats['seconds']:.1f}s: "
+            f"{stats['index_bytes']:,} bytes ({stats['postings_bytes']:,} postings) "
+            f"for {stats['source_bytes']:,} bytes of pages -> {path}"
+        )
+        return
+
+    with BM25Index(path) as index:
+        started = time.perf_counter()
+        hits = index.search(args.query, args.k)
+        elapsed = (time.perf_counter() - started) * 1000
+        for hit in hits:
+            print(f"{hit.score:7.2f}  {hit.title}  <{hit.source or hit.url}>")
+        print(f"[query] {len(hits)} hits in {elapsed:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Advisory lock serialising processes that rewrite the mirror tree.
+
+download_llms_txt.py holds it for each run (each refresh under --watch,
+not while sleeping between them) and llms_gc.py for each collection, so a
+GC pass never deletes or recompresses archives while a fetch is archiving
+and writing the same files or holding the manifest's write transaction.
+
+It is an flock() on <base>/_mirror.lock, released by the kernel if the
+holder dies; the file names the holder's PID and purpose for the "waiting"
+message. Readers (search, packs, the stub server) don't take it. On
+platforms without fcntl the lock is a no-op.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # not POSIX: no locking
+    fcntl = None
+
+LOCK_NAME = "_mirror.lock"
+
+
+class MirrorBusy(RuntimeError):
+    pass
+
+
+@contextmanager
+def mirror_lock(base_dir: Path, purpose: str, timeout: Optional[float] = None) -> Iterator[None]:
+    """
+    Hold the mirror lock for the block. Waits for a current holder (printing who it is),
+    indefinitely or up to timeout seconds; timeout=0 fails at once. Raises MirrorBusy.
+    """
+    if fcntl is None:
+        yield
+        return
+    base_dir.mkdir(parents=True, exist_ok=True)
+    path = base_dir / LOCK_NAME
+    with path.open("a+") as f:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        waiting = False
+        while True:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                f.seek(0)
+                holder = f.read().strip() or "another process"
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise MirrorBusy(f"{path} is held by {holder}")
+                if not waiting:
+                    print(f"[lock] waiting for {holder}")
+                    waiting = True
+                time.sleep(0.2)
+        try:
+            f.seek(0)
+            f.truncate()
+            f.write(f"pid {os.getpid()} ({purpose})\n")
+            f.flush()
+            yield
+        finally:
+            f.seek(0)
+            f.truncate()
+            f.flush()
+            fcntl.flock(f, fcntl.LOCK_UN)
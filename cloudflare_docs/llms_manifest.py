@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+SQLite metadata manifest for the llms.txt mirror.
+
+One row per current export file (keyed by its path relative to the base folder)
+plus the lineage of every version moved into _archive/. The downloader keeps it
+up to date in one transaction per run, so skip decisions are a single indexed
+lookup instead of re-reading each file's metadata header.
+"""
+
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
+MANIFEST_NAME = "_manifest.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path          TEXT PRIMARY KEY,
+    category      TEXT NOT NULL,
+    service       TEXT NOT NULL,
+    artifact      TEXT NOT NULL,
+    url           TEXT NOT NULL,
+    content_sha   TEXT NOT NULL,
+    etag          TEXT NOT NULL DEFAULT '',
+    last_modified TEXT NOT NULL DEFAULT '',
+    retrieved_at  TEXT NOT NULL DEFAULT '',
+    body_offset   INTEGER NOT NULL,
+    size          INTEGER NOT NULL,
+    mtime_ns      INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_url ON files(url);
+CREATE INDEX IF NOT EXISTS files_sha ON files(content_sha);
+
+CREATE TABLE IF NOT EXISTS archives (
+    archived_path TEXT PRIMARY KEY,
+    path          TEXT NOT NULL,
+    content_sha   TEXT NOT NULL,
+    archived_at   TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS archives_path ON archives(path);
+
+-- Per-page hash index, per source URL (the body is identical in every category)
+CREATE TABLE IF NOT EXISTS page_sources (
+    url         TEXT PRIMARY KEY,
+    content_sha TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    url        TEXT NOT NULL,
+    key        TEXT NOT NULL,
+    page_index INTEGER NOT NULL,
+    sha        TEXT NOT NULL,
+    title      TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (url, key)
+);
+"""
+
+
+class FileRecord(NamedTuple):
+    path: str
+    category: str
+    service: str
+    artifact: str
+    url: str
+    content_sha: str
+    etag: str
+    last_modified: str
+    retrieved_at: str
+    body_offset: int
+    size: int  # body bytes, excluding the metadata header
+    mtime_ns: int
+
+
+class ArchiveRecord(NamedTuple):
+    archived_path: str
+    path: str
+    content_sha: str
+    archived_at: str
+
+
+class PageRecord(NamedTuple):
+    url: str
+    key: str
+    page_index: int
+    sha: str
+    title: str
+
+
+class Manifest:
+    def __init__(self, base_dir: Path):
+        self.base_dir = base_dir
+        self.path = base_dir / MANIFEST_NAME
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "Manifest":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def relpath(self, path: Path) -> str:
+        return path.relative_to(self.base_dir).as_posix()
+
+    def get(self, path: Path) -> Optional[FileRecord]:
+        row = self.conn.execute(
+            f"SELECT {', '.join(FileRecord._fields)} FROM files WHERE path = ?", (self.relpath(path),)
+        ).fetchone()
+        return FileRecord(*row) if row else None
+
+    def current(self, path: Path) -> Optional[FileRecord]:
+        """The stored record for path, or None if missing or the file changed behind our back."""
+        record = self.get(path)
+        if record is None:
+            return None
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return None
+        if st.st_mtime_ns != record.mtime_ns or st.st_size != record.body_offset + record.size:
+            return None
+        return record
+
+    def by_url(self, url: str) -> List[FileRecord]:
+        rows = self.conn.execute(f"SELECT {', '.join(FileRecord._fields)} FROM files WHERE url = ?", (url,))
+        return [FileRecord(*row) for row in rows]
+
+    def files(self) -> Iterator[FileRecord]:
+        for row in self.conn.execute(f"SELECT {', '.join(FileRecord._fields)} FROM files ORDER BY path"):
+            yield FileRecord(*row)
+
+    def upsert(self, record: FileRecord) -> None:
+        self.conn.execute(
+            f"INSERT OR REPLACE INTO files ({', '.join(FileRecord._fields)}) "
+            f"VALUES ({', '.join('?' * len(FileRecord._fields))})",
+            record,
+        )
+
+    def delete(self, path: Path) -> None:
+        self.conn.execute("DELETE FROM files WHERE path = ?", (self.relpath(path),))
+
+    def add_archive(self, record: ArchiveRecord) -> None:
+        self.conn.execute("INSERT OR REPLACE INTO archives VALUES (?, ?, ?, ?)", record)
+
+    def delete_archive(self, archived: Path) -> None:
+        self.conn.execute("DELETE FROM archives WHERE archived_path = ?", (self.relpath(archived),))
+
+    def move_archive(self, old: Path, new: Path) -> None:
+        """Point an archive row at a new file (e.g. after recompressing it)."""
+        self.conn.execute(
+            "UPDATE archives SET archived_path = ? WHERE archived_path = ?", (self.relpath(new), self.relpath(old))
+        )
+
+    def archives(self, path: Path) -> List[ArchiveRecord]:
+        rows = self.conn.execute(
+            "SELECT archived_path, path, content_sha, archived_at FROM archives WHERE path = ? ORDER BY archived_at",
+            (self.relpath(path),),
+        )
+        return [ArchiveRecord(*row) for row in rows]
+
+    def page_source_sha(self, url: str) -> str:
+        """Content-SHA256 of the body the page index for url was built from ("" if never indexed)."""
+        row = self.conn.execute("SELECT content_sha FROM page_sources WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else ""
+
+    def pages(self, url: str) -> Dict[str, PageRecord]:
+        rows = self.conn.execute(
+            f"SELECT {', '.join(PageRecord._fields)} FROM pages WHERE url = ? ORDER BY page_index", (url,)
+        )
+        return {row[1]: PageRecord(*row) for row in rows}
+
+    def replace_pages(self, url: str, content_sha: str, pages: List[PageRecord]) -> None:
+        self.conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+        self.conn.executemany(
+            f"INSERT INTO pages ({', '.join(PageRecord._fields)}) VALUES ({', '.join('?' * len(PageRecord._fields))})",
+            pages,
+        )
+        self.conn.execute("INSERT OR REPLACE INTO page_sources VALUES (?, ?)", (url, content_sha))
+
+    def commit(self) -> None:
+        self.conn.commit()
+
+    def rollback(self) -> None:
+        self.conn.rollback()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Per-run metrics for download_llms_txt.py.
+
+RunMetrics collects the run's phase timings (fetch, plan, archive, write,
+changes, packed, fts), its counters (wrote, archived, skipped, ...) and one
+llms_fetch.FetchSpan per URL: queue wait, TTFB (DNS + connect + TLS +
+headers), body transfer, hashing, disk writes, retry backoff, bytes, status.
+After each run it is written to <base>/_metrics/ (or --metrics-dir):
+
+    last_run.json      everything above, spans sorted slowest first
+    llms_mirror.prom   the same as gauges in Prometheus text format; point
+                       --metrics-dir at node_exporter's textfile collector
+                       directory to scrape it
+
+--profile wraps the run in cProfile, prints the hottest functions and keeps
+the raw stats as profile.pstats next to the metrics. cProfile only sees the
+main thread: time inside fetch threads shows up in the spans instead.
+
+Usage:
+    python llms_metrics.py [--base cloudflare_docs] [--slowest 10]
+"""
+
+import argparse
+import cProfile
+import io
+import json
+import pstats
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from llms_fetch import FetchSpan
+
+METRICS_DIR = "_metrics"
+JSON_NAME = "last_run.json"
+PROM_NAME = "llms_mirror.prom"
+PROFILE_NAME = "profile.pstats"
+SPAN_STAGES = ("queued", "ttfb", "body", "hash", "disk", "backoff")
+
+
+class RunMetrics:
+    def __init__(self):
+        self.started_at = datetime.now().astimezone()
+        self._started = self._lap = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+        self.spans: Dict[str, FetchSpan] = {}
+
+    def lap(self, name: str) -> None:
+        """Close phase name: it took the time since the previous lap (or the start of the run)."""
+        now = time.perf_counter()
+        self.phases[name] = self.phases.get(name, 0.0) + now - self._lap
+        self._lap = now
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._started
+
+    def slowest(self, n: int) -> List[FetchSpan]:
+        return sorted(self.spans.values(), key=lambda s: -s.total)[:n]
+
+    def as_dict(self) -> dict:
+        spans = sorted(self.spans.values(), key=lambda s: -s.total)
+        return {
+            "started_at": self.started_at.isoformat(),
+            "seconds": round(self.elapsed(), 6),
+            "phases": {name: round(t, 6) for name, t in self.phases.items()},
+            "counters": self.counters,
+            "fetch": {
+                "urls": len(spans),
+                "bytes": sum(s.bytes for s in spans),
+                "attempts": sum(s.attempts for s in spans),
+                "errors": sum(1 for s in spans if s.error),
+                **{stage: round(sum(getattr(s, stage) for s in spans), 6) for stage in SPAN_STAGES},
+            },
+            "spans": [{k: round(v, 6) if isinstance(v, float) else v for k, v in s.as_dict().items()} for s in spans],
+        }
+
+
+def metrics_dir(base_dir: Path) -> Path:
+    return base_dir / METRICS_DIR
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text(data: dict) -> str:
+    """Render as_dict() output in the Prometheus text exposition format (all gauges: one file per run)."""
+    lines: List[str] = []
+
+    def gauge(name: str, help_text: str, samples: List[tuple]) -> None:
+        lines.append(f"# HELP llms_mirror_{name} {help_text}")
+        lines.append(f"# TYPE llms_mirror_{name} gauge")
+        for labels, value in samples:
+            rendered = ",".join(f'{k}="{_label(str(v))}"' for k, v in labels.items())
+            lines.append(f"llms_mirror_{name}{{{rendered}}} {value}" if rendered else f"llms_mirror_{name} {value}")
+
+    fetch = data["fetch"]
+    started = datetime.fromisoformat(data["started_at"]).timestamp()
+    gauge("last_run_timestamp_seconds", "Start of the last run (unix time).", [({}, started)])
+    gauge("last_run_duration_seconds", "Wall time of the last run.", [({}, data["seconds"])])
+    gauge("phase_duration_seconds", "Wall time per run phase.", [({"phase": k}, v) for k, v in data["phases"].items()])
+    gauge(
+        "run_counter",
+        "Counters of the last run (files per outcome, bytes saved).",
+        [({"name": k}, v) for k, v in data["counters"].items()],
+    )
+    gauge("fetch_bytes_total", "Body bytes received in the last run.", [({}, fetch["bytes"])])
+    gauge("fetch_errors", "URLs that failed in the last run.", [({}, fetch["errors"])])
+    gauge(
+        "fetch_stage_seconds_total",
+        "Fetch time per stage, summed over URLs.",
+        [({"stage": stage}, fetch[stage]) for stage in SPAN_STAGES],
+    )
+    spans = data["spans"]
+    gauge("url_fetch_seconds", "Time in the fetch worker per URL.", [({"url": s["url"]}, s["total"]) for s in spans])
+    gauge(
+        "url_stage_seconds",
+        "Fetch time per URL and stage.",
+        [({"url": s["url"], "stage": stage}, s[stage]) for s in spans for stage in SPAN_STAGES],
+    )
+    gauge("url_bytes", "Body bytes received per URL.", [({"url": s["url"]}, s["bytes"]) for s in spans])
+    gauge("url_attempts", "Requests made per URL (1 + retries).", [({"url": s["url"]}, s["attempts"]) for s in spans])
+    gauge("url_status", "Last HTTP status per URL (0 if no response).", [({"url": s["url"]}, s["status"]) for s in spans])
+    return "\n".join(lines) + "\n"
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    tmp.replace(path)
+
+
+def write_metrics(metrics: RunMetrics, out_dir: Path) -> Dict[str, Path]:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    data = metrics.as_dict()
+    paths = {"json": out_dir / JSON_NAME, "prom": out_dir / PROM_NAME}
+    _write_atomic(paths["json"], json.dumps(data, indent=2) + "\n")
+    _write_atomic(paths["prom"], prometheus_text(data))
+    return paths
+
+
+def format_span(span: FetchSpan) -> str:
+    stages = " ".join(f"{stage}={getattr(span, stage):.3f}" for stage in SPAN_STAGES if getattr(span, stage) >= 0.0005)
+    status = span.error or span.status
+    return f"{span.total:7.3f}s  {span.bytes:>11,}B  [{status}]  {span.url}  {stages}"
+
+
+@contextmanager
+def profiled(out_path: Optional[Path], top: int = 25) -> Iterator[None]:
+    """cProfile the block; print the top functions by own time and cumulative time, and save the stats."""
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        if out_path is not None:
+            out_path.parent.mkdir(parents=True, exist_ok=True)
+            profile.dump_stats(out_path)
+        for sort in ("tottime", "cumulative"):
+            buf = io.StringIO()
+            pstats.Stats(profile, stream=buf).strip_dirs().sort_stats(sort).print_stats(top)
+            print(f"\n[profile] top {top} by {sort}:")
+            # Skip pstats' preamble; keep the column header and the rows
+            print(buf.getvalue()[buf.getvalue().index("   ncalls") :].rstrip())
+        if out_path is not None:
+            print(f"[profile] stats -> {out_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarise the metrics of the last download_llms_txt.py run.")
+    parser.add_argument("--base", default="cloudflare_docs", help="Base folder of the mirror (default: cloudflare_docs)")
+    parser.add_argument("--metrics-dir", default="", help=f"Metrics folder (default: <base>/{METRICS_DIR})")
+    parser.add_argument("--slowest", type=int, default=10, help="Slowest URLs to list")
+    args = parser.parse_args()
+
+    path = (Path(args.metrics_dir) if args.metrics_dir else metrics_dir(Path(args.base))) / JSON_NAME
+    if not path.exists():
+        raise SystemExit(f"No metrics at {path}; run download_llms_txt.py first")
+    data = json.loads(path.read_text(encoding="utf-8"))
+    fetch = data["fetch"]
+    print(f"Run {data['started_at']}: {data['seconds']:.2f}s, " + ", ".join(f"{k}={v}" for k, v in data["counters"].items()))
+    print("  phases: " + "  ".join(f"{k}={v:.3f}s" for k, v in data["phases"].items()))
+    print(
+        f"  fetch: {fetch['urls']} URLs, {fetch['bytes']:,} bytes, {fetch['attempts']} requests, {fetch['errors']} errors; "
+        + "  ".join(f"{stage}={fetch[stage]:.3f}s" for stage in SPAN_STAGES)
+    )
+    for s in data["spans"][: args.slowest]:
+        span = FetchSpan(s["url"])
+        for key, value in s.items():
+            setattr(span, key, value)
+        print("  " + format_span(span))
+
+
+if __name__ == "__main__":
+    main()
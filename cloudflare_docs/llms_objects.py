@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Content-addressed blob store behind `download_llms_txt.py --object-store`.
+
+Each written export is stored once under <base>/_objects/ and every
+category path is a hardlink to it, so the categories, the generation
+snapshots and uncompressed archive copies all share one inode per distinct
+body. Blobs are keyed by Content-SHA256 alone; their header has no
+`# Category:` line (the category is the linking path's, and the manifest's).
+A blob whose header names another Source-URL (the same body served at two
+URLs) is not shared: that export gets a file of its own.
+
+A blob that nothing links to any more (st_nlink == 1: only _objects/ holds
+it) is garbage; sweep_objects() removes those. The downloader sweeps after
+every object-store run and llms_gc.py on every pass.
+
+Usage:
+    python llms_objects.py [--base cloudflare_docs] [--dry-run]
+"""
+
+import argparse
+import os
+import shutil
+from pathlib import Path
+from typing import BinaryIO, Dict, Optional
+
+from llms_fetch import CHUNK_SIZE
+from llms_header import read_header
+from llms_lock import mirror_lock
+
+OBJECTS_DIR = "_objects"
+
+
+def object_path(base_dir: Path, content_sha: str) -> Path:
+    return base_dir / OBJECTS_DIR / content_sha[:2] / f"{content_sha}.txt"
+
+
+def write_composed(f: BinaryIO, header: str, body_path: Path) -> None:
+    """Write header + body without holding the body in memory."""
+    f.write(header.encode("utf-8"))
+    with body_path.open("rb") as body:
+        shutil.copyfileobj(body, f, CHUNK_SIZE)
+
+
+def store_object(base_dir: Path, content_sha: str, url: str, header: str, body_path: Path) -> Optional[Path]:
+    """
+    Write a blob once under _objects/, keyed by its Content-SHA256; existing blobs are reused.
+    Returns None if the blob for this body belongs to another Source-URL.
+    """
+    path = object_path(base_dir, content_sha)
+    if path.exists():
+        fields, _ = read_header(path)
+        return path if fields.get("Source-URL") == url else None
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("wb") as f:
+        write_composed(f, header, body_path)
+    tmp.replace(path)
+    return path
+
+
+def link_object(obj_path: Path, dest: Path) -> None:
+    """Point dest at a blob via hardlink (copy if the filesystem can't link), replacing dest atomically."""
+    tmp = dest.with_name(dest.name + ".tmp")
+    tmp.unlink(missing_ok=True)
+    try:
+        os.link(obj_path, tmp)
+    except OSError:
+        shutil.copyfile(obj_path, tmp)
+    tmp.replace(dest)
+
+
+def objects_size(base_dir: Path) -> int:
+    root = base_dir / OBJECTS_DIR
+    return sum(p.stat().st_size for p in root.glob("*/*.txt")) if root.is_dir() else 0
+
+
+def sweep_objects(base_dir: Path, dry_run: bool = False) -> Dict[str, int]:
+    """Remove blobs no path links to any more; returns the blobs removed and their bytes."""
+    stats = {"blobs": 0, "bytes": 0}
+    root = base_dir / OBJECTS_DIR
+    if not root.is_dir():
+        return stats
+    for path in sorted(root.glob("*/*.txt")):
+        st = path.stat()
+        if st.st_nlink > 1:
+            continue
+        if not dry_run:
+            path.unlink()
+        stats["blobs"] += 1
+        stats["bytes"] += st.st_size
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Remove object-store blobs that no mirror path links to.")
+    parser.add_argument("--base", default="cloudflare_docs", help="Base folder of the mirror (default: cloudflare_docs)")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be removed")
+    args = parser.parse_args()
+
+    base_dir = Path(args.base)
+    if args.dry_run:
+        stats = sweep_objects(base_dir, dry_run=True)
+    else:
+        with mirror_lock(base_dir, "llms_objects.py"):
+            stats = sweep_objects(base_dir)
+    print(f"{'Dry run' if args.dry_run else 'Done'}. unreferenced blobs={stats['blobs']}, bytes={stats['bytes']:,}")
+
+
+if __name__ == "__main__":
+    main()
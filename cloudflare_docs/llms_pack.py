@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Build a context pack: the most relevant docs pages for a topic, fitted into a
+model's token budget.
+
+Candidates come from the BM25 index (llms_index.py, rebuilt automatically
+when the mirror changed). They are taken in relevance order and kept if
+
+- they clear MIN_RELATIVE_SCORE of the best hit (no filler once the topic runs out)
+- they still fit in the remaining budget (smaller pages further down can fill gaps)
+- they are not near-duplicates: a page whose word 4-gram shingles are at least
+  DUP_CONTAINMENT covered by pages already chosen is skipped
+
+With --category, a page qualifies if any export containing it is mirrored
+into one of those categories.
+
+The pack is the chosen <page> blocks verbatim (llms-full format, so
+llms_pages.py can parse it), written to <base>/_packs/<key>.txt with a
+<key>.json manifest. The key hashes the corpus fingerprint, the query, the
+budget, the categories and the tokenizer, so rebuilding an identical pack
+returns the cached file without touching the index.
+
+Usage:
+    python llms_pack.py "durable objects storage and alarms" [--budget 32000] [--category core_context_pack]
+"""
+
+import argparse
+import hashlib
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from llms_chunks import count_tokens, tokenizer_name
+from llms_corpus import corpus_fingerprint, iter_unique_pages
+from llms_index import open_current_index, tokenize
+
+PACKS_DIR = "_packs"
+PACK_VERSION = 2  # 2: category filter checks every export containing the page
+DEFAULT_BUDGET = 32000
+CANDIDATES = 400
+MIN_RELATIVE_SCORE = 0.2
+DUP_CONTAINMENT = 0.8
+SHINGLE_SIZE = 4
+
+
+def shingles(text: str) -> Set[int]:
+    tokens = tokenize(text)
+    return {hash(tuple(tokens[i : i + SHINGLE_SIZE])) for i in range(max(1, len(tokens) - SHINGLE_SIZE + 1))}
+
+
+def pack_key(fingerprint: str, query: str, budget: int, categories: List[str]) -> str:
+    inputs = {
+        "version": PACK_VERSION,
+        "corpus": fingerprint,
+        "query": " ".join(tokenize(query)),
+        "budget": budget,
+        "categories": sorted(categories),
+        "tokenizer": tokenizer_name(),
+    }
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode("utf-8")).hexdigest()[:20]
+
+
+def pack_header(query: str, budget: int) -> str:
+    return f"# Context pack: {query}\n# Budget: {budget} tokens\n\n"
+
+
+def build_pack(
+    base_dir: Path,
+    query: str,
+    budget: int = DEFAULT_BUDGET,
+    categories: Optional[List[str]] = None,
+    use_cache: bool = True,
+) -> Dict[str, object]:
+    """Select pages for query within budget; returns the manifest (with "path" and "cached")."""
+    categories = categories or []
+    fingerprint = corpus_fingerprint(base_dir)
+    key = pack_key(fingerprint, query, budget, categories)
+    out_dir = base_dir / PACKS_DIR
+    pack_path = out_dir / f"{key}.txt"
+    manifest_path = out_dir / f"{key}.json"
+    if use_cache and pack_path.exists() and manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        return {**manifest, "path": str(pack_path), "cached": True}
+
+    started = time.perf_counter()
+    allowed: Optional[Set[str]] = None
+    if categories:
+        # A page is in a category if any export containing it is (iter_unique_pages merges those),
+        # not just the one export the index attributed it to
+        allowed = {
+            page.source_html or page.source_md or export.url
+            for export, page in iter_unique_pages(base_dir)
+            if set(export.categories) & set(categories)
+        }
+
+    header = pack_header(query, budget)
+    remaining = budget - count_tokens(header)
+    covered: Set[int] = set()
+    chosen: List[dict] = []
+    blocks: List[bytes] = []
+    skipped = {"low_score": 0, "too_large": 0, "duplicate": 0, "category": 0}
+
+    with open_current_index(base_dir) as index:
+        hits = index.search(query, CANDIDATES)
+    top = hits[0].score if hits else 0.0
+    for hit in hits:
+        if hit.score < top * MIN_RELATIVE_SCORE:
+            skipped["low_score"] += 1
+            continue
+        if allowed is not None and (hit.source or hit.url) not in allowed:
+            skipped["category"] += 1
+            continue
+        if remaining <= 0:
+            break
+        with (base_dir / hit.path).open("rb") as f:
+            f.seek(hit.offset)
+            block = f.read(hit.length)
+        text = block.decode("utf-8", "replace")
+        tokens = count_tokens(text)
+        if tokens > remaining:
+            skipped["too_large"] += 1
+            continue
+        page_shingles = shingles(text)
+        if page_shingles and len(page_shingles & covered) >= DUP_CONTAINMENT * len(page_shingles):
+            skipped["duplicate"] += 1
+            continue
+        covered |= page_shingles
+        remaining -= tokens
+        blocks.append(block if block.endswith(b"\n") else block + b"\n")
+        chosen.append(
+            {
+                "title": hit.title,
+                "source_url": hit.source,
+                "export": hit.url,
+                "score": round(hit.score, 4),
+                "tokens": tokens,
+                "sha": hashlib.sha256(block).hexdigest(),
+            }
+        )
+
+    manifest: Dict[str, object] = {
+        "key": key,
+        "query": query,
+        "budget": budget,
+        "tokens": budget - remaining,
+        "categories": categories,
+        "tokenizer": tokenizer_name(),
+        "corpus_sha": fingerprint,
+        "built_at": datetime.now().astimezone().isoformat(),
+        "seconds": round(time.perf_counter() - started, 3),
+        "candidates": len(hits),
+        "skipped": skipped,
+        "pages": chosen,
+    }
+    out_dir.mkdir(parents=True, exist_ok=True)
+    tmp = pack_path.with_name(pack_path.name + ".tmp")
+    with tmp.open("wb") as f:
+        f.write(header.encode("utf-8"))
+        for block in blocks:
+            f.write(block + b"\n")
+    tmp.replace(pack_path)
+    # The manifest is written last: its presence marks the pack as complete for the cache
+    tmp = manifest_path.with_name(manifest_path.name + ".tmp")
+    tmp.write_text(json.dumps(manifest, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    tmp.replace(manifest_path)
+    return {**manifest, "path": str(pack_path), "cached": False}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a token-budgeted context pack of the docs most relevant to a topic.")
+    parser.add_argument("query", help="Topic or question the pack is for")
+    parser.add_argument("--base", default="cloudflare_docs", help="Base folder of the mirror (default: cloudflare_docs)")
+    parser.add_argument("--budget", type=int, default=DEFAULT_BUDGET, help="Token budget for the whole pack")
+    parser.add_argument("--category", action="append", default=[], help="Only pages from this category (repeatable)")
+    parser.add_argument("--no-cache", action="store_true", help="Rebuild even if an identical pack exists")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    manifest = build_pack(Path(args.base), args.query, args.budget, args.category, not args.no_cache)
+    elapsed = time.perf_counter() - started
+    for page in manifest["pages"]:
+        print(f"{page['tokens']:7d}  {page['score']:7.2f}  {page['title']}")
+    print(
+        f"{'Cached' if manifest['cached'] else 'Built'} pack: {len(manifest['pages'])} pages, "
+        f"{manifest['tokens']}/{manifest['budget']} tokens in {elapsed * 1000:.0f}ms -> {manifest['path']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
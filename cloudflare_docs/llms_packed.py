@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Packed single-file corpus: every <page> of the mirror in one binary file with
+an offset table, for O(1) random access without re-scanning exports.
+
+Layout (little-endian, sections 8-byte aligned):
+
+    header      magic, version, codec, counts, section offsets
+    data        page blocks back to back (each compressed on its own if codec != none);
+                a block repeated across exports is stored once and shared
+    table       per page: uint64 data offset, uint32 stored length, uint32 raw length
+    meta        uint64 offsets + one JSON record per page (export, index, title, source, sha)
+    exports     JSON list of exports: url, category, categories, service, content_sha,
+                first page, page count
+
+PackedCorpus memory-maps the file. With codec "none", page(i) is a
+memoryview slice of the map (zero-copy); with "zlib"/"zstd" it is the
+decompressed bytes of that one block. Pages are the raw `<page>...</page>`
+blocks, so llms_pages.iter_pages() can parse them.
+
+`download_llms_txt.py --packed corpus.llmpack` writes one after each run.
+
+Usage:
+    python llms_packed.py build [--base cloudflare_docs] [--out corpus.llmpack] [--codec zlib]
+    python llms_packed.py show corpus.llmpack workers 0
+    python llms_packed.py info corpus.llmpack
+"""
+
+import argparse
+import json
+import mmap
+import struct
+import sys
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from llms_corpus import iter_exports
+from llms_pages import iter_file_pages
+
+try:
+    import zstandard
+except ImportError:  # optional; zlib is always available
+    zstandard = None
+
+MAGIC = b"LLPK"
+VERSION = 1
+CODECS = ["none", "zlib", "zstd"]
+DEFAULT_CODEC = "none"
+DEFAULT_NAME = "corpus.llmpack"
+# magic, version, codec, n_pages, n_exports, then offsets of data, table, meta offsets,
+# meta blob, exports JSON, and the exports JSON length
+HEADER = struct.Struct("<4sIIIIQQQQQQ")
+ENTRY = struct.Struct("<QII")
+
+
+def available_codecs() -> List[str]:
+    return [c for c in CODECS if c != "zstd" or zstandard is not None]
+
+
+def _compressor(codec: str):
+    if codec == "zlib":
+        return lambda data: zlib.compress(data, 6)
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstd packing needs the 'zstandard' package (pip install zstandard)")
+        return zstandard.ZstdCompressor(level=10).compress
+    return bytes
+
+
+def _decompressor(codec: str):
+    if codec == "zlib":
+        return zlib.decompress
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstd packs need the 'zstandard' package (pip install zstandard)")
+        return zstandard.ZstdDecompressor().decompress
+    return None
+
+
+def _pad(f) -> int:
+    f.write(b"\0" * (-f.tell() % 8))
+    return f.tell()
+
+
+def write_packed(
+    base_dir: Path, out_path: Path, categories: Optional[List[str]] = None, codec: str = DEFAULT_CODEC
+) -> Dict[str, float]:
+    """Pack every page of every export (one copy per Source-URL) under base_dir into out_path."""
+    started = time.perf_counter()
+    compress = _compressor(codec)
+    entries: List[bytes] = []
+    meta_blob = bytearray()
+    meta_offsets: List[int] = []
+    exports: List[dict] = []
+    stored: Dict[str, tuple] = {}  # page sha -> (offset, stored length, raw length)
+    raw_bytes = 0
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out_path.with_name(out_path.name + ".tmp")
+    with tmp.open("wb") as out:
+        out.write(b"\0" * HEADER.size)
+        data_off = _pad(out)
+        for export in iter_exports(base_dir, categories):
+            first = len(entries)
+            with export.path.open("rb") as src:
+                for page in iter_file_pages(export.path):
+                    raw_bytes += page.length
+                    entry = stored.get(page.sha)
+                    if entry is None:
+                        src.seek(page.offset)
+                        block = compress(src.read(page.length))
+                        entry = stored[page.sha] = (out.tell() - data_off, len(block), page.length)
+                        out.write(block)
+                    entries.append(ENTRY.pack(*entry))
+                    meta_offsets.append(len(meta_blob))
+                    record = [len(exports), page.index, page.title, page.source_html or page.source_md, page.sha]
+                    meta_blob += json.dumps(record, ensure_ascii=False).encode("utf-8")
+            exports.append(
+                {
+                    "url": export.url,
+                    "category": export.category,
+                    "categories": export.categories,
+                    "service": export.service,
+                    "content_sha": export.content_sha,
+                    "first": first,
+                    "count": len(entries) - first,
+                }
+            )
+        meta_offsets.append(len(meta_blob))
+
+        table_off = _pad(out)
+        out.write(b"".join(entries))
+        meta_index_off = _pad(out)
+        out.write(struct.pack(f"<{len(meta_offsets)}Q", *meta_offsets))
+        meta_off = _pad(out)
+        out.write(meta_blob)
+        exports_off = _pad(out)
+        exports_json = json.dumps(exports, ensure_ascii=False).encode("utf-8")
+        out.write(exports_json)
+        out.seek(0)
+        out.write(
+            HEADER.pack(
+                MAGIC,
+                VERSION,
+                CODECS.index(codec),
+                len(entries),
+                len(exports),
+                data_off,
+                table_off,
+                meta_index_off,
+                meta_off,
+                exports_off,
+                len(exports_json),
+            )
+        )
+    tmp.replace(out_path)
+    return {
+        "exports": len(exports),
+        "pages": len(entries),
+        "blocks": len(stored),
+        "raw_bytes": raw_bytes,
+        "packed_bytes": out_path.stat().st_size,
+        "seconds": time.perf_counter() - started,
+    }
+
+
+class PackedCorpus:
+    """
+    Read-only, memory-mapped view of a packed corpus.
+    Uncompressed pages are returned as memoryview slices of the map: release
+    them (or drop them) before close().
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        with path.open("rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mm) < HEADER.size or self._mm[:4] != MAGIC:
+            self._mm.close()
+            raise ValueError(f"{path}: not a packed corpus")
+        (
+            _,
+            version,
+            codec_id,
+            self.n_pages,
+            n_exports,
+            self._data_off,
+            self._table_off,
+            meta_index_off,
+            self._meta_off,
+            exports_off,
+            exports_len,
+        ) = HEADER.unpack_from(self._mm, 0)
+        if version != VERSION:
+            self._mm.close()
+            raise ValueError(f"{path}: packed corpus version {version}, expected {VERSION}")
+        self.codec = CODECS[codec_id]
+        self._decompress = _decompressor(self.codec)
+        self._view = memoryview(self._mm)
+        self._meta_offsets = self._view[meta_index_off : meta_index_off + 8 * (self.n_pages + 1)].cast("Q")
+        self.exports: List[dict] = json.loads(self._mm[exports_off : exports_off + exports_len])
+
+    def close(self) -> None:
+        self._meta_offsets.release()
+        self._view.release()
+        self._mm.close()
+
+    def __enter__(self) -> "PackedCorpus":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.n_pages
+
+    def page(self, i: int) -> Union[memoryview, bytes]:
+        """The raw <page> block of page i: a zero-copy memoryview when uncompressed."""
+        if not 0 <= i < self.n_pages:
+            raise IndexError(i)
+        offset, stored_len, _ = ENTRY.unpack_from(self._mm, self._table_off + i * ENTRY.size)
+        start = self._data_off + offset
+        block = self._view[start : start + stored_len]
+        if self._decompress is None:
+            return block
+        with block:
+            return self._decompress(block)
+
+    def text(self, i: int) -> str:
+        return bytes(self.page(i)).decode("utf-8", "replace")
+
+    def meta(self, i: int) -> dict:
+        start = self._meta_off + self._meta_offsets[i]
+        end = self._meta_off + self._meta_offsets[i + 1]
+        export, index, title, source, sha = json.loads(self._mm[start:end])
+        return {"export": self.exports[export]["url"], "index": index, "title": title, "source": source, "sha": sha}
+
+    def find_export(self, name: str) -> dict:
+        """An export by Source-URL or service name (e.g. "workers")."""
+        for export in self.exports:
+            if name in (export["url"], export["service"]):
+                return export
+        raise KeyError(name)
+
+    def export_page(self, name: str, n: int) -> Union[memoryview, bytes]:
+        """Page n (0-based) of an export."""
+        export = self.find_export(name)
+        if not 0 <= n < export["count"]:
+            raise IndexError(f"{name} has {export['count']} pages")
+        return self.page(export["first"] + n)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or read a packed single-file corpus of the llms.txt mirror.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_build = sub.add_parser("build", help="Pack every page of the mirror")
+    p_build.add_argument("--base", default="cloudflare_docs", help="Base folder of the mirror (default: cloudflare_docs)")
+    p_build.add_argument("--out", default="", help=f"Output file (default: <base>/{DEFAULT_NAME})")
+    p_build.add_argument("--category", action="append", default=[], help="Limit to a category (repeatable)")
+    p_build.add_argument("--codec", choices=available_codecs(), default=DEFAULT_CODEC, help="Per-page compression")
+    p_show = sub.add_parser("show", help="Print page N of an export")
+    p_show.add_argument("file")
+    p_show.add_argument("export", help="Export Source-URL or service name, e.g. workers")
+    p_show.add_argument("n", type=int)
+    p_info = sub.add_parser("info", help="Summarise a packed corpus")
+    p_info.add_argument("file")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        base_dir = Path(args.base)
+        out_path = Path(args.out) if args.out else base_dir / DEFAULT_NAME
+        stats = write_packed(base_dir, out_path, args.category or None, args.codec)
+        print(
+            f"Packed {stats['pages']} pages ({stats['blocks']} distinct) from {stats['exports']} exports: "
+            f"{stats['raw_bytes']:,} -> {stats['packed_bytes']:,} bytes ({args.codec}) in {stats['seconds']:.2f}s -> {out_path}"
+        )
+        return
+
+    with PackedCorpus(Path(args.file)) as corpus:
+        if args.command == "show":
+            sys.stdout.write(bytes(corpus.export_page(args.export, args.n)).decode("utf-8", "replace"))
+            return
+        print(f"{args.file}: {len(corpus)} pages, {len(corpus.exports)} exports, codec={corpus.codec}")
+        for export in corpus.exports:
+            print(f"  {export['count']:5d}  {export['service']:<24} {export['url']}")
+
+
+if __name__ == "__main__":
+    main()
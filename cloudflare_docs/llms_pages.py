@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Streaming parser for the `<page>` records in Cloudflare llms-full.txt exports.
+
+Each export is a sequence of blocks like:
+
+    <page>
+    ---
+    title: Overview · Cloudflare Workers docs
+    description: ...
+    lastUpdated: 2025-06-05T13:25:05.000Z
+    source_url:
+      html: https://developers.cloudflare.com/workers/
+      md: https://developers.cloudflare.com/workers/index.md
+    ---
+
+    ...markdown body...
+    </page>
+
+iter_pages() reads a binary stream line by line and yields one Page at a time,
+so memory is bounded by the largest single page rather than the whole export.
+The metadata block written by download_llms_txt.py (and anything else outside
+<page> blocks) is skipped.
+
+Usage:
+    python llms_pages.py path/to/export.txt [--limit 5]
+"""
+
+import argparse
+import hashlib
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional
+
+from llms_archive import open_version
+
+PAGE_OPEN = b"<page>"
+PAGE_CLOSE = b"</page>"
+FRONTMATTER_FENCE = b"---"
+
+
+class Page:
+    """
+    One <page> record.
+    - index: ordinal of the page within its export (0-based)
+    - offset/length: byte span of the whole <page>...</page> block in the source stream
+    - sha: SHA-256 of that block's raw bytes
+    """
+
+    __slots__ = (
+        "index",
+        "title",
+        "description",
+        "last_updated",
+        "source_html",
+        "source_md",
+        "tags",
+        "body",
+        "offset",
+        "length",
+        "sha",
+    )
+
+    def __init__(
+        self,
+        index: int,
+        title: str,
+        description: str,
+        last_updated: str,
+        source_html: str,
+        source_md: str,
+        tags: List[str],
+        body: str,
+        offset: int,
+        length: int,
+        sha: str = "",
+    ):
+        self.index = index
+        self.title = title
+        self.description = description
+        self.last_updated = last_updated
+        self.source_html = source_html
+        self.source_md = source_md
+        self.tags = tags
+        self.body = body
+        self.offset = offset
+        self.length = length
+        self.sha = sha
+
+    @property
+    def key(self) -> str:
+        """Stable identity of the page across versions of an export."""
+        return self.source_html or self.source_md or self.title
+
+    def __repr__(self) -> str:
+        return f"Page(index={self.index}, title={self.title!r}, source_html={self.source_html!r})"
+
+
+def _unquote(value: str) -> str:
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        inner = value[1:-1]
+        if value[0] == '"':
+            return inner.replace('\\"', '"').replace("\\\\", "\\")
+        return inner.replace("''", "'")
+    return value
+
+
+def parse_frontmatter(lines: List[str]) -> Dict[str, str]:
+    """
+    Parse the small YAML subset used by the exports: scalar keys, indented
+    continuation lines, folded/literal block scalars and one level of nested
+    mapping (source_url.html / source_url.md). Nested keys come back dotted.
+    """
+    fields: Dict[str, str] = {}
+    parent = ""
+    key = ""
+    block = ""  # ">" or "|" while inside a block scalar
+    for line in lines:
+        if not line.strip():
+            if block and key:
+                fields[key] += "\n"
+            continue
+        indented = line[0] in " \t"
+        stripped = line.strip()
+        if indented and parent and not block and ":" in stripped and not stripped.startswith(("-", '"', "'")):
+            sub, _, value = stripped.partition(":")
+            key = f"{parent}.{sub.strip()}"
+            fields[key] = value.strip()
+            continue
+        if indented and key:
+            current = fields[key]
+            sep = "" if not current or current.endswith("\n") else ("\n" if block == "|" else " ")
+            fields[key] = current + sep + stripped
+            continue
+        name, _, value = line.partition(":")
+        key = name.strip()
+        value = value.strip()
+        parent = ""
+        block = ""
+        if value in ("", "|", "|-", "|+", ">", ">-", ">+"):
+            block = value[:1]
+            if not value:
+                parent = key
+        fields[key] = "" if block or not value else value
+    return {k: _unquote(v.strip()) for k, v in fields.items()}
+
+
+def _make_page(
+    index: int, offset: int, length: int, sha: str, meta_lines: List[str], body_lines: List[bytes]
+) -> Page:
+    meta = parse_frontmatter(meta_lines)
+    body = b"".join(body_lines).decode("utf-8", "replace").strip("\n")
+    tags = [t.strip() for t in meta.get("tags", "").split(",") if t.strip()]
+    return Page(
+        index=index,
+        title=meta.get("title", ""),
+        description=meta.get("description", ""),
+        last_updated=meta.get("lastUpdated", ""),
+        source_html=meta.get("source_url.html", ""),
+        source_md=meta.get("source_url.md", ""),
+        tags=tags,
+        body=body,
+        offset=offset,
+        length=length,
+        sha=sha,
+    )
+
+
+def iter_pages(stream: BinaryIO) -> Iterator[Page]:
+    """Yield Page records from a binary stream without reading it all into memory."""
+    index = 0
+    offset = 0
+    start: Optional[int] = None
+    state = "outside"  # outside -> fence -> meta -> body
+    meta_lines: List[str] = []
+    body_lines: List[bytes] = []
+    digest = hashlib.sha256()
+
+    for raw in stream:
+        line_start = offset
+        offset += len(raw)
+        line = raw.rstrip(b"\r\n")
+
+        if state == "outside":
+            if line == PAGE_OPEN:
+                start = line_start
+                meta_lines = []
+                body_lines = []
+                digest = hashlib.sha256(raw)
+                state = "fence"
+            continue
+
+        digest.update(raw)
+        if line == PAGE_CLOSE:
+            yield _make_page(index, start, offset - start, digest.hexdigest(), meta_lines, body_lines)
+            index += 1
+            state = "outside"
+            continue
+
+        if state == "fence":
+            # Pages without frontmatter go straight to the body
+            if line == FRONTMATTER_FENCE:
+                state = "meta"
+            else:
+                state = "body"
+                body_lines.append(raw)
+        elif state == "meta":
+            if line == FRONTMATTER_FENCE:
+                state = "body"
+            else:
+                meta_lines.append(line.decode("utf-8", "replace"))
+        else:
+            body_lines.append(raw)
+
+    # A truncated export still yields its last partial page
+    if state != "outside" and start is not None:
+        yield _make_page(index, start, offset - start, digest.hexdigest(), meta_lines, body_lines)
+
+
+def iter_file_pages(path: Path) -> Iterator[Page]:
+    """iter_pages() over a mirror file or an archived (.gz/.zst) version of one."""
+    with open_version(path) as f:
+        yield from iter_pages(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List the <page> records in an llms-full export.")
+    parser.add_argument("file", type=Path)
+    parser.add_argument("--limit", type=int, default=0, help="Stop after N pages (default: all)")
+    args = parser.parse_args()
+
+    count = 0
+    for page in iter_file_pages(args.file):
+        print(f"{page.index:5d}  {page.last_updated[:10]:10}  {page.title}  <{page.key}>")
+        count += 1
+        if args.limit and count >= args.limit:
+            break
+
+
+if __name__ == "__main__":
+    main()
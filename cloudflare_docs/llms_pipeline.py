@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Process-pool executor for the CPU-bound stages of the mirror tooling.
+
+Fetching is I/O-bound and already concurrent (llms_fetch.py); what is left
+on one core is per-file and per-page work: parsing and hashing pages for the
+change feed, compressing archived versions, chunking. ordered_map() fans a
+picklable, module-level function out over a ProcessPoolExecutor with at most
+max_pending tasks in flight (so a large input is never materialised ahead of
+the workers) and yields results in input order, so the caller can write
+output sequentially exactly as the inline loop would.
+
+workers=1 runs inline in the calling process, with no pool and no pickling,
+and is the default of every --workers flag: a routine refresh touches a few
+files, and forking a pool (next to the downloader's live fetch threads) costs
+more than it saves. Pass --workers 0 (one per CPU) for full rebuilds on a
+multi-core machine.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Optional, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+CPU_COUNT = os.cpu_count() or 1
+DEFAULT_WORKERS = 1
+PENDING_PER_WORKER = 4
+
+
+def ordered_map(
+    fn: Callable[[T], R], items: Iterable[T], workers: int = DEFAULT_WORKERS, max_pending: Optional[int] = None
+) -> Iterator[R]:
+    """fn over items in worker processes, yielded in input order; at most max_pending submitted but unconsumed."""
+    if workers <= 1:
+        yield from map(fn, items)
+        return
+    max_pending = max_pending or workers * PENDING_PER_WORKER
+    items = iter(items)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque(pool.submit(fn, item) for item in islice(items, max_pending))
+        while pending:
+            result = pending.popleft().result()
+            for item in islice(items, 1):
+                pending.append(pool.submit(fn, item))
+            yield result
+
+
+def batched(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Lists of up to size items; per-page work is batched so each task outweighs its IPC."""
+    items = iter(items)
+    while True:
+        batch = list(islice(items, size))
+        if not batch:
+            return
+        yield batch
+
+
+def workers_arg(value: str) -> int:
+    """argparse type for --workers: a count >= 1, or 0 for one per CPU."""
+    n = int(value)
+    if n < 0:
+        raise ValueError(value)
+    return n or CPU_COUNT
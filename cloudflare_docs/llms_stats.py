@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Corpus statistics and growth history of the mirror, for sizing context
+windows and index capacity.
+
+Per category and service it reports the current exports' page bytes, pages,
+estimated tokens (llms_chunks.count_tokens: cl100k_base when tiktoken is
+installed) and duplicate ratio (pages whose content appears more than once
+in the group), and, from the `_archive/` history, how many versions each
+export had, how often its content changed and how many pages a change
+touched. A timeline then shows the corpus size and the changes per month
+(or --bucket week/day), reconstructed from each version's Retrieved-At.
+
+Every file (current or archived) is parsed once with the streaming page
+parser and its per-page summary (sha, tokens, bytes) cached under
+<base>/_stats/files.json by its Content-SHA256, so a re-run after a refresh
+only parses the files that changed; identical copies across categories and
+versions share one entry. The full report is written to _stats/report.json.
+
+Usage:
+    python llms_stats.py [--base cloudflare_docs] [--category ai_and_rag] [--bucket week] [--workers 0]
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from llms_archive import list_versions, open_version
+from llms_changes import unique_key
+from llms_chunks import count_tokens, tokenizer_name
+from llms_corpus import iter_exports
+from llms_header import CONTENT_SHA_KEY, parse_header
+from llms_pages import iter_pages
+from llms_pipeline import DEFAULT_WORKERS, ordered_map, workers_arg
+
+STATS_DIR = "_stats"
+CACHE_NAME = "files.json"
+REPORT_NAME = "report.json"
+STATS_VERSION = 1
+PAGE_SHA_CHARS = 16  # enough to tell pages apart; keeps the cache small
+
+
+class Version(NamedTuple):
+    """One version of an export: the current file or an archived copy."""
+
+    path: Path
+    key: str  # cache key: Content-SHA256 (or path/size/mtime for files without one)
+    retrieved_at: datetime
+
+
+def read_version_header(path: Path, fallback: datetime) -> Tuple[str, datetime]:
+    """(cache key, Retrieved-At) from a version's metadata header; archives are decompressed only that far."""
+    with open_version(path) as f:
+        fields, _ = parse_header(f)
+    sha = fields.get(CONTENT_SHA_KEY, "")
+    if not sha:
+        st = path.stat()
+        sha = f"{path}:{st.st_size}:{st.st_mtime_ns}"
+    try:
+        retrieved_at = datetime.fromisoformat(fields.get("Retrieved-At", ""))
+    except ValueError:
+        retrieved_at = fallback
+    if retrieved_at.tzinfo is None:
+        retrieved_at = retrieved_at.astimezone()
+    return sha, retrieved_at
+
+
+def scan_file(path: Path) -> dict:
+    """
+    Pool task: per-page [sha prefix, tokens, bytes] by page key, streamed one page at a time.
+    Exports without <page> blocks (llms.txt, prompt.txt) are small; their body is counted as "other".
+    """
+    pages: Dict[str, list] = {}
+    seen: Dict[str, int] = {}
+    with open_version(path) as f:
+        for page in iter_pages(f):
+            pages[unique_key(page.key, seen)] = [page.sha[:PAGE_SHA_CHARS], count_tokens(page.body), page.length]
+    other = [0, 0]
+    if not pages:
+        with open_version(path) as f:
+            parse_header(f)
+            body = f.read()
+        other = [count_tokens(body.decode("utf-8", "replace")), len(body)]
+    return {"pages": pages, "other": other}
+
+
+def load_cache(path: Path, params: dict) -> Dict[str, dict]:
+    if not path.exists():
+        return {}
+    try:
+        saved = json.loads(path.read_text(encoding="utf-8"))
+    except ValueError:
+        return {}
+    return saved["files"] if saved.get("params") == params else {}
+
+
+def save_cache(path: Path, params: dict, files: Dict[str, dict]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps({"params": params, "files": files}, separators=(",", ":")) + "\n", encoding="utf-8")
+    tmp.replace(path)
+
+
+def totals(pages: List[list], others: List[list]) -> Dict[str, float]:
+    """
+    Size of a set of pages ([sha, tokens, bytes] each) plus non-page bodies ([tokens, bytes] each),
+    and the share of pages that repeat content already counted.
+    """
+    unique = {p[0] for p in pages}
+    return {
+        "pages": len(pages),
+        "tokens": sum(p[1] for p in pages) + sum(o[0] for o in others),
+        "bytes": sum(p[2] for p in pages) + sum(o[1] for o in others),
+        "unique_pages": len(unique),
+        "dup_ratio": 1 - len(unique) / len(pages) if pages else 0.0,
+    }
+
+
+def page_changes(old: Dict[str, list], new: Dict[str, list]) -> int:
+    """Pages added, removed or modified between two versions of an export."""
+    return len(old.keys() ^ new.keys()) + sum(1 for k in old.keys() & new.keys() if old[k][0] != new[k][0])
+
+
+def bucket_start(d: datetime, bucket: str) -> datetime:
+    d = d.replace(hour=0, minute=0, second=0, microsecond=0)
+    if bucket == "week":
+        return d - timedelta(days=d.weekday())
+    if bucket == "month":
+        return d.replace(day=1)
+    return d
+
+
+def next_bucket(d: datetime, bucket: str) -> datetime:
+    if bucket == "month":
+        return (d.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return d + timedelta(days=7 if bucket == "week" else 1)
+
+
+def build_report(
+    base_dir: Path, categories: Optional[List[str]] = None, bucket: str = "month", workers: int = 1
+) -> Dict[str, object]:
+    started = time.perf_counter()
+    now = datetime.now().astimezone()
+    params = {"version": STATS_VERSION, "tokenizer": tokenizer_name()}
+    cache_path = base_dir / STATS_DIR / CACHE_NAME
+    cached = load_cache(cache_path, params)
+
+    # Headers only: every version of every export, oldest first
+    exports: Dict[Tuple[str, str, Path], List[Version]] = {}
+    for export in iter_exports(base_dir, categories, unique_urls=False):
+        versions = []
+        for archived in list_versions(export.path):
+            versions.append(Version(archived.path, *read_version_header(archived.path, archived.archived_at)))
+        mtime = datetime.fromtimestamp(export.path.stat().st_mtime).astimezone()
+        versions.append(Version(export.path, *read_version_header(export.path, mtime)))
+        versions.sort(key=lambda v: v.retrieved_at)
+        exports[(export.category, export.service, export.path)] = versions
+
+    # Parse only what the cache doesn't know (once per distinct content)
+    files: Dict[str, dict] = {}
+    missing: Dict[str, Path] = {}
+    for versions in exports.values():
+        for v in versions:
+            if v.key in cached:
+                files[v.key] = cached[v.key]
+            else:
+                missing.setdefault(v.key, v.path)
+    for key, result in zip(missing, ordered_map(scan_file, missing.values(), workers)):
+        files[key] = result
+    # A full scan drops entries nothing refers to any more; a --category scan keeps the others'
+    save_cache(cache_path, params, {**cached, **files} if categories else files)
+
+    groups: Dict[Tuple[str, str], dict] = {}
+    all_pages: List[list] = []
+    all_others: List[list] = []
+    events: List[Tuple[datetime, str, int]] = []  # (when, export, pages changed) per content change
+    for (category, service, path), versions in sorted(exports.items()):
+        current = files[versions[-1].key]["pages"]
+        other = files[versions[-1].key]["other"]
+        changes = [
+            (b.retrieved_at, page_changes(files[a.key]["pages"], files[b.key]["pages"]))
+            for a, b in zip(versions, versions[1:])
+            if a.key != b.key
+        ]
+        events += [(when, str(path), n) for when, n in changes]
+        all_pages += current.values()
+        all_others.append(other)
+        for group in ((category, ""), (category, service)):
+            g = groups.setdefault(group, {"files": 0, "pages": [], "others": [], "versions": 0, "changes": 0, "pages_changed": 0, "since": now})
+            g["files"] += 1
+            g["pages"] += current.values()
+            g["others"].append(other)
+            g["versions"] += len(versions)
+            g["changes"] += len(changes)
+            g["pages_changed"] += sum(n for _, n in changes)
+            g["since"] = min(g["since"], versions[0].retrieved_at)
+
+    rows = []
+    for (category, service), g in sorted(groups.items()):
+        days = max((now - g["since"]).total_seconds() / 86400, 1.0)
+        rows.append(
+            {
+                "category": category,
+                "service": service,
+                "files": g["files"],
+                **totals(g["pages"], g["others"]),
+                "versions": g["versions"],
+                "changes": g["changes"],
+                "changes_per_30d": g["changes"] * 30 / days,
+                "pages_per_change": g["pages_changed"] / g["changes"] if g["changes"] else 0.0,
+                "since": g["since"].isoformat(),
+            }
+        )
+
+    # Corpus as it stood at the end of each bucket: each export's newest version retrieved by then
+    timeline = []
+    first = min((v.retrieved_at for versions in exports.values() for v in versions), default=now)
+    start = bucket_start(first, bucket)
+    while start <= now:
+        end = next_bucket(start, bucket)
+        state = [
+            files[[v for v in versions if v.retrieved_at < end][-1].key]
+            for versions in exports.values()
+            if versions[0].retrieved_at < end
+        ]
+        in_bucket = [n for when, _, n in events if start <= when < end]
+        timeline.append(
+            {
+                "start": start.date().isoformat(),
+                "files": len(state),
+                **totals([p for f in state for p in f["pages"].values()], [f["other"] for f in state]),
+                "changes": len(in_bucket),
+                "pages_changed": sum(in_bucket),
+            }
+        )
+        start = end
+
+    report = {
+        "generated_at": now.isoformat(),
+        "tokenizer": tokenizer_name(),
+        "bucket": bucket,
+        "total": {"files": len(exports), **totals(all_pages, all_others)},
+        "groups": rows,
+        "timeline": timeline,
+        "scan": {
+            "versions": sum(len(v) for v in exports.values()),
+            "parsed": len(missing),
+            "cached": len(files) - len(missing),
+            "seconds": time.perf_counter() - started,
+        },
+    }
+    report_path = base_dir / STATS_DIR / REPORT_NAME
+    tmp = report_path.with_name(report_path.name + ".tmp")
+    tmp.write_text(json.dumps(report, indent=2, default=str) + "\n", encoding="utf-8")
+    tmp.replace(report_path)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Size, duplication and change history of the llms.txt mirror.")
+    parser.add_argument("--base", default="cloudflare_docs", help="Base folder of the mirror (default: cloudflare_docs)")
+    parser.add_argument("--category", action="append", default=[], help="Limit to a category (repeatable)")
+    parser.add_argument("--bucket", choices=["day", "week", "month"], default="month", help="Timeline granularity")
+    parser.add_argument("--no-services", action="store_true", help="Only show per-category rows")
+    parser.add_argument("--workers", type=workers_arg, default=DEFAULT_WORKERS, help=f"Processes for parsing; 0 = one per CPU (default: {DEFAULT_WORKERS})")
+    args = parser.parse_args()
+
+    base_dir = Path(args.base)
+    report = build_report(base_dir, args.category or None, args.bucket, args.workers)
+
+    print(
+        f"{'category / service':<44} {'files':>5} {'bytes':>13} {'pages':>7} {'tokens':>12} {'dup':>6} "
+        f"{'vers':>5} {'chg':>4} {'chg/30d':>8} {'pg/chg':>7}"
+    )
+    for row in report["groups"]:
+        if row["service"] and args.no_services:
+            continue
+        name = f"  {row['service']}" if row["service"] else row["category"]
+        print(
+            f"{name:<44} {row['files']:>5} {row['bytes']:>13,} {row['pages']:>7,} {row['tokens']:>12,} "
+            f"{row['dup_ratio']:>6.1%} {row['versions']:>5} {row['changes']:>4} {row['changes_per_30d']:>8.2f} "
+            f"{row['pages_per_change']:>7.1f}"
+        )
+    total = report["total"]
+    print(
+        f"\nMirror: {total['files']} files, {total['bytes']:,} bytes, {total['pages']:,} pages, {total['tokens']:,} tokens "
+        f"({report['tokenizer']}); {total['unique_pages']:,} distinct pages ({total['dup_ratio']:.1%} duplicated)"
+    )
+
+    print(f"\n{'per ' + args.bucket:<12} {'files':>5} {'bytes':>13} {'pages':>7} {'distinct':>8} {'tokens':>12} {'chg':>4} {'pages chg':>9}")
+    for entry in report["timeline"]:
+        print(
+            f"{entry['start']:<12} {entry['files']:>5} {entry['bytes']:>13,} {entry['pages']:>7,} {entry['unique_pages']:>8,} "
+            f"{entry['tokens']:>12,} {entry['changes']:>4} {entry['pages_changed']:>9,}"
+        )
+
+    scan = report["scan"]
+    print(
+        f"\nScanned {scan['versions']} versions: parsed {scan['parsed']}, cached {scan['cached']} "
+        f"in {scan['seconds']:.2f}s -> {base_dir / STATS_DIR / REPORT_NAME}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Local HTTP stand-in for developers.cloudflare.com, serving the mirror on disk.
+
+Every export under <root>/<category>/<service>/ is served at the path of its
+Source-URL header (metadata block stripped), so
+
+    python llms_stub_server.py --port 8799 &
+    python download_llms_txt.py --base /tmp/mirror --origin http://127.0.0.1:8799
+
+exercises the downloader without touching the network. Responses carry an
+ETag and Last-Modified and honour If-None-Match / If-Modified-Since with 304.
+Network conditions and faults can be simulated:
+
+    --latency S         delay before each response's headers (TTFB)
+    --bandwidth BPS     throttle each response body to BPS bytes/second
+    --fail-first N      answer the first N requests for each path with 503
+    --fail-rate P       answer a fraction P of requests with 503
+    --truncate-rate P   send only part of the body for a fraction P of requests
+    --gzip              gzip bodies for clients that accept it (own ETag, Vary)
+    --bad-range         answer Range requests with a 206 that starts a byte early
+"""
+
+import argparse
+import gzip
+import io
+import random
+import threading
+import time
+from collections import Counter
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import BinaryIO, Dict, NamedTuple, Optional, Tuple
+from urllib.parse import urlparse
+
+from llms_header import read_header
+
+HERE = Path(__file__).resolve().parent
+COPY_CHUNK = 64 * 1024
+
+
+class Faults(NamedTuple):
+    fail_first: int = 0
+    fail_rate: float = 0.0
+    truncate_rate: float = 0.0
+    seed: Optional[int] = None
+    latency: float = 0.0
+    bandwidth: int = 0  # bytes/second per response, 0 = unthrottled
+    gzip: bool = False  # Content-Encoding: gzip when the request's Accept-Encoding allows it
+    bad_range: bool = False  # 206 responses start one byte before the requested offset
+
+
+class Route(NamedTuple):
+    path: Path
+    body_offset: int
+    size: int
+    last_modified: str
+    etag: str
+
+
+def build_routes(root: Path) -> Dict[str, Route]:
+    """Map URL path -> export on disk. The first copy of a URL (in sorted order) wins."""
+    routes: Dict[str, Route] = {}
+    for path in sorted(root.glob("*/*/*.txt")):
+        if path.parts[-3].startswith(("_", ".")):
+            continue
+        fields, body_offset = read_header(path)
+        url_path = urlparse(fields["Source-URL"]).path if fields.get("Source-URL") else "/" + path.name
+        if url_path in routes:
+            continue
+        st = path.stat()
+        size = st.st_size - body_offset
+        etag = f'"{st.st_mtime_ns:x}-{size:x}"'
+        routes[url_path] = Route(path, body_offset, size, formatdate(st.st_mtime, usegmt=True), etag)
+    return routes
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], root: Path, faults: Faults = Faults()):
+        super().__init__(address, StubHandler)
+        self.root = root
+        self.routes = build_routes(root)
+        self.faults = faults
+        self.rng = random.Random(faults.seed)
+        self.lock = threading.Lock()
+        self.hits: Counter = Counter()
+        self.requests = 0
+        self.not_modified = 0
+        self.bytes_sent = 0
+        self.gzipped: Dict[Path, bytes] = {}
+
+    def reload(self) -> None:
+        """Re-scan the root after its files changed (new ETags / Last-Modified)."""
+        self.routes = build_routes(self.root)
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {"requests": self.requests, "not_modified": self.not_modified, "bytes_sent": self.bytes_sent}
+
+    @property
+    def origin(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def roll(self, path: str) -> Tuple[bool, bool]:
+        """Decide (fail, truncate) for one request."""
+        with self.lock:
+            self.requests += 1
+            self.hits[path] += 1
+            fail = self.hits[path] <= self.faults.fail_first or self.rng.random() < self.faults.fail_rate
+            truncate = not fail and self.rng.random() < self.faults.truncate_rate
+        return fail, truncate
+
+    def gzip_body(self, route: Route) -> bytes:
+        """The route's body gzipped (mtime 0, so the bytes and their ETag are stable), cached per file."""
+        with self.lock:
+            data = self.gzipped.get(route.path)
+        if data is None:
+            with route.path.open("rb") as f:
+                f.seek(route.body_offset)
+                data = gzip.compress(f.read(), mtime=0)
+            with self.lock:
+                self.gzipped[route.path] = data
+        return data
+
+    def count_bytes(self, n: int) -> None:
+        with self.lock:
+            self.bytes_sent += n
+
+    def count_not_modified(self) -> None:
+        with self.lock:
+            self.not_modified += 1
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    server: StubServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        self.handle_request(send_body=False)
+
+    def do_GET(self):
+        self.handle_request(send_body=True)
+
+    def handle_request(self, send_body: bool) -> None:
+        path = urlparse(self.path).path
+        route = self.server.routes.get(path)
+        if route is None:
+            self.send_error(404)
+            return
+
+        faults = self.server.faults
+        if faults.latency:
+            time.sleep(faults.latency)
+        fail, truncate = self.server.roll(path)
+        if fail:
+            self.send_response(503)
+            self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        encoded = faults.gzip and "gzip" in self.headers.get("Accept-Encoding", "")
+        if encoded:
+            # A different representation needs its own strong ETag, or If-Range could splice the two
+            data = self.server.gzip_body(route)
+            route = route._replace(size=len(data), etag=route.etag[:-1] + '-gz"')
+        if self.not_modified(route):
+            self.server.count_not_modified()
+            self.send_response(304)
+            self.send_header("ETag", route.etag)
+            self.send_header("Last-Modified", route.last_modified)
+            self.end_headers()
+            return
+
+        start = self.range_start(route)
+        if start and faults.bad_range:
+            start -= 1
+        length = route.size - start
+        self.send_response(206 if start else 200)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(length))
+        self.send_header("ETag", route.etag)
+        self.send_header("Last-Modified", route.last_modified)
+        self.send_header("Accept-Ranges", "bytes")
+        if faults.gzip:
+            self.send_header("Vary", "Accept-Encoding")
+        if encoded:
+            self.send_header("Content-Encoding", "gzip")
+        if start:
+            self.send_header("Content-Range", f"bytes {start}-{route.size - 1}/{route.size}")
+        self.end_headers()
+        if not send_body:
+            return
+        if encoded:
+            self.send_body(io.BytesIO(data), start, length, truncate)
+        else:
+            with route.path.open("rb") as f:
+                self.send_body(f, route.body_offset + start, length, truncate)
+
+    def send_body(self, f: BinaryIO, offset: int, length: int, truncate: bool) -> None:
+        faults = self.server.faults
+
+        # A truncated response promises the full Content-Length, then drops the connection
+        remaining = length // 2 if truncate else length
+        chunk_size = min(COPY_CHUNK, faults.bandwidth) if faults.bandwidth else COPY_CHUNK
+        sent_started = time.monotonic()
+        sent = 0
+        f.seek(offset)
+        while remaining > 0:
+            chunk = f.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            self.wfile.write(chunk)
+            self.server.count_bytes(len(chunk))
+            remaining -= len(chunk)
+            sent += len(chunk)
+            if faults.bandwidth:
+                ahead = sent / faults.bandwidth - (time.monotonic() - sent_started)
+                if ahead > 0:
+                    time.sleep(ahead)
+        if truncate:
+            self.close_connection = True
+
+    def not_modified(self, route: Route) -> bool:
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match:
+            return route.etag in [t.strip() for t in if_none_match.split(",")] or if_none_match.strip() == "*"
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since:
+            try:
+                return parsedate_to_datetime(route.last_modified) <= parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def range_start(self, route: Route) -> int:
+        """Honour `Range: bytes=N-` (only if If-Range, when sent, still matches)."""
+        spec = self.headers.get("Range", "")
+        if not spec.startswith("bytes=") or not spec.endswith("-"):
+            return 0
+        if_range = self.headers.get("If-Range")
+        if if_range and if_range not in (route.etag, route.last_modified):
+            return 0
+        try:
+            start = int(spec[len("bytes="):-1])
+        except ValueError:
+            return 0
+        return start if 0 < start < route.size else 0
+
+
+def serve(root: Path = HERE, host: str = "127.0.0.1", port: int = 0, faults: Faults = Faults()) -> StubServer:
+    """Start a stub server on a background thread; port 0 picks a free port (see server.origin)."""
+    server = StubServer((host, port), root, faults)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the local llms.txt mirror as a stand-in for developers.cloudflare.com.")
+    parser.add_argument("--root", default=str(HERE), help="Mirror to serve (default: this folder)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8799)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait before each response (TTFB)")
+    parser.add_argument("--bandwidth", type=int, default=0, help="Per-response body throttle in bytes/second (0 = off)")
+    parser.add_argument("--fail-first", type=int, default=0, help="Answer the first N requests per path with 503")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--truncate-rate", type=float, default=0.0, help="Fraction of bodies cut off part-way")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible fault injection")
+    parser.add_argument("--gzip", action="store_true", help="gzip bodies for clients that send Accept-Encoding: gzip")
+    parser.add_argument("--bad-range", action="store_true", help="Start 206 responses one byte before the requested offset")
+    args = parser.parse_args()
+
+    faults = Faults(
+        args.fail_first, args.fail_rate, args.truncate_rate, args.seed, args.latency, args.bandwidth, args.gzip, args.bad_range
+    )
+    server = StubServer((args.host, args.port), Path(args.root), faults)
+    print(f"Serving {len(server.routes)} exports from {args.root} at {server.origin}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Export the embedded chunks as Vectorize upsert/delete batches.
+
+Every chunk becomes one vector: values from the llms_vectors.py index (in
+chunk order), metadata with source_url, title, category, service, heading
+trail and the chunk text (trimmed to Vectorize's 10 KiB metadata limit).
+Vector IDs are derived from the page source URL and the chunk's content
+hash, so an unchanged chunk keeps its ID across runs however the page
+around it moves.
+
+Each export is diffed against <base>/_vectorize/<index>/state.json (ID ->
+fingerprint of values + metadata) and writes only what changed since the
+previous export, into <base>/_vectorize/<index>/<timestamp>/:
+
+    upsert-0001.ndjson   new and changed vectors, <= --batch-size per file
+    delete-0001.json     {"ids": [...]} for vectors that no longer exist
+    export.json          counts and file list
+
+Upload the files in name order (e.g. `wrangler vectorize upsert <index>
+--file=upsert-0001.ndjson`, or the HTTP API's upsert / delete_by_ids).
+`verify` replays every export into LocalVectorize, a stand-in that applies
+the service's limits, and checks the result matches the current state.
+
+Usage:
+    python llms_vectorize.py export [--base cloudflare_docs] [--index-name cf-docs] [--batch-size 1000] [--full]
+    python llms_vectorize.py verify [--base cloudflare_docs] [--index-name cf-docs]
+"""
+
+import argparse
+import hashlib
+import json
+import math
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
+from llms_changes import FEED_TIMESTAMP_FORMAT, unique_key
+from llms_chunks import chunks_path
+from llms_vectors import VectorIndex, iter_chunk_records, vectors_dir
+
+EXPORT_DIR = "_vectorize"
+STATE_NAME = "state.json"
+DEFAULT_INDEX_NAME = "cf-docs"
+
+# https://developers.cloudflare.com/vectorize/platform/limits/
+MAX_ID_BYTES = 64
+MAX_METADATA_BYTES = 10 * 1024
+MAX_LABEL_BYTES = 1024  # per title / heading trail inside the metadata
+MAX_DIMENSIONS = 1536
+WORKERS_BATCH = 1000
+HTTP_BATCH = 5000
+MAX_UPLOAD_BYTES = 100 * 1024 * 1024
+
+
+class Vector(NamedTuple):
+    id: str
+    values: List[float]
+    metadata: dict
+
+    def ndjson(self) -> bytes:
+        line = json.dumps({"id": self.id, "values": self.values, "metadata": self.metadata}, ensure_ascii=False)
+        return line.encode("utf-8") + b"\n"
+
+    def fingerprint(self) -> str:
+        payload = json.dumps([self.values, self.metadata], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def export_root(base_dir: Path, index_name: str) -> Path:
+    return base_dir / EXPORT_DIR / index_name
+
+
+def vector_id(source: str, chunk_sha: str) -> str:
+    """32 hex chars (well under the 64-byte ID limit), stable while the chunk text is unchanged."""
+    return hashlib.sha256(f"{source}\0{chunk_sha}".encode("utf-8")).hexdigest()[:32]
+
+
+def metadata_bytes(metadata: dict) -> int:
+    return len(json.dumps(metadata, ensure_ascii=False).encode("utf-8"))
+
+
+def trim_field(metadata: dict, key: str, limit: int = MAX_METADATA_BYTES) -> None:
+    """Cut metadata[key] to the longest prefix (possibly empty) with which the metadata fits in limit bytes."""
+    if metadata_bytes(metadata) <= limit:
+        return
+    encoded = metadata[key].encode("utf-8")
+    # JSON escaping makes the size non-linear in the prefix length: bisect on it
+    lo, hi = 0, len(encoded)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        metadata[key] = encoded[:mid].decode("utf-8", "ignore")
+        if metadata_bytes(metadata) <= limit:
+            lo = mid
+        else:
+            hi = mid - 1
+    metadata[key] = encoded[:lo].decode("utf-8", "ignore")
+
+
+def chunk_metadata(record: dict) -> dict:
+    metadata = {
+        "source_url": record["source_url"],
+        "title": record["title"],
+        "category": record["category"],
+        "service": record["service"],
+        "headings": " > ".join(record["headings"]),
+        "chunk_index": record["chunk_index"],
+        "page_sha": record["page_sha"],
+        "text": "",
+    }
+    # Headings and title give way first: capped so the text always has room, then cut further if still over
+    for key in ("headings", "title"):
+        trim_field(metadata, key, metadata_bytes({**metadata, key: ""}) + MAX_LABEL_BYTES)
+        trim_field(metadata, key)
+    metadata["text"] = record["text"]
+    trim_field(metadata, "text")
+    return metadata
+
+
+def iter_vectors(chunks: Path, vectors: Path) -> Iterator[Vector]:
+    """One Vector per chunk line; the vector index must have been built from this chunk file."""
+    values = VectorIndex(vectors).vectors_by_row()
+    stale = ValueError(f"{vectors} is out of date with {chunks}; rebuild it with llms_vectors.py build")
+    seen: Dict[str, int] = {}
+    with (vectors / "meta.jsonl").open("r", encoding="utf-8") as meta:
+        for row, record in enumerate(iter_chunk_records(chunks)):
+            line = meta.readline()
+            if not line or json.loads(line)["id"] != record["id"]:
+                raise stale
+            source = record["source_url"] or record["url"]
+            # Identical chunks within a page get distinct (still stable) IDs
+            key = unique_key(vector_id(source, record["sha"]), seen)
+            vid = key if "#" not in key else vector_id(source, key)
+            yield Vector(vid, [round(float(x), 6) for x in values[row]], chunk_metadata(record))
+        if meta.readline():
+            raise stale
+
+
+def load_state(root: Path) -> dict:
+    path = root / STATE_NAME
+    if not path.exists():
+        return {"dimensions": 0, "vectors": {}}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def write_batches(out_dir: Path, vectors: List[Vector], batch_size: int) -> List[str]:
+    """upsert-NNNN.ndjson files of at most batch_size vectors and MAX_UPLOAD_BYTES each."""
+    names: List[str] = []
+    f = None
+    count = size = 0
+    try:
+        for vector in vectors:
+            line = vector.ndjson()
+            if f is None or count >= batch_size or size + len(line) > MAX_UPLOAD_BYTES:
+                if f is not None:
+                    f.close()
+                names.append(f"upsert-{len(names) + 1:04d}.ndjson")
+                f = (out_dir / names[-1]).open("wb")
+                count = size = 0
+            f.write(line)
+            count += 1
+            size += len(line)
+    finally:
+        if f is not None:
+            f.close()
+    return names
+
+
+def export(
+    base_dir: Path,
+    index_name: str = DEFAULT_INDEX_NAME,
+    batch_size: int = WORKERS_BATCH,
+    full: bool = False,
+    chunks: Optional[Path] = None,
+    vectors: Optional[Path] = None,
+) -> Dict[str, object]:
+    """Write the batches needed to bring the remote index from the last export to the current chunks."""
+    if not 0 < batch_size <= HTTP_BATCH:
+        raise ValueError(f"batch size must be 1..{HTTP_BATCH}")
+    root = export_root(base_dir, index_name)
+    # A full export still diffs against the previous state: it re-sends every
+    # vector, but ids that are gone must be deleted or they stay in the index
+    state = load_state(root)
+    previous: Dict[str, str] = state["vectors"]
+
+    current: Dict[str, str] = {}
+    inserts: List[Vector] = []
+    updates: List[Vector] = []
+    dimensions = 0
+    for vector in iter_vectors(chunks or chunks_path(base_dir), vectors or vectors_dir(base_dir)):
+        dimensions = len(vector.values)
+        fp = vector.fingerprint()
+        current[vector.id] = fp
+        old = previous.get(vector.id)
+        if old is None or full:
+            inserts.append(vector)
+        elif old != fp:
+            updates.append(vector)
+    deletes = sorted(set(previous) - set(current))
+    if not full and state["dimensions"] and state["dimensions"] != dimensions:
+        raise ValueError(
+            f"dimensions changed ({state['dimensions']} -> {dimensions}); create a new index and export with --full"
+        )
+
+    stats: Dict[str, object] = {
+        "index": index_name,
+        "inserts": len(inserts),
+        "updates": len(updates),
+        "deletes": len(deletes),
+        "unchanged": len(current) - len(inserts) - len(updates),
+        "dimensions": dimensions,
+        "full": full,
+        "files": [],
+        "path": "",
+    }
+    if not (inserts or updates or deletes):
+        return stats
+
+    run_at = datetime.now().astimezone()
+    out_dir = root / run_at.strftime(FEED_TIMESTAMP_FORMAT)
+    out_dir.mkdir(parents=True)
+    files: List[str] = []
+    for i in range(0, len(deletes), batch_size):
+        files.append(f"delete-{i // batch_size + 1:04d}.json")
+        (out_dir / files[-1]).write_text(json.dumps({"ids": deletes[i : i + batch_size]}) + "\n", encoding="utf-8")
+    files += write_batches(out_dir, inserts + updates, batch_size)
+    stats.update(files=files, path=str(out_dir), exported_at=run_at.isoformat(), batch_size=batch_size)
+    (out_dir / "export.json").write_text(json.dumps(stats, indent=2) + "\n", encoding="utf-8")
+
+    # The state only moves forward once the export is complete on disk
+    tmp = root / (STATE_NAME + ".tmp")
+    tmp.write_text(json.dumps({"dimensions": dimensions, "vectors": current}) + "\n", encoding="utf-8")
+    tmp.replace(root / STATE_NAME)
+    return stats
+
+
+class LocalVectorize:
+    """In-memory stand-in for a Vectorize index that enforces the documented limits on every payload."""
+
+    def __init__(self, dimensions: int = 0):
+        self.dimensions = dimensions
+        self.vectors: Dict[str, Vector] = {}
+
+    def check(self, vector: Vector) -> None:
+        if not vector.id or len(vector.id.encode("utf-8")) > MAX_ID_BYTES:
+            raise ValueError(f"vector id {vector.id!r} is empty or longer than {MAX_ID_BYTES} bytes")
+        if not self.dimensions:
+            self.dimensions = len(vector.values)
+        if len(vector.values) != self.dimensions or self.dimensions > MAX_DIMENSIONS:
+            raise ValueError(f"{vector.id}: {len(vector.values)} values for a {self.dimensions}-dimension index")
+        if not all(isinstance(x, (int, float)) and math.isfinite(x) for x in vector.values):
+            raise ValueError(f"{vector.id}: values must be finite numbers")
+        if metadata_bytes(vector.metadata) > MAX_METADATA_BYTES:
+            raise ValueError(f"{vector.id}: metadata over {MAX_METADATA_BYTES} bytes")
+
+    def upsert_file(self, path: Path, batch_limit: int = HTTP_BATCH) -> int:
+        if path.stat().st_size > MAX_UPLOAD_BYTES:
+            raise ValueError(f"{path}: over the {MAX_UPLOAD_BYTES}-byte upload limit")
+        batch: Dict[str, Vector] = {}
+        with path.open("r", encoding="utf-8") as f:
+            for n, line in enumerate(f, 1):
+                item = json.loads(line)
+                unexpected = set(item) - {"id", "values", "metadata", "namespace"}
+                if unexpected:
+                    raise ValueError(f"{path}:{n}: unexpected fields {sorted(unexpected)}")
+                vector = Vector(item["id"], item["values"], item.get("metadata", {}))
+                self.check(vector)
+                if vector.id in batch:
+                    raise ValueError(f"{path}:{n}: duplicate id {vector.id} in one batch")
+                batch[vector.id] = vector
+        if len(batch) > batch_limit:
+            raise ValueError(f"{path}: {len(batch)} vectors in one batch (limit {batch_limit})")
+        self.vectors.update(batch)
+        return len(batch)
+
+    def delete_file(self, path: Path, batch_limit: int = HTTP_BATCH) -> int:
+        ids = json.loads(path.read_text(encoding="utf-8"))["ids"]
+        if len(ids) > batch_limit:
+            raise ValueError(f"{path}: {len(ids)} ids in one batch (limit {batch_limit})")
+        for vid in ids:
+            self.vectors.pop(vid, None)
+        return len(ids)
+
+    def apply_export(self, out_dir: Path) -> None:
+        summary = json.loads((out_dir / "export.json").read_text(encoding="utf-8"))
+        for name in summary["files"]:
+            if name.startswith("delete-"):
+                self.delete_file(out_dir / name, summary["batch_size"])
+            else:
+                self.upsert_file(out_dir / name, summary["batch_size"])
+
+
+def iter_export_dirs(root: Path) -> Iterator[Path]:
+    for path in sorted(root.iterdir()) if root.is_dir() else []:
+        if (path / "export.json").exists():
+            yield path
+
+
+def verify(base_dir: Path, index_name: str = DEFAULT_INDEX_NAME) -> int:
+    """
+    Replay the exports into a LocalVectorize and compare with state.json.
+    Replay starts at the latest --full export (or one with unchanged == 0, which
+    re-sent everything too), since that one carries every live vector.
+    Returns the number of vectors; raises ValueError on any mismatch.
+    """
+    root = export_root(base_dir, index_name)
+    exports = list(iter_export_dirs(root))
+    summaries = [json.loads((d / "export.json").read_text(encoding="utf-8")) for d in exports]
+    full = [i for i, summary in enumerate(summaries) if summary.get("full") or summary["unchanged"] == 0]
+    start = full[-1] if full else 0
+    local = LocalVectorize()
+    for out_dir in exports[start:]:
+        local.apply_export(out_dir)
+
+    expected = load_state(root)["vectors"]
+    got = {vid: v.fingerprint() for vid, v in local.vectors.items()}
+    missing = set(expected) - set(got)
+    extra = set(got) - set(expected)
+    stale = [vid for vid in set(expected) & set(got) if expected[vid] != got[vid]]
+    if missing or extra or stale:
+        raise ValueError(f"replayed index differs from state: {len(missing)} missing, {len(extra)} extra, {len(stale)} stale")
+    return len(got)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export chunk vectors as Vectorize upsert/delete batches.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_export = sub.add_parser("export", help="Write batches for everything changed since the last export")
+    p_export.add_argument(
+        "--batch-size", type=int, default=WORKERS_BATCH, help=f"Vectors per file ({WORKERS_BATCH} Workers, {HTTP_BATCH} HTTP API)"
+    )
+    p_export.add_argument("--full", action="store_true", help="Re-send every vector (removed ones are still deleted)")
+    p_verify = sub.add_parser("verify", help="Replay the exports into a local stand-in and compare with the saved state")
+    for p in (p_export, p_verify):
+        p.add_argument("--base", default="cloudflare_docs", help="Base folder of the mirror (default: cloudflare_docs)")
+        p.add_argument("--index-name", default=DEFAULT_INDEX_NAME, help="Vectorize index the export targets")
+    args = parser.parse_args()
+
+    base_dir = Path(args.base)
+    if args.command == "verify":
+        count = verify(base_dir, args.index_name)
+        print(f"OK: replayed exports match the {count} vectors in {export_root(base_dir, args.index_name) / STATE_NAME}")
+        return
+
+    stats = export(base_dir, args.index_name, args.batch_size, args.full)
+    print(
+        f"Done. inserts={stats['inserts']}, updates={stats['updates']}, deletes={stats['deletes']}, "
+        f"unchanged={stats['unchanged']}, files={len(stats['files'])} -> {stats['path'] or 'nothing to export'}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+"""
+Offline vector index over the chunk JSONL written by llms_chunks.py.
+
+Embeddings need no network or model download: chunks are turned into
+TF-IDF rows over a fixed vocabulary (the MAX_VOCAB highest-df terms of
+llms_index.tokenize) and reduced to --dim dimensions with a randomized SVD
+(LSA). Every step runs in NumPy over row batches, so the dense TF-IDF matrix
+is never materialised in full.
+
+Search is approximate: an IVF index (spherical k-means into ~4*sqrt(N)
+lists) stores each list's vectors contiguously, and a query scans only its
+--nprobe nearest lists.
+
+The fitted model (vocabulary, IDF, projection) is kept across builds, so a
+chunk whose text did not change gets exactly the same vector and downstream
+syncs (llms_vectorize.py) only carry real changes; --refit fits it again on
+the current corpus. Everything lives in <base>/_vectors/ as .npy files
+that are opened with mmap_mode="r"; a build writes a fresh directory and
+swaps it in whole, so the files always belong to the same build:
+
+    projection.npy   (dim, vocab) float32  TF-IDF -> embedding
+    idf.npy          (vocab,) float32
+    vocab.json       term list, in projection column order
+    model.json       {"dim": requested --dim}; a small corpus may fit fewer
+    centroids.npy    (nlist, dim) float32
+    list_offsets.npy (nlist + 1,) int64    vectors of list i: [offsets[i], offsets[i+1])
+    vectors.npy      (N, dim) float32      L2-normalised, grouped by list
+    rows.npy         (N,) int64            line number of each vector's chunk
+    meta.jsonl + meta_offsets.npy          id / title / source_url per chunk line
+
+Usage:
+    python llms_vectors.py build [--base cloudflare_docs] [--dim 128]
+    python llms_vectors.py query "durable objects alarms" [-k 10] [--nprobe 8]
+"""
+
+import argparse
+import json
+import math
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from llms_chunks import chunks_path
+from llms_index import tokenize
+
+VECTORS_DIR = "_vectors"
+MAX_VOCAB = 16384
+DEFAULT_DIM = 128
+DEFAULT_NPROBE = 8
+BATCH_ROWS = 1024
+SVD_OVERSAMPLE = 10
+SVD_POWER_ITERS = 2
+KMEANS_ITERS = 12
+SEED = 0
+
+
+class SparseRows(NamedTuple):
+    """CSR-style term counts: row i is indices/data[indptr[i]:indptr[i+1]]."""
+
+    indptr: np.ndarray
+    indices: np.ndarray
+    data: np.ndarray
+
+    @property
+    def n_rows(self) -> int:
+        return len(self.indptr) - 1
+
+
+class VectorHit(NamedTuple):
+    score: float
+    row: int  # line number in the chunk JSONL
+    id: str
+    title: str
+    source_url: str
+
+
+def vectors_dir(base_dir: Path) -> Path:
+    return base_dir / VECTORS_DIR
+
+
+def iter_chunk_records(path: Path) -> Iterator[dict]:
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def chunk_text(record: dict) -> str:
+    # The title and heading trail are part of what a chunk is about
+    return " ".join([record.get("title", ""), *record.get("headings", []), record["text"]])
+
+
+def count_terms(chunks: Path) -> Tuple[List[Dict[str, int]], List[dict]]:
+    """Per-chunk term counts plus the metadata kept for search results."""
+    counts: List[Dict[str, int]] = []
+    meta: List[dict] = []
+    for record in iter_chunk_records(chunks):
+        row: Dict[str, int] = {}
+        for token in tokenize(chunk_text(record)):
+            row[token] = row.get(token, 0) + 1
+        counts.append(row)
+        meta.append({"id": record["id"], "title": record["title"], "source_url": record["source_url"]})
+    return counts, meta
+
+
+def build_vocab(counts: List[Dict[str, int]], max_vocab: int = MAX_VOCAB) -> Tuple[List[str], np.ndarray]:
+    """The max_vocab terms with the highest document frequency (df >= 2), and their IDF."""
+    df: Dict[str, int] = {}
+    for row in counts:
+        for term in row:
+            df[term] = df.get(term, 0) + 1
+    ranked = sorted((t for t, n in df.items() if n >= 2), key=lambda t: (-df[t], t))[:max_vocab]
+    n = len(counts)
+    idf = np.array([math.log((1 + n) / (1 + df[t])) + 1 for t in ranked], dtype=np.float32)
+    return ranked, idf
+
+
+def to_sparse(counts: List[Dict[str, int]], vocab: List[str]) -> SparseRows:
+    column = {t: i for i, t in enumerate(vocab)}
+    indptr = [0]
+    indices: List[int] = []
+    data: List[float] = []
+    for row in counts:
+        for term, tf in row.items():
+            j = column.get(term)
+            if j is not None:
+                indices.append(j)
+                data.append(1.0 + math.log(tf))
+        indptr.append(len(indices))
+    return SparseRows(
+        np.array(indptr, dtype=np.int64), np.array(indices, dtype=np.int32), np.array(data, dtype=np.float32)
+    )
+
+
+def dense_batch(rows: SparseRows, start: int, stop: int, idf: np.ndarray) -> np.ndarray:
+    """Rows [start, stop) as L2-normalised dense TF-IDF."""
+    out = np.zeros((stop - start, len(idf)), dtype=np.float32)
+    lo, hi = rows.indptr[start], rows.indptr[stop]
+    row_ids = np.repeat(np.arange(stop - start), np.diff(rows.indptr[start : stop + 1]))
+    cols = rows.indices[lo:hi]
+    out[row_ids, cols] = rows.data[lo:hi] * idf[cols]
+    norms = np.linalg.norm(out, axis=1, keepdims=True)
+    np.divide(out, norms, out=out, where=norms > 0)
+    return out
+
+
+def batches(n: int, size: int = BATCH_ROWS) -> Iterator[Tuple[int, int]]:
+    for start in range(0, n, size):
+        yield start, min(n, start + size)
+
+
+def randomized_svd(rows: SparseRows, idf: np.ndarray, dim: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Top-`dim` right singular vectors (dim, vocab) of the TF-IDF matrix A
+    (Halko et al.), touching A only through batched A @ X and A.T @ Y.
+    """
+    n, vocab = rows.n_rows, len(idf)
+    k = min(dim + SVD_OVERSAMPLE, n, vocab)
+
+    def a_times(x: np.ndarray) -> np.ndarray:
+        y = np.empty((n, x.shape[1]), dtype=np.float32)
+        for start, stop in batches(n):
+            y[start:stop] = dense_batch(rows, start, stop, idf) @ x
+        return y
+
+    def at_times(y: np.ndarray) -> np.ndarray:
+        x = np.zeros((vocab, y.shape[1]), dtype=np.float32)
+        for start, stop in batches(n):
+            x += dense_batch(rows, start, stop, idf).T @ y[start:stop]
+        return x
+
+    q, _ = np.linalg.qr(a_times(rng.standard_normal((vocab, k), dtype=np.float32)))
+    for _ in range(SVD_POWER_ITERS):
+        q, _ = np.linalg.qr(at_times(q))
+        q, _ = np.linalg.qr(a_times(q))
+    # B = Q.T @ A is small (k, vocab); its SVD gives A's right singular vectors
+    b = at_times(q).T
+    _, _, vt = np.linalg.svd(b, full_matrices=False)
+    return vt[: min(dim, k)].astype(np.float32)
+
+
+def normalize(x: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(x, axis=-1, keepdims=True)
+    return np.divide(x, norms, out=np.zeros_like(x), where=norms > 0)
+
+
+def spherical_kmeans(vectors: np.ndarray, nlist: int, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+    """Cosine k-means; returns (centroids, assignment)."""
+    centroids = vectors[rng.choice(len(vectors), nlist, replace=False)].copy()
+    assign = np.zeros(len(vectors), dtype=np.int64)
+
+    def assign_all() -> None:
+        for start, stop in batches(len(vectors), 8192):
+            assign[start:stop] = np.argmax(vectors[start:stop] @ centroids.T, axis=1)
+
+    for _ in range(KMEANS_ITERS):
+        assign_all()
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, vectors)
+        empty = ~sums.any(axis=1)
+        # Re-seed empty lists with random vectors so every list stays in use
+        sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()), replace=False)]
+        centroids = normalize(sums)
+    assign_all()
+    return centroids, assign
+
+
+def keep_file(src: Path, dest: Path) -> None:
+    """Carry a reused model file into the new build (hardlink, copy where links fail)."""
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copyfile(src, dest)
+
+
+def swap_dir(tmp_dir: Path, out_dir: Path) -> None:
+    """Replace out_dir with tmp_dir. Open mmaps of the old files stay valid."""
+    old = out_dir.with_name(f".{out_dir.name}.old")
+    shutil.rmtree(old, ignore_errors=True)
+    if out_dir.exists():
+        out_dir.rename(old)
+    tmp_dir.rename(out_dir)
+    shutil.rmtree(old, ignore_errors=True)
+
+
+def load_model(out_dir: Path) -> Optional[Tuple[List[str], np.ndarray, np.ndarray, int]]:
+    """(vocab, idf, projection, requested dim) of a previous build, or None."""
+    try:
+        vocab = json.loads((out_dir / "vocab.json").read_text(encoding="utf-8"))
+        dim = json.loads((out_dir / "model.json").read_text(encoding="utf-8"))["dim"]
+        return vocab, np.load(out_dir / "idf.npy"), np.load(out_dir / "projection.npy"), dim
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def build_vectors(
+    base_dir: Path,
+    chunks: Optional[Path] = None,
+    out_dir: Optional[Path] = None,
+    dim: int = DEFAULT_DIM,
+    nlist: int = 0,
+    refit: bool = False,
+) -> Dict[str, float]:
+    """Embed every chunk and write the IVF index, fitting the model only if needed. Returns build stats."""
+    chunks = chunks or chunks_path(base_dir)
+    out_dir = out_dir or vectors_dir(base_dir)
+    rng = np.random.default_rng(SEED)
+    started = time.perf_counter()
+
+    counts, meta = count_terms(chunks)
+    model = load_model(out_dir)
+    # Compare the requested dim, not projection rows: a corpus with fewer components fits fewer than asked for
+    refit = refit or model is None or model[3] != dim or not model[0]
+    if refit:
+        vocab, idf = build_vocab(counts)
+    else:
+        vocab, idf, projection, _ = model
+    rows = to_sparse(counts, vocab)
+    del counts
+    if refit:
+        # No chunks (or no term in two of them) leaves nothing to fit: every vector is zero
+        if rows.n_rows and vocab:
+            projection = randomized_svd(rows, idf, dim, rng)
+        else:
+            projection = np.zeros((dim, len(vocab)), dtype=np.float32)
+
+    vectors = np.empty((rows.n_rows, projection.shape[0]), dtype=np.float32)
+    for start, stop in batches(rows.n_rows):
+        vectors[start:stop] = dense_batch(rows, start, stop, idf) @ projection.T
+    vectors = normalize(vectors)
+    embed_s = time.perf_counter() - started
+
+    if len(vectors):
+        nlist = min(nlist or int(round(4 * math.sqrt(len(vectors)))), len(vectors)) or 1
+        centroids, assign = spherical_kmeans(vectors, nlist, rng)
+    else:
+        nlist, centroids, assign = 0, np.zeros((0, vectors.shape[1]), np.float32), np.zeros(0, np.int64)
+    order = np.argsort(assign, kind="stable")
+    offsets = np.zeros(nlist + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(np.bincount(assign, minlength=nlist))
+
+    tmp_dir = out_dir.with_name(f".{out_dir.name}.tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+    if refit:
+        np.save(tmp_dir / "projection.npy", projection)
+        np.save(tmp_dir / "idf.npy", idf)
+        (tmp_dir / "vocab.json").write_text(json.dumps(vocab), encoding="utf-8")
+        (tmp_dir / "model.json").write_text(json.dumps({"dim": dim}), encoding="utf-8")
+    else:
+        for name in ("projection.npy", "idf.npy", "vocab.json", "model.json"):
+            keep_file(out_dir / name, tmp_dir / name)
+    np.save(tmp_dir / "centroids.npy", centroids)
+    np.save(tmp_dir / "list_offsets.npy", offsets)
+    np.save(tmp_dir / "vectors.npy", vectors[order])
+    np.save(tmp_dir / "rows.npy", order.astype(np.int64))
+    meta_offsets = [0]
+    with (tmp_dir / "meta.jsonl").open("wb") as f:
+        for m in meta:
+            f.write(json.dumps(m, ensure_ascii=False).encode("utf-8") + b"\n")
+            meta_offsets.append(f.tell())
+    np.save(tmp_dir / "meta_offsets.npy", np.array(meta_offsets, dtype=np.int64))
+    swap_dir(tmp_dir, out_dir)
+
+    return {
+        "chunks": len(vectors),
+        "vocab": len(vocab),
+        "dim": projection.shape[0],
+        "nlist": nlist,
+        "refit": refit,
+        "embed_seconds": embed_s,
+        "seconds": time.perf_counter() - started,
+        "index_bytes": sum(p.stat().st_size for p in out_dir.iterdir() if p.is_file()),
+    }
+
+
+class VectorIndex:
+    """Memory-mapped IVF index; search() embeds the query with the stored projection."""
+
+    def __init__(self, path: Path):
+        self.path = path
+
+        def load(name: str) -> np.ndarray:
+            return np.load(path / name, mmap_mode="r")
+
+        self.projection = load("projection.npy")
+        self.idf = load("idf.npy")
+        self.centroids = load("centroids.npy")
+        self.offsets = load("list_offsets.npy")
+        self.vectors = load("vectors.npy")
+        self.rows = load("rows.npy")
+        self.meta_offsets = load("meta_offsets.npy")
+        vocab = json.loads((path / "vocab.json").read_text(encoding="utf-8"))
+        self.column = {t: i for i, t in enumerate(vocab)}
+
+    def embed(self, text: str) -> np.ndarray:
+        tf: Dict[int, int] = {}
+        for token in tokenize(text):
+            j = self.column.get(token)
+            if j is not None:
+                tf[j] = tf.get(j, 0) + 1
+        if not tf:
+            return np.zeros(self.projection.shape[0], dtype=np.float32)
+        cols = np.fromiter(tf.keys(), dtype=np.int64, count=len(tf))
+        weights = (1.0 + np.log(np.fromiter(tf.values(), dtype=np.float32, count=len(tf)))) * self.idf[cols]
+        weights /= np.linalg.norm(weights)
+        # Only the query's own columns of the projection are touched
+        return normalize(self.projection[:, cols] @ weights)
+
+    def _top(self, scores: np.ndarray, positions: np.ndarray, k: int) -> List[Tuple[float, int]]:
+        if len(scores) > k:
+            best = np.argpartition(-scores, k)[:k]
+        else:
+            best = np.arange(len(scores))
+        best = best[np.argsort(-scores[best])]
+        return [(float(scores[i]), int(positions[i])) for i in best]
+
+    def search_vector(self, query: np.ndarray, k: int = 10, nprobe: int = DEFAULT_NPROBE) -> List[Tuple[float, int]]:
+        """(score, position in vectors.npy) of the approximate top-k."""
+        nprobe = min(nprobe, len(self.centroids))
+        if not nprobe:
+            return []
+        probe = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        positions = np.concatenate([np.arange(self.offsets[i], self.offsets[i + 1]) for i in probe])
+        return self._top(self.vectors[positions] @ query, positions, k)
+
+    def brute_force(self, query: np.ndarray, k: int = 10) -> List[Tuple[float, int]]:
+        scores = self.vectors @ query
+        return self._top(scores, np.arange(len(scores)), k)
+
+    def vectors_by_row(self) -> np.ndarray:
+        """All vectors in chunk JSONL line order (a copy, not a view of the mmap)."""
+        out = np.empty_like(self.vectors)
+        out[self.rows] = self.vectors
+        return out
+
+    def meta(self, row: int) -> dict:
+        with (self.path / "meta.jsonl").open("rb") as f:
+            f.seek(int(self.meta_offsets[row]))
+            return json.loads(f.read(int(self.meta_offsets[row + 1] - self.meta_offsets[row])))
+
+    def search(self, text: str, k: int = 10, nprobe: int = DEFAULT_NPROBE) -> List[VectorHit]:
+        hits = []
+        for score, position in self.search_vector(self.embed(text), k, nprobe):
+            row = int(self.rows[position])
+            m = self.meta(row)
+            hits.append(VectorHit(score, row, m["id"], m["title"], m["source_url"]))
+        return hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query the offline vector index of the chunked mirror.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_build = sub.add_parser("build", help="Embed every chunk and build the IVF index")
+    p_build.add_argument("--chunks", default="", help="Chunk JSONL (default: <base>/_chunks/chunks.jsonl)")
+    p_build.add_argument("--dim", type=int, default=DEFAULT_DIM, help="Embedding dimensions")
+    p_build.add_argument("--nlist", type=int, default=0, help="IVF lists (default: ~4*sqrt(chunks))")
+    p_build.add_argument("--refit", action="store_true", help="Fit vocabulary and projection again instead of reusing them")
+    p_query = sub.add_parser("query", help="Approximate top-k chunks for a query")
+    p_query.add_argument("query")
+    p_query.add_argument("-k", type=int, default=10)
+    p_query.add_argument("--nprobe", type=int, default=DEFAULT_NPROBE, help="IVF lists scanned per query")
+    for p in (p_build, p_query):
+        p.add_argument("--base", default="cloudflare_docs", help="Base folder of the mirror (default: cloudflare_docs)")
+        p.add_argument("--index", default="", help="Index folder (default: <base>/_vectors)")
+    args = parser.parse_args()
+
+    base_dir = Path(args.base)
+    path = Path(args.index) if args.index else vectors_dir(base_dir)
+    if args.command == "build":
+        stats = build_vectors(base_dir, Path(args.chunks) if args.chunks else None, path, args.dim, args.nlist, args.refit)
+        print(
+            f"Embedded {stats['chunks']} chunks ({stats['vocab']} terms -> {stats['dim']} dims) in "
+            f"{stats['embed_seconds']:.1f}s ({'refit' if stats['refit'] else 'reused model'}), {stats['nlist']} IVF lists, total {stats['seconds']:.1f}s, "
+            f"{stats['index_bytes']:,} bytes -> {path}"
+        )
+        return
+
+    index = VectorIndex(path)
+    started = time.perf_counter()
+    hits = index.search(args.query, args.k, args.nprobe)
+    elapsed = (time.perf_counter() - started) * 1000
+    for hit in hits:
+        print(f"{hit.score:6.3f}  {hit.title}  <{hit.source_url}>  [{hit.id}]")
+    print(f"[query] {len(hits)} hits in {elapsed:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
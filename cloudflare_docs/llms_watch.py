@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Scheduling for `download_llms_txt.py --watch`: a long-running refresh loop.
+
+Each category has its own interval (--interval, overridden per category
+with --category-interval core_context_pack=900); every next run time is
+jittered by +/- --jitter of the interval so categories (and several
+mirrors) don't fall into lockstep. Categories that are due at the same time
+are refreshed together, in one concurrent fetch. A failed refresh is
+retried after RETRY_DELAY, doubling with each consecutive failure up to the
+normal interval, before the category goes back to its schedule.
+
+The schedule is persisted to <base>/_watch.json after every refresh, so a
+restarted watcher picks up where it left off instead of refetching
+everything at once.
+
+Usage:
+    python llms_watch.py [--base cloudflare_docs]      # show the persisted schedule
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+WATCH_STATE = "_watch.json"
+DEFAULT_INTERVAL = 3600.0
+DEFAULT_JITTER = 0.1
+MAX_SLEEP = 60.0
+RETRY_DELAY = 30.0  # first retry after a failed refresh; doubles per consecutive failure
+
+
+def parse_intervals(specs: List[str]) -> Dict[str, float]:
+    """["core_context_pack=900", ...] -> {"core_context_pack": 900.0}; raises ValueError on bad specs."""
+    intervals: Dict[str, float] = {}
+    for spec in specs:
+        category, sep, seconds = spec.partition("=")
+        if not sep or not category:
+            raise ValueError(f"expected CATEGORY=SECONDS, got {spec!r}")
+        intervals[category] = float(seconds)
+        if intervals[category] <= 0:
+            raise ValueError(f"interval must be > 0: {spec!r}")
+    return intervals
+
+
+def retry_delay(failures: int, interval: float) -> float:
+    """Backoff before retrying after the failures-th consecutive failure, never longer than interval."""
+    return min(interval, RETRY_DELAY * 2 ** (failures - 1))
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts).astimezone().isoformat()
+
+
+class Schedule:
+    """Next run time per category, persisted as JSON."""
+
+    def __init__(
+        self,
+        path: Path,
+        interval: float = DEFAULT_INTERVAL,
+        intervals: Optional[Dict[str, float]] = None,
+        jitter: float = DEFAULT_JITTER,
+        rng: Optional[random.Random] = None,
+    ):
+        self.path = path
+        self.interval = interval
+        self.intervals = intervals or {}
+        self.jitter = jitter
+        self.rng = rng or random.Random()
+        self.next_run: Dict[str, float] = {}
+        self.last_run: Dict[str, dict] = {}
+        if path.exists():
+            try:
+                state = json.loads(path.read_text(encoding="utf-8"))
+                self.next_run = {c: float(t) for c, t in state.get("next_run", {}).items()}
+                self.last_run = state.get("last_run", {})
+            except (ValueError, AttributeError):
+                print(f"[warn] ignoring unreadable watch state {path}")
+
+    def interval_for(self, category: str) -> float:
+        return self.intervals.get(category, self.interval)
+
+    def categories(self) -> List[str]:
+        return sorted(self.next_run)
+
+    def due(self, categories: List[str], now: float) -> List[str]:
+        """Categories whose next run has passed; ones never scheduled are due immediately."""
+        return [c for c in categories if self.next_run.get(c, 0.0) <= now]
+
+    def next_wake(self, categories: List[str]) -> float:
+        return min((self.next_run.get(c, 0.0) for c in categories), default=time.time() + self.interval)
+
+    def done(self, categories: List[str], started: float, seconds: float, ok: bool) -> None:
+        for category in categories:
+            interval = self.interval_for(category)
+            spread = 1 + self.rng.uniform(-self.jitter, self.jitter)
+            if ok:
+                failures = 0
+                self.next_run[category] = started + interval * spread
+            else:
+                failures = self.last_run.get(category, {}).get("failures", 0) + 1
+                self.next_run[category] = started + seconds + retry_delay(failures, interval) * spread
+            self.last_run[category] = {"at": _iso(started), "seconds": round(seconds, 3), "ok": ok, "failures": failures}
+        self.save()
+
+    def save(self) -> None:
+        state = {
+            "next_run": self.next_run,
+            "next_run_at": {c: _iso(t) for c, t in sorted(self.next_run.items())},
+            "last_run": self.last_run,
+        }
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(state, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        tmp.replace(self.path)
+
+
+def watch_loop(
+    refresh: Callable[[Optional[List[str]]], List[str]],
+    schedule: Schedule,
+    categories: Optional[List[str]],
+    stop: threading.Event,
+) -> int:
+    """
+    Call refresh(due categories) whenever categories come due until stop is set.
+    refresh(None) means "every category"; it returns the categories it refreshed
+    (empty on failure), which is how an unrestricted watcher learns them.
+    Returns the number of refreshes.
+    """
+    known = list(categories or schedule.categories())
+    runs = 0
+    failures = 0
+    while not stop.is_set():
+        now = time.time()
+        due = schedule.due(known, now) if known else None
+        if due is None or due:
+            started = time.time()
+            refreshed = refresh(due)
+            runs += 1
+            if due is None:
+                known = list(refreshed)
+            schedule.done(due or refreshed, started, time.time() - started, ok=bool(refreshed))
+            if not known:
+                # Nothing learned (the first refresh failed): there is no category to schedule a retry for
+                failures += 1
+                stop.wait(retry_delay(failures, schedule.interval))
+            continue
+        wake = schedule.next_wake(known)
+        print(f"[watch] next refresh at {_iso(wake)}")
+        # Wake up at least every MAX_SLEEP so clock jumps (suspend, NTP) can't stall the loop
+        while not stop.is_set() and time.time() < wake:
+            stop.wait(min(MAX_SLEEP, wake - time.time()))
+    return runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show the persisted --watch schedule of download_llms_txt.py.")
+    parser.add_argument("--base", default="cloudflare_docs", help="Base folder of the mirror (default: cloudflare_docs)")
+    args = parser.parse_args()
+
+    path = Path(args.base) / WATCH_STATE
+    if not path.exists():
+        raise SystemExit(f"No watch state at {path}; start download_llms_txt.py --watch first")
+    schedule = Schedule(path)
+    now = time.time()
+    for category in schedule.categories():
+        last = schedule.last_run.get(category, {})
+        left = schedule.next_run[category] - now
+        status = "ok" if last.get("ok", True) else f"failed x{last.get('failures', 1)}"
+        print(
+            f"{category:<28} next in {max(0.0, left):8.0f}s  last {last.get('at', '-')} "
+            f"({last.get('seconds', 0):.1f}s, {status})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Tests for the mirror tooling. They run offline against copies of exports
+checked into this folder, served by llms_stub_server where HTTP is needed.
+
+Usage (from cloudflare_docs/):
+    python -m unittest discover -s tests -t .
+"""
+
+import hashlib
+import shutil
+from pathlib import Path
+from typing import List, Tuple
+
+from llms_header import build_header
+
+HERE = Path(__file__).resolve().parent.parent
+FIXTURE_EXPORTS = ("ai_and_rag/vectorize/vectorize-llms-full.txt", "ai_and_rag/autorag/autorag-llms-full.txt")
+
+
+def make_mirror(base_dir: Path, exports=FIXTURE_EXPORTS) -> Path:
+    """Copy a few real exports into base_dir/<category>/<service>/ and return base_dir."""
+    for rel in exports:
+        dest = base_dir / rel
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(HERE / rel, dest)
+    return base_dir
+
+
+def page_block(source: str, title: str, body: str) -> str:
+    return (
+        f"<page>\n---\ntitle: {title}\nsource_url:\n  html: {source}\n  md: {source}index.md\n---\n\n"
+        f"{body}\n</page>\n"
+    )
+
+
+def write_export(
+    base_dir: Path, category: str, url: str, pages: List[Tuple[str, str, str]], retrieved_at: str = "2026-01-01T00:00:00+00:00"
+) -> Path:
+    """Write a synthetic export of (source_url, title, body) pages where download_llms_txt.py would put it."""
+    service = url.rstrip("/").split("/")[-2]
+    body = "".join(page_block(*page) for page in pages)
+    sha = hashlib.sha256(body.encode("utf-8")).hexdigest()
+    path = base_dir / category / service / f"{service}-llms-full.txt"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    header = build_header(url, category, service, "llms-full", retrieved_at, sha)
+    path.write_text(header + body, encoding="utf-8")
+    return path
@@ -0,0 +1,49 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from llms_archive import archive_existing, available_codecs, codec_for, list_versions, read_version, recompress
+from tests import FIXTURE_EXPORTS, make_mirror
+
+
+class ArchiveTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.current = make_mirror(Path(self.tmp.name)) / FIXTURE_EXPORTS[0]
+        self.original = self.current.read_bytes()
+        self.archive_dir = self.current.parent / "_archive"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_every_codec_round_trips(self):
+        for codec in available_codecs():
+            with self.subTest(codec=codec):
+                archived = archive_existing(self.current, self.archive_dir / codec, codec, keep_source=True)
+                self.assertEqual(codec_for(archived), codec)
+                self.assertEqual(read_version(archived), self.original)
+                if codec != "none":
+                    self.assertLess(archived.stat().st_size, len(self.original))
+        self.assertEqual(self.current.read_bytes(), self.original)
+
+    def test_archiving_moves_the_current_file(self):
+        archived = archive_existing(self.current, self.archive_dir)
+        self.assertFalse(self.current.exists())
+        self.assertEqual([(v.path, v.codec) for v in list_versions(self.current)], [(archived, "gzip")])
+        self.assertEqual(list(self.archive_dir.glob("*.tmp")), [])
+
+    def test_recompress_keeps_the_content(self):
+        archived = archive_existing(self.current, self.archive_dir, "none")
+        target = recompress(archived, "zstd" if "zstd" in available_codecs() else "gzip")
+        self.assertFalse(archived.exists())
+        self.assertEqual(read_version(target), self.original)
+        self.assertEqual(recompress(target, codec_for(target)), target)
+
+    def test_unknown_codec_is_rejected(self):
+        with self.assertRaises(ValueError):
+            archive_existing(self.current, self.archive_dir, "brotli")
+        self.assertTrue(self.current.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
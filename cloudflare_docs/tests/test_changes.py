@@ -0,0 +1,60 @@
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from llms_changes import FEED_TIMESTAMP_FORMAT, diff_pages, index_pages, iter_feed, needs_sync, summarize, write_feed
+from llms_manifest import Manifest
+from tests import page_block
+
+URL = "https://developers.cloudflare.com/workers/llms-full.txt"
+DOCS = "https://developers.cloudflare.com/workers/"
+
+
+class ChangeFeedTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base = Path(self.tmp.name)
+        self.manifest = Manifest(self.base)
+
+    def tearDown(self):
+        self.manifest.close()
+        self.tmp.cleanup()
+
+    def sync(self, sha: str, *pages) -> list:
+        body = self.base / f"{sha}.txt"
+        body.write_text("".join(page_block(DOCS + key, key.title(), text) for key, text in pages), encoding="utf-8")
+        self.assertTrue(needs_sync(self.manifest, URL, sha))
+        return diff_pages(self.manifest, URL, sha, index_pages(body), ["compute_and_runtime"])
+
+    def test_only_changed_pages_are_reported(self):
+        first = self.sync("v1", ("a", "one"), ("b", "two"), ("c", "three"))
+        self.assertEqual(summarize(first), {"added": 3, "modified": 0, "removed": 0})
+        self.assertFalse(needs_sync(self.manifest, URL, "v1"))
+
+        second = self.sync("v2", ("a", "one, edited"), ("b", "two"), ("d", "four"))
+        ops = {(c["op"], c["key"]) for c in second}
+        self.assertEqual(ops, {("modified", DOCS + "a"), ("added", DOCS + "d"), ("removed", DOCS + "c")})
+        modified = next(c for c in second if c["op"] == "modified")
+        self.assertEqual(modified["prev_sha"], first[0]["sha"])
+        self.assertNotEqual(modified["sha"], modified["prev_sha"])
+        self.assertEqual(modified["categories"], ["compute_and_runtime"])
+
+    def test_repeated_pages_get_distinct_keys(self):
+        changes = self.sync("v1", ("a", "one"), ("a", "one again"))
+        self.assertEqual([c["key"] for c in changes], [DOCS + "a", DOCS + "a#1"])
+        self.assertEqual(self.sync("v2", ("a", "one"), ("a", "one again")), [])
+
+    def test_feed_replays_runs_after_since(self):
+        run = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        changes = self.sync("v1", ("a", "one"))
+        write_feed(self.base, changes, run)
+        write_feed(self.base, changes, run + timedelta(days=1))
+        self.assertEqual(len(list(iter_feed(self.base))), 2)
+        [replayed] = iter_feed(self.base, run.strftime(FEED_TIMESTAMP_FORMAT))
+        self.assertEqual(replayed["run_at"], (run + timedelta(days=1)).isoformat())
+        self.assertEqual(replayed["key"], DOCS + "a")
+
+
+if __name__ == "__main__":
+    unittest.main()
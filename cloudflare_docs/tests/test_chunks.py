@@ -0,0 +1,61 @@
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from llms_chunks import build_chunks, chunks_path
+from tests import make_mirror
+
+
+def read_records(path: Path):
+    with path.open("r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+class ChunksRoundTripTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base = make_mirror(Path(self.tmp.name))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_rebuild_reuses_unchanged_pages(self):
+        first = build_chunks(self.base, max_tokens=256, overlap=32)
+        self.assertEqual(first["reused"], 0)
+        self.assertGreater(first["chunks"], first["pages"])
+        before = chunks_path(self.base).read_bytes()
+
+        second = build_chunks(self.base, max_tokens=256, overlap=32)
+        self.assertEqual(second["reused"], second["pages"])
+        self.assertEqual(chunks_path(self.base).read_bytes(), before)
+
+        # Other parameters invalidate every span
+        third = build_chunks(self.base, max_tokens=128, overlap=0)
+        self.assertEqual(third["reused"], 0)
+
+    def test_records_are_bounded_and_ordered(self):
+        build_chunks(self.base, max_tokens=256, overlap=32)
+        records = read_records(chunks_path(self.base))
+        self.assertEqual(len({r["id"] for r in records}), len(records))
+        for record in records:
+            self.assertLessEqual(record["tokens"], 256)
+            self.assertTrue(record["text"])
+        by_page = {}
+        for record in records:
+            by_page.setdefault(record["page_sha"], []).append(record["chunk_index"])
+        for indexes in by_page.values():
+            self.assertEqual(indexes, list(range(len(indexes))))
+
+    def test_moved_page_gets_its_new_placement(self):
+        build_chunks(self.base)
+        shutil.move(self.base / "ai_and_rag", self.base / "storage_and_databases")
+        stats = build_chunks(self.base)
+        self.assertEqual(stats["reused"], 0)
+        records = read_records(chunks_path(self.base))
+        self.assertEqual({r["category"] for r in records}, {"storage_and_databases"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from llms_chunks import build_chunks, chunks_path
+from llms_vectors import iter_chunk_records
+from llms_corpus import iter_unique_pages
+from tests import write_export
+
+KV_PAGE = ("https://developers.cloudflare.com/kv/get-started/", "Get started · KV", "Create a KV namespace and bind it.")
+WORKERS_PAGE = ("https://developers.cloudflare.com/workers/", "Workers", "Build serverless applications.")
+
+
+class UniquePagesTest(unittest.TestCase):
+    """A kv page bundled into developer-platform (core_context_pack) and kv's own export (storage_and_databases)."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base = Path(self.tmp.name)
+        platform = "https://developers.cloudflare.com/developer-platform/llms-full.txt"
+        write_export(self.base, "core_context_pack", platform, [WORKERS_PAGE, KV_PAGE])
+        write_export(self.base, "storage_and_databases", "https://developers.cloudflare.com/kv/llms-full.txt", [KV_PAGE])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_shared_page_comes_from_its_product_export(self):
+        pages = {page.source_html: export for export, page in iter_unique_pages(self.base)}
+        self.assertEqual(len(pages), 2)
+        kv = pages[KV_PAGE[0]]
+        self.assertEqual((kv.service, kv.category), ("kv", "storage_and_databases"))
+        self.assertEqual(kv.categories, ["core_context_pack", "storage_and_databases"])
+        self.assertEqual(pages[WORKERS_PAGE[0]].service, "developer-platform")
+
+    def test_category_filter_only_merges_selected_exports(self):
+        pages = {page.source_html: export for export, page in iter_unique_pages(self.base, ["core_context_pack"])}
+        kv = pages[KV_PAGE[0]]
+        self.assertEqual((kv.service, kv.categories), ("developer-platform", ["core_context_pack"]))
+
+    def test_chunks_carry_the_merged_attribution(self):
+        build_chunks(self.base)
+        records = [r for r in iter_chunk_records(chunks_path(self.base)) if r["source_url"] == KV_PAGE[0]]
+        self.assertTrue(records)
+        for record in records:
+            self.assertEqual(record["service"], "kv")
+            self.assertEqual(record["categories"], ["core_context_pack", "storage_and_databases"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import random
+import tempfile
+import unittest
+from pathlib import Path
+
+from llms_corpus import iter_unique_pages
+from llms_dedupe import find_duplicates, write_map
+from tests import write_export
+
+DOCS = "https://developers.cloudflare.com"
+
+
+def words(seed: int, n: int = 400) -> list:
+    rng = random.Random(seed)
+    return [f"w{rng.randrange(5000)}" for _ in range(n)]
+
+
+class NearDuplicateTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base = Path(self.tmp.name)
+        base = words(1)
+        edited = list(base)
+        edited[200:203] = ["changed", "three", "words"]
+        self.long = (f"{DOCS}/workers-ai/models/a/", "Model A", " ".join(base + ["extra"] * 5))
+        self.near = (f"{DOCS}/workers-ai/models/b/", "Model B", " ".join(edited))
+        self.other = (f"{DOCS}/workers-ai/models/c/", "Model C", " ".join(words(2)))
+        write_export(self.base, "ai_and_rag", f"{DOCS}/workers-ai/llms-full.txt", [self.long, self.near, self.other])
+        # The same page again in another export is an exact repeat, not a near-duplicate
+        write_export(self.base, "core_context_pack", f"{DOCS}/developer-platform/llms-full.txt", [self.long])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_near_duplicates_map_to_the_longest_page(self):
+        result = find_duplicates(self.base)
+        self.assertEqual(result["canonical"], {self.near[0]: self.long[0]})
+        self.assertEqual(result["exact"]["pages"], 1)
+        self.assertEqual(result["near"]["pages"], 1)
+        self.assertEqual(result["totals"]["pages"], 4)
+        self.assertEqual(result["clusters"][0]["duplicates"], [self.near[0]])
+
+    def test_threshold_keeps_them_apart(self):
+        self.assertEqual(find_duplicates(self.base, threshold=0.999)["canonical"], {})
+
+    def test_unique_pages_skip_mapped_duplicates(self):
+        write_map(self.base, find_duplicates(self.base))
+        sources = [page.source_html for _, page in iter_unique_pages(self.base, skip_near_duplicates=True)]
+        self.assertEqual(sorted(sources), sorted([self.long[0], self.other[0]]))
+        self.assertEqual(len(list(iter_unique_pages(self.base))), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
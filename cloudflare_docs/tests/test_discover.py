@@ -0,0 +1,75 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from llms_discover import assign_categories, discover, parse_products, rule_category
+from llms_header import build_header
+from llms_stub_server import Faults, serve
+
+DOCS = "https://developers.cloudflare.com"
+KNOWN = {"storage_and_databases": [f"{DOCS}/kv/llms-full.txt"]}
+LLMS_TXT = f"""# Cloudflare Developer Documentation
+
+## Storage
+- [KV]({DOCS}/kv/index.md): key-value storage
+- [KV API]({DOCS}/kv/api/index.md)
+
+## AI
+- [Vectorize]({DOCS}/vectorize/index.md)
+- [Gone]({DOCS}/gone/index.md)
+- [Elsewhere](https://example.com/other/index.md)
+"""
+
+
+class DiscoverTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.origin = Path(self.tmp.name) / "origin"
+        for path in ("kv/llms-full.txt", "kv/prompt.txt", "vectorize/llms-full.txt"):
+            category = "ai_and_rag" if path.startswith("vectorize") else "storage_and_databases"
+            dest = self.origin / category / path.split("/")[0] / path.replace("/", "-")
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            dest.write_text(build_header(f"{DOCS}/{path}", category, "", "", "", "") + "body\n", encoding="utf-8")
+        self.cache = Path(self.tmp.name) / "_discovered.json"
+        self.servers = []
+
+    def tearDown(self):
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+        self.tmp.cleanup()
+
+    def stub(self, **faults):
+        server = serve(self.origin, faults=Faults(**faults))
+        self.servers.append(server)
+        return server
+
+    def test_parse_and_rules(self):
+        self.assertEqual(parse_products(LLMS_TXT), {"kv": "Storage", "vectorize": "AI", "gone": "AI"})
+        self.assertEqual(rule_category("vectorize", "AI"), "ai_and_rag")
+        self.assertEqual(rule_category("zzz", ""), "other_products")
+        self.assertEqual(assign_categories(f"{DOCS}/kv/prompt.txt", "Storage", KNOWN), ["global_prompt_assets"])
+        self.assertEqual(assign_categories(f"{DOCS}/kv/llms.txt", "", KNOWN), ["storage_and_databases"])
+
+    def test_discovers_existing_exports_and_caches(self):
+        server = self.stub()
+        found = discover(LLMS_TXT, KNOWN, self.cache, origin=server.origin)
+        self.assertEqual(
+            found, {"global_prompt_assets": [f"{DOCS}/kv/prompt.txt"], "ai_and_rag": [f"{DOCS}/vectorize/llms-full.txt"]}
+        )
+        probes = server.stats()["requests"]
+        self.assertGreater(probes, 0)
+        # Same llms.txt and known URLs: answered from the cache without probing
+        self.assertEqual(discover(LLMS_TXT, KNOWN, self.cache, origin=server.origin), found)
+        self.assertEqual(server.stats()["requests"], probes)
+        discover(LLMS_TXT, KNOWN, self.cache, refresh=True, origin=server.origin)
+        self.assertEqual(server.stats()["requests"], 2 * probes)
+
+    def test_failed_probes_are_not_cached(self):
+        server = self.stub(fail_rate=1.0)
+        self.assertEqual(discover(LLMS_TXT, KNOWN, self.cache, origin=server.origin), {})
+        self.assertFalse(self.cache.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
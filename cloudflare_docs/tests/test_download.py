@@ -0,0 +1,63 @@
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from llms_header import read_header
+from llms_stub_server import serve
+from tests import HERE
+
+CATEGORY = "ai_and_rag"
+EXPORT = "ai_and_rag/vectorize/vectorize-llms-full.txt"
+
+
+class RevalidateTest(unittest.TestCase):
+    """--revalidate sends the stored validators; unchanged exports come back 304 and are not downloaded."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.origin = Path(self.tmp.name) / "origin"
+        shutil.copytree(HERE / CATEGORY, self.origin / CATEGORY)
+        self.base = Path(self.tmp.name) / "mirror"
+        self.server = serve(self.origin)
+        self.exports = len(self.server.routes)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def download(self, *extra: str) -> dict:
+        cmd = [sys.executable, str(HERE / "download_llms_txt.py"), "--base", str(self.base), "--origin", self.server.origin]
+        cmd += ["--category", CATEGORY, *extra]
+        result = subprocess.run(cmd, cwd=HERE, capture_output=True, text=True, timeout=120)
+        self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+        return {k: int(v) for k, v in re.findall(r"(\w+)=(\d+)", result.stdout.rsplit("Done.", 1)[-1])}
+
+    def test_unchanged_exports_are_not_downloaded(self):
+        self.assertEqual(self.download()["wrote"], self.exports)
+        sent = self.server.stats()["bytes_sent"]
+
+        summary = self.download("--revalidate")
+        self.assertEqual((summary["wrote"], summary["not_modified"]), (0, self.exports))
+        self.assertGreater(summary["bytes_saved"], 0)
+        self.assertEqual(self.server.stats()["not_modified"], self.exports)
+        self.assertEqual(self.server.stats()["bytes_sent"], sent)
+
+    def test_changed_export_is_fetched_again(self):
+        self.download()
+        with (self.origin / EXPORT).open("a", encoding="utf-8") as f:
+            f.write("\nOne more line.\n")
+        self.server.reload()
+
+        summary = self.download("--revalidate")
+        self.assertEqual((summary["wrote"], summary["not_modified"]), (1, self.exports - 1))
+        _, offset = read_header(self.base / EXPORT)
+        self.assertTrue((self.base / EXPORT).read_bytes()[offset:].endswith(b"One more line.\n"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,226 @@
+import asyncio
+import base64
+import gzip
+import hashlib
+import random
+import tempfile
+import unittest
+from pathlib import Path
+
+import requests
+
+from llms_fetch import (
+    CHUNK_SIZE,
+    CircuitBreaker,
+    CircuitOpenError,
+    FetchSpan,
+    RetryPolicy,
+    fetch_all,
+    fetch_to_file,
+    iter_body,
+)
+from llms_header import build_header, read_header
+from llms_stub_server import Faults, serve
+from tests import FIXTURE_EXPORTS, HERE, make_mirror
+
+URL = "https://developers.cloudflare.com/vectorize/llms-full.txt"
+NO_WAIT = RetryPolicy(attempts=4, base_delay=0.0, max_delay=0.0, timeout=5.0)
+
+
+class StubFetchTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = make_mirror(Path(self.tmp.name) / "origin")
+        path = self.root / FIXTURE_EXPORTS[0]
+        _, offset = read_header(path)
+        self.body = path.read_bytes()[offset:]
+        self.session = requests.Session()
+        self.servers = []
+
+    def tearDown(self):
+        self.session.close()
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+        self.tmp.cleanup()
+
+    def stub(self, **faults):
+        server = serve(self.root, faults=Faults(**faults))
+        self.servers.append(server)
+        return server
+
+    def fetch(self, server, **kwargs):
+        dest = Path(self.tmp.name) / "body.part"
+        url = server.origin + "/vectorize/llms-full.txt"
+        return fetch_to_file(self.session, url, dest, policy=NO_WAIT, **kwargs)
+
+    def test_503s_are_retried(self):
+        server = self.stub(fail_first=2)
+        fetched = self.fetch(server)
+        self.assertEqual(fetched.content_sha, hashlib.sha256(self.body).hexdigest())
+        self.assertEqual(fetched.body_path.read_bytes(), self.body)
+        self.assertEqual(server.stats()["requests"], 3)
+
+    def test_gives_up_after_the_last_attempt(self):
+        server = self.stub(fail_first=10)
+        with self.assertRaises(requests.HTTPError):
+            self.fetch(server)
+        self.assertEqual(server.stats()["requests"], NO_WAIT.attempts)
+
+    def test_truncated_body_resumes_with_range(self):
+        # Seed 9: the first response is cut off half-way, the second is not
+        server = self.stub(truncate_rate=0.5, seed=9)
+        fetched = self.fetch(server)
+        self.assertEqual(fetched.content_sha, hashlib.sha256(self.body).hexdigest())
+        self.assertEqual(fetched.size, len(self.body))
+        stats = server.stats()
+        self.assertEqual(stats["requests"], 2)
+        # The resumed request only carried the missing half
+        self.assertEqual(stats["bytes_sent"], len(self.body))
+
+    def test_gzip_body_is_refetched_not_resumed(self):
+        # Barely compressible, so the decoded bytes received fall inside the encoded body: resuming at that
+        # offset would splice the middle of the gzip stream onto decoded text
+        body = base64.b64encode(random.Random(1).randbytes(200_000)) + b"\n"
+        url = "https://developers.cloudflare.com/noise/llms-full.txt"
+        path = self.root / "ai_and_rag/noise/noise-llms-full.txt"
+        path.parent.mkdir()
+        header = build_header(url, "ai_and_rag", "noise", "llms-full", "2026-01-01T00:00:00+00:00", "")
+        path.write_bytes(header.encode("utf-8") + body)
+
+        server = self.stub(truncate_rate=0.5, seed=9, gzip=True)
+        dest = Path(self.tmp.name) / "body.part"
+        fetched = fetch_to_file(self.session, server.origin + "/noise/llms-full.txt", dest, policy=NO_WAIT)
+        self.assertEqual(fetched.content_sha, hashlib.sha256(body).hexdigest())
+        encoded = len(gzip.compress(body, mtime=0))
+        self.assertLess(encoded, len(body))
+        self.assertEqual(server.stats()["bytes_sent"], encoded // 2 + encoded)
+
+    def test_resume_asks_for_identity(self):
+        server = self.stub(truncate_rate=0.5, seed=9, gzip=True)
+        self.session.headers["Accept-Encoding"] = "identity"
+        fetched = self.fetch(server)
+        self.assertEqual(fetched.content_sha, hashlib.sha256(self.body).hexdigest())
+        # The identity body was resumed, and the Range request was not answered with gzip
+        self.assertEqual(server.stats()["bytes_sent"], len(self.body))
+
+    def test_misplaced_range_is_refetched_whole(self):
+        server = self.stub(truncate_rate=0.5, seed=9, bad_range=True)
+        fetched = self.fetch(server)
+        self.assertEqual(fetched.content_sha, hashlib.sha256(self.body).hexdigest())
+        self.assertEqual(fetched.body_path.read_bytes(), self.body)
+        self.assertEqual(server.stats()["requests"], 3)
+
+    def test_breaker_opens_when_the_host_is_down(self):
+        server = self.stub()
+        origin = server.origin
+        server.shutdown()
+        server.server_close()
+        self.servers.remove(server)
+        breaker = CircuitBreaker(threshold=2, cooldown=60.0)
+        dest = Path(self.tmp.name) / "body.part"
+        with self.assertRaises(CircuitOpenError):
+            fetch_to_file(self.session, origin + "/vectorize/llms-full.txt", dest, policy=NO_WAIT, breaker=breaker)
+        self.assertTrue(breaker.is_open(origin.split("//", 1)[1]))
+        # Further requests fail fast without touching the network
+        with self.assertRaises(CircuitOpenError):
+            fetch_to_file(self.session, origin + "/autorag/llms-full.txt", dest, policy=NO_WAIT, breaker=breaker)
+
+    def test_fetch_all_through_origin(self):
+        server = self.stub(fail_first=1)
+        urls = [URL, "https://developers.cloudflare.com/autorag/llms-full.txt"]
+        spans = {}
+        spool = Path(self.tmp.name) / "spool"
+        spool.mkdir()
+        results = asyncio.run(fetch_all(urls, spool, policy=NO_WAIT, origin=server.origin, spans=spans))
+        for url in urls:
+            self.assertFalse(isinstance(results[url], Exception), results[url])
+            self.assertEqual(spans[url].attempts, 2)
+        self.assertEqual(results[URL].content_sha, hashlib.sha256(self.body).hexdigest())
+
+    def test_conditional_request_gets_304(self):
+        server = self.stub()
+        first = self.fetch(server)
+        again = self.fetch(server, request_headers={"If-None-Match": first.headers["ETag"]})
+        self.assertIsNone(again.body_path)
+        self.assertEqual(server.stats()["not_modified"], 1)
+
+
+
+class StreamingTest(unittest.TestCase):
+    """Bodies several CHUNK_SIZEs long are spooled and hashed piece by piece."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name) / "origin"
+        self.body = base64.b64encode(random.Random(2).randbytes(3 * CHUNK_SIZE)) + b"\n"
+        path = root / "ai_and_rag/big/big-llms-full.txt"
+        path.parent.mkdir(parents=True)
+        header = build_header("https://developers.cloudflare.com/big/llms-full.txt", "ai_and_rag", "big", "llms-full", "", "")
+        path.write_bytes(header.encode("utf-8") + self.body)
+        self.server = serve(root)
+        self.url = self.server.origin + "/big/llms-full.txt"
+        self.session = requests.Session()
+
+    def tearDown(self):
+        self.session.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def test_body_is_read_in_bounded_pieces(self):
+        with self.session.get(self.url, stream=True) as resp:
+            pieces = list(iter_body(resp))
+        self.assertGreater(len(pieces), 1)
+        self.assertLessEqual(max(len(piece) for piece in pieces), CHUNK_SIZE)
+        self.assertEqual(b"".join(pieces), self.body)
+
+    def test_spooled_body_and_hash(self):
+        dest = Path(self.tmp.name) / "big.part"
+        span = FetchSpan(self.url)
+        fetched = fetch_to_file(self.session, self.url, dest, policy=NO_WAIT, span=span)
+        self.assertEqual(fetched.body_path, dest)
+        self.assertEqual(fetched.content_sha, hashlib.sha256(self.body).hexdigest())
+        self.assertEqual((fetched.size, span.bytes), (len(self.body), len(self.body)))
+        self.assertEqual(dest.read_bytes(), self.body)
+
+
+class FetchAllLimitsTest(unittest.TestCase):
+    """fetch_all() against a stub that holds every response for LATENCY seconds."""
+
+    LATENCY = 0.3
+    URLS = [f"https://developers.cloudflare.com/{p}/llms-full.txt" for p in ("vectorize", "autorag", "kv", "d1")]
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.spool = Path(self.tmp.name)
+        self.server = serve(HERE, faults=Faults(latency=self.LATENCY))
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def queued(self, **limits):
+        spans = {}
+        results = asyncio.run(fetch_all(self.URLS, self.spool, origin=self.server.origin, spans=spans, **limits))
+        for url in self.URLS:
+            self.assertFalse(isinstance(results[url], Exception), results[url])
+        return sorted(span.queued for span in spans.values())
+
+    def test_requests_run_in_parallel(self):
+        self.assertLess(self.queued(jobs=8, per_host=8)[-1], self.LATENCY)
+
+    def test_per_host_limit_queues_the_rest(self):
+        # One at a time: the last URL waits for the other three
+        queued = self.queued(jobs=8, per_host=1)
+        self.assertGreater(queued[-1], 3 * self.LATENCY * 0.9)
+
+    def test_global_limit_caps_requests_in_flight(self):
+        queued = self.queued(jobs=2, per_host=8)
+        self.assertLess(queued[1], self.LATENCY)
+        self.assertGreater(queued[-1], self.LATENCY * 0.9)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from llms_fts import db_path, search, sync
+from tests import write_export
+
+PLATFORM = "https://developers.cloudflare.com/developer-platform/llms-full.txt"
+KV_PAGE = ("https://developers.cloudflare.com/kv/api/write-key-value-pairs/", "Write key-value pairs", "Use put to write a value.")
+D1_PAGE = ("https://developers.cloudflare.com/d1/worker-api/", "D1 Worker API", "Bind a database and put rows into it.")
+WORKERS_PAGE = ("https://developers.cloudflare.com/workers/runtime-apis/", "Runtime APIs", "Bindings let you put and get.")
+
+
+class FtsFilterTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base = Path(self.tmp.name)
+        write_export(self.base, "core_context_pack", PLATFORM, [WORKERS_PAGE, KV_PAGE, D1_PAGE])
+        write_export(self.base, "storage_and_databases", "https://developers.cloudflare.com/kv/llms-full.txt", [KV_PAGE])
+        write_export(self.base, "storage_and_databases", "https://developers.cloudflare.com/d1/llms-full.txt", [D1_PAGE])
+        self.stats = sync(self.base)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def urls(self, **filters):
+        return sorted(hit.source_url for hit in search(db_path(self.base), "put", **filters))
+
+    def test_filters_use_every_export_containing_the_page(self):
+        self.assertEqual(self.stats["added"], 3)
+        self.assertEqual(self.urls(), sorted(p[0] for p in (KV_PAGE, D1_PAGE, WORKERS_PAGE)))
+        self.assertEqual(self.urls(service="kv"), [KV_PAGE[0]])
+        self.assertEqual(self.urls(service="developer-platform"), [WORKERS_PAGE[0]])
+        self.assertEqual(self.urls(category="storage_and_databases"), sorted([KV_PAGE[0], D1_PAGE[0]]))
+        self.assertEqual(len(self.urls(category="core_context_pack")), 3)
+        self.assertEqual(self.urls(service="kv", category="ai_and_rag"), [])
+
+    def test_resync_skips_and_moves(self):
+        self.assertEqual(sync(self.base)["unchanged"], 3)
+        # kv's own export goes away: its page falls back to developer-platform
+        (self.base / "storage_and_databases/kv/kv-llms-full.txt").unlink()
+        stats = sync(self.base)
+        self.assertEqual((stats["moved"], stats["removed"]), (1, 0))
+        self.assertEqual(self.urls(service="kv"), [])
+        self.assertIn(KV_PAGE[0], self.urls(service="developer-platform"))
+
+
+if __name__ == "__main__":
+    unittest.main()
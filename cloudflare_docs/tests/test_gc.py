@@ -0,0 +1,88 @@
+import gzip
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from llms_archive import TIMESTAMP_FORMAT, available_codecs, read_version
+from llms_gc import Policy, Version, collect, iter_archived, keep_by_policy, parse_size, plan
+from tests import FIXTURE_EXPORTS, make_mirror
+
+NOW = datetime(2026, 3, 15, 12, 0, tzinfo=timezone.utc)
+CURRENT = Path("ai_and_rag/x/x-llms-full.txt")
+
+
+def versions(days: int, size: int = 100) -> list:
+    """One version per day for the last `days` days, oldest first."""
+    out = []
+    for age in range(days - 1, -1, -1):
+        at = NOW - timedelta(days=age, hours=1)
+        out.append(Version(CURRENT, Path(f"v{age:03d}"), at, "gzip", size, False))
+    return out
+
+
+class RetentionPolicyTest(unittest.TestCase):
+    def test_rules_keep_the_union(self):
+        history = versions(90)
+        kept = keep_by_policy(history, Policy(keep_last=2), NOW)
+        self.assertEqual(kept, {Path("v000"), Path("v001")})
+        self.assertEqual(len(keep_by_policy(history, Policy(daily=7), NOW)), 7)
+        # Newest of each of the last 4 ISO weeks, and of this month and the two before
+        self.assertEqual(len(keep_by_policy(history, Policy(weekly=4), NOW)), 4)
+        self.assertEqual(len(keep_by_policy(history, Policy(monthly=3), NOW)), 3)
+        both = keep_by_policy(history, Policy(daily=7, weekly=4), NOW)
+        self.assertEqual(len(both), 7 + 3)  # this week's newest is already a daily
+
+    def test_budget_drops_oldest_but_never_the_newest(self):
+        history = {CURRENT: versions(10)}
+        result = plan(history, Policy(max_bytes=350), NOW)
+        self.assertEqual(sorted(v.path.name for v in result["keep"]), ["v000", "v001", "v002"])
+        self.assertEqual((result["kept_bytes"], result["over_budget"]), (300, 0))
+        # The object store counts too; the newest version stays even when over budget
+        result = plan(history, Policy(max_bytes=50), NOW, fixed_bytes=40)
+        self.assertEqual([v.path.name for v in result["keep"]], ["v000"])
+        self.assertEqual(result["over_budget"], 90)
+
+    def test_shared_links_free_nothing(self):
+        shared = [v._replace(shared=True) for v in versions(3)]
+        result = plan({CURRENT: shared}, Policy(keep_last=1), NOW)
+        self.assertEqual((len(result["delete"]), result["deleted_bytes"]), (2, 0))
+
+    def test_parse_size(self):
+        self.assertEqual([parse_size(s) for s in ("200M", "1.5K", "10", "2GiB")], [200 * 1024**2, 1536, 10, 2 * 1024**3])
+        with self.assertRaises(ValueError):
+            parse_size("lots")
+
+
+class CollectTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base = make_mirror(Path(self.tmp.name))
+        self.current = self.base / FIXTURE_EXPORTS[0]
+        self.archive = self.current.parent / "_archive"
+        self.archive.mkdir()
+        self.bodies = {}
+        for age in (30, 20, 10):
+            at = (datetime.now(timezone.utc) - timedelta(days=age)).strftime(TIMESTAMP_FORMAT)
+            path = self.archive / f"{self.current.stem}.{at}.txt.gz"
+            self.bodies[path.name] = f"version {age}\n".encode()
+            path.write_bytes(gzip.compress(self.bodies[path.name]))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_dry_run_then_collect(self):
+        self.assertEqual([len(v) for v in iter_archived(self.base).values()], [3])
+        dry = collect(self.base, Policy(keep_last=1), dry_run=True)
+        self.assertEqual(len(dry["delete"]), 2)
+        self.assertEqual(len(list(self.archive.iterdir())), 3)
+
+        compact = "zstd" if "zstd" in available_codecs() else "none"
+        result = collect(self.base, Policy(keep_last=1), compact=compact)
+        self.assertEqual((len(result["delete"]), result["compacted"]), (2, 1))
+        [left] = self.archive.iterdir()
+        self.assertEqual(read_version(left), b"version 10\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
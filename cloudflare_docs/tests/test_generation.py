@@ -0,0 +1,99 @@
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from llms_generation import Batch, current_generation, generation_dir, list_generations, pinned, prune
+from llms_header import read_header
+from llms_stub_server import Faults, serve
+from tests import HERE, make_mirror
+
+EXPORT = "ai_and_rag/vectorize/vectorize-llms-full.txt"
+
+
+def body(path: Path) -> bytes:
+    _, offset = read_header(path)
+    return path.read_bytes()[offset:]
+
+
+class GenerationRoundTripTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base = make_mirror(Path(self.tmp.name) / "mirror")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, text: str, keep: int = 3) -> Path:
+        batch = Batch(self.base, durable=False)
+        target = self.base / EXPORT
+        batch.stage(target).write_text(text, encoding="utf-8")
+        return batch.commit(keep)
+
+    def test_commit_publishes_a_snapshot(self):
+        snapshot = self.write("one\n")
+        self.assertEqual(current_generation(self.base), 1)
+        self.assertEqual((snapshot / EXPORT).read_text(encoding="utf-8"), "one\n")
+        self.assertEqual((self.base / EXPORT).read_text(encoding="utf-8"), "one\n")
+
+        self.write("two\n")
+        self.assertEqual(current_generation(self.base), 2)
+        # The old snapshot still holds the old content: files are replaced, never modified in place
+        self.assertEqual((generation_dir(self.base, 1) / EXPORT).read_text(encoding="utf-8"), "one\n")
+        with pinned(self.base) as path:
+            self.assertEqual((path / EXPORT).read_text(encoding="utf-8"), "two\n")
+
+    def test_abort_leaves_the_tree_untouched(self):
+        before = (self.base / EXPORT).read_bytes()
+        batch = Batch(self.base, durable=False)
+        batch.stage(self.base / EXPORT).write_text("half-written", encoding="utf-8")
+        batch.abort()
+        self.assertEqual((self.base / EXPORT).read_bytes(), before)
+        self.assertEqual(current_generation(self.base), 0)
+        self.assertEqual(list((self.base / EXPORT).parent.glob(".*")), [])
+
+    def test_prune_keeps_the_newest(self):
+        for n in range(4):
+            self.write(f"{n}\n", keep=2)
+        self.assertEqual(list_generations(self.base), [3, 4])
+        self.assertEqual(prune(self.base, 1), [3])
+        self.assertEqual(list_generations(self.base), [4])
+
+
+class DownloadRoundTripTest(unittest.TestCase):
+    """download_llms_txt.py against the stub, with every URL failing once first."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.server = serve(HERE, faults=Faults(fail_first=1))
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def download(self, base: Path, *extra: str) -> str:
+        cmd = [sys.executable, str(HERE / "download_llms_txt.py"), "--base", str(base), "--origin", self.server.origin]
+        cmd += ["--category", "ai_and_rag", *extra]
+        result = subprocess.run(cmd, cwd=HERE, capture_output=True, text=True, timeout=120)
+        self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+        return result.stdout
+
+    def test_download_commits_a_generation(self):
+        base = Path(self.tmp.name) / "mirror"
+        out = self.download(base, "--object-store")
+        self.assertIn("[retry]", out)
+        self.assertEqual(current_generation(base), 1)
+        self.assertEqual(body(base / EXPORT), body(HERE / EXPORT))
+        with pinned(base) as path:
+            self.assertTrue((path / EXPORT).exists())
+
+        # Nothing changed upstream: the second run writes nothing and commits no generation
+        out = self.download(base, "--object-store")
+        self.assertIn("wrote=0", out)
+        self.assertEqual(current_generation(base), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
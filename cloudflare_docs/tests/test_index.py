@@ -0,0 +1,50 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from llms_index import BM25Index, build_index, index_path, open_current_index
+from tests import FIXTURE_EXPORTS, make_mirror
+
+
+class IndexRoundTripTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base = make_mirror(Path(self.tmp.name))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_build_and_query(self):
+        stats = build_index(self.base)
+        self.assertGreater(stats["docs"], 0)
+        with BM25Index(index_path(self.base)) as index:
+            self.assertEqual(index.n_docs, stats["docs"])
+            hits = index.search("vector database", k=3)
+            self.assertEqual(len(hits), 3)
+            self.assertGreaterEqual(hits[0].score, hits[-1].score)
+            self.assertTrue(any("vectorize" in hit.url for hit in hits))
+            self.assertEqual(index.search("zzzunknownterm"), [])
+
+    def test_open_current_index_rebuilds_on_other_params(self):
+        build_index(self.base, categories=["ai_and_rag"], skip_near_duplicates=True)
+        path = index_path(self.base)
+        built = path.stat().st_mtime_ns
+        with open_current_index(self.base, categories=["ai_and_rag"], skip_near_duplicates=True):
+            pass
+        self.assertEqual(path.stat().st_mtime_ns, built)
+        with open_current_index(self.base) as index:
+            params = index.params_sha
+        self.assertNotEqual(path.stat().st_mtime_ns, built)
+        with open_current_index(self.base) as index:
+            self.assertEqual(index.params_sha, params)
+
+    def test_open_current_index_rebuilds_after_a_change(self):
+        with open_current_index(self.base) as index:
+            before = index.n_docs
+        (self.base / FIXTURE_EXPORTS[1]).unlink()
+        with open_current_index(self.base) as index:
+            self.assertLess(index.n_docs, before)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from download_llms_txt import current_record, rebuild_manifest
+from llms_archive import archive_existing
+from llms_header import CONTENT_SHA_KEY, read_header
+from llms_manifest import Manifest, PageRecord
+from tests import FIXTURE_EXPORTS, make_mirror
+
+
+class ManifestTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base = make_mirror(Path(self.tmp.name))
+        self.path = self.base / FIXTURE_EXPORTS[0]
+        self.manifest = Manifest(self.base)
+
+    def tearDown(self):
+        self.manifest.close()
+        self.tmp.cleanup()
+
+    def test_rebuild_backfills_files_and_archives(self):
+        fields, offset = read_header(self.path)
+        archived = archive_existing(self.path, self.path.parent / "_archive", keep_source=True)
+        self.assertEqual(rebuild_manifest(self.manifest, ["ai_and_rag", "observability"]), (2, 1))
+
+        record = self.manifest.get(self.path)
+        self.assertEqual((record.category, record.service, record.artifact), ("ai_and_rag", "vectorize", "llms-full"))
+        self.assertEqual(record.content_sha, fields[CONTENT_SHA_KEY])
+        self.assertEqual((record.body_offset, record.size), (offset, self.path.stat().st_size - offset))
+        self.assertEqual(self.manifest.by_url(fields["Source-URL"]), [record])
+        [lineage] = self.manifest.archives(self.path)
+        self.assertEqual((lineage.archived_path, lineage.content_sha), (self.manifest.relpath(archived), record.content_sha))
+
+        # Rows of files that are gone are dropped
+        self.path.unlink()
+        self.assertEqual(rebuild_manifest(self.manifest, ["ai_and_rag"]), (1, 0))
+        self.assertIsNone(self.manifest.get(self.path))
+
+    def test_edited_file_is_not_trusted(self):
+        record = current_record(self.manifest, self.path, "ai_and_rag")
+        self.assertEqual(self.manifest.current(self.path), record)
+        # Edited behind the manifest's back: the row no longer describes the file
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write("edit\n")
+        self.assertIsNone(self.manifest.current(self.path))
+        self.assertEqual(current_record(self.manifest, self.path, "ai_and_rag").size, record.size + 5)
+        # Same size, new mtime
+        os.utime(self.path, ns=(0, 0))
+        self.assertIsNone(self.manifest.current(self.path))
+
+    def test_page_index_is_replaced_per_url(self):
+        url = "https://developers.cloudflare.com/vectorize/llms-full.txt"
+        self.assertEqual((self.manifest.page_source_sha(url), self.manifest.pages(url)), ("", {}))
+        pages = [PageRecord(url, "a", 0, "1" * 64, "A"), PageRecord(url, "b", 1, "2" * 64, "B")]
+        self.manifest.replace_pages(url, "f" * 64, pages)
+        self.manifest.replace_pages(url, "e" * 64, pages[1:])
+        self.manifest.commit()
+        with Manifest(self.base) as reopened:
+            self.assertEqual(reopened.page_source_sha(url), "e" * 64)
+            self.assertEqual(list(reopened.pages(url).values()), pages[1:])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import json
+import re
+import tempfile
+import unittest
+from pathlib import Path
+
+from llms_fetch import FetchSpan
+from llms_metrics import JSON_NAME, PROM_NAME, RunMetrics, prometheus_text, write_metrics
+
+SAMPLE = re.compile(r'^llms_mirror_\w+(\{(\w+="(\\.|[^"\\])*",?)+\})? -?[0-9.e+-]+$')
+
+
+def span(url: str, total: float, nbytes: int, error: str = "") -> FetchSpan:
+    s = FetchSpan(url)
+    s.total, s.ttfb, s.body, s.bytes, s.attempts, s.status, s.error = total, total / 4, total / 2, nbytes, 1, 200, error
+    return s
+
+
+class RunMetricsTest(unittest.TestCase):
+    def setUp(self):
+        self.metrics = RunMetrics()
+        self.metrics.lap("fetch")
+        self.metrics.lap("fetch")
+        self.metrics.lap("write")
+        self.metrics.counters.update(wrote=2, skipped=1)
+        for s in (span("https://a/x.txt", 0.5, 100), span('https://b/"q".txt', 2.0, 50, "boom")):
+            self.metrics.spans[s.url] = s
+
+    def test_json_totals_and_order(self):
+        data = self.metrics.as_dict()
+        self.assertEqual(list(data["phases"]), ["fetch", "write"])
+        self.assertEqual(data["counters"], {"wrote": 2, "skipped": 1})
+        self.assertEqual((data["fetch"]["urls"], data["fetch"]["bytes"], data["fetch"]["errors"]), (2, 150, 1))
+        self.assertAlmostEqual(data["fetch"]["body"], 1.25)
+        self.assertEqual([s["url"] for s in data["spans"]], ['https://b/"q".txt', "https://a/x.txt"])
+        self.assertEqual(self.metrics.slowest(1)[0].url, 'https://b/"q".txt')
+
+    def test_prometheus_exposition(self):
+        text = prometheus_text(self.metrics.as_dict())
+        for line in text.splitlines():
+            if not line.startswith("#"):
+                self.assertRegex(line, SAMPLE)
+        self.assertIn('llms_mirror_run_counter{name="wrote"} 2', text)
+        self.assertIn('llms_mirror_url_bytes{url="https://b/\\"q\\".txt"} 50', text)
+        # Every metric is declared once, before its samples
+        types = re.findall(r"^# TYPE (\w+) gauge$", text, re.M)
+        self.assertEqual(len(types), len(set(types)))
+
+    def test_written_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = write_metrics(self.metrics, Path(tmp) / "_metrics")
+            self.assertEqual((paths["json"].name, paths["prom"].name), (JSON_NAME, PROM_NAME))
+            self.assertEqual(json.loads(paths["json"].read_text(encoding="utf-8"))["counters"]["wrote"], 2)
+            self.assertEqual(sorted(p.name for p in paths["json"].parent.iterdir()), sorted([JSON_NAME, PROM_NAME]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from llms_header import build_header, read_header
+from llms_objects import OBJECTS_DIR, link_object, store_object, sweep_objects
+from llms_stub_server import serve
+from tests import HERE
+
+# developer-platform and workers exports are mirrored into both categories
+CATEGORIES = ("core_context_pack", "meta_and_docs")
+
+
+class ObjectStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_download_dedupes_across_categories(self):
+        server = serve(HERE)
+        try:
+            cmd = [sys.executable, str(HERE / "download_llms_txt.py"), "--base", str(self.base), "--origin", server.origin]
+            cmd += ["--object-store", *[arg for c in CATEGORIES for arg in ("--category", c)]]
+            result = subprocess.run(cmd, cwd=HERE, capture_output=True, text=True, timeout=120)
+        finally:
+            server.shutdown()
+            server.server_close()
+        self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+
+        files = sorted(self.base.glob("*/*/*.txt"))
+        blobs = sorted((self.base / OBJECTS_DIR).glob("*/*.txt"))
+        urls = {read_header(p)[0]["Source-URL"] for p in files}
+        self.assertGreater(len(files), len(urls))
+        self.assertEqual(len(blobs), len(urls))
+        self.assertEqual(len({p.stat().st_ino for p in files}), len(blobs))
+        for path in files:
+            self.assertNotIn("Category", read_header(path)[0])
+
+    def test_same_body_at_another_url_is_not_shared(self):
+        body = self.base / "body"
+        body.write_text("same body\n", encoding="utf-8")
+        headers = {
+            url: build_header(url, "", "x", "llms-full", "2026-01-01T00:00:00+00:00", "ab" * 32)
+            for url in ("https://example.com/a/llms-full.txt", "https://example.com/b/llms-full.txt")
+        }
+        first, second = headers
+        path = store_object(self.base, "ab" * 32, first, headers[first], body)
+        self.assertEqual(store_object(self.base, "ab" * 32, first, headers[first], body), path)
+        self.assertIsNone(store_object(self.base, "ab" * 32, second, headers[second], body))
+
+        # Unreferenced until something links to it
+        link = self.base / "linked.txt"
+        link_object(path, link)
+        self.assertEqual(sweep_objects(self.base)["blobs"], 0)
+        link.unlink()
+        self.assertEqual(sweep_objects(self.base)["blobs"], 1)
+        self.assertFalse(path.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from llms_pack import build_pack
+from tests import write_export
+
+PLATFORM = "https://developers.cloudflare.com/developer-platform/llms-full.txt"
+KV_PAGE = ("https://developers.cloudflare.com/kv/api/", "KV namespace binding", "Bind a kv namespace, then put and get keys.")
+D1_PAGE = ("https://developers.cloudflare.com/d1/worker-api/", "D1 binding", "Like a kv namespace binding, a d1 binding can put and get rows.")
+WORKERS_PAGE = ("https://developers.cloudflare.com/workers/", "Workers", "A kv namespace binding lets a Worker put and get.")
+
+
+class PackCategoryTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base = Path(self.tmp.name)
+        write_export(self.base, "core_context_pack", PLATFORM, [WORKERS_PAGE, KV_PAGE])
+        write_export(self.base, "storage_and_databases", "https://developers.cloudflare.com/kv/llms-full.txt", [KV_PAGE])
+        write_export(self.base, "storage_and_databases", "https://developers.cloudflare.com/d1/llms-full.txt", [D1_PAGE])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def sources(self, *categories):
+        manifest = build_pack(self.base, "kv namespace binding put get", 4000, list(categories), use_cache=False)
+        return sorted(page["source_url"] for page in manifest["pages"])
+
+    def test_category_filter_checks_every_export_containing_the_page(self):
+        self.assertEqual(self.sources(), sorted(p[0] for p in (KV_PAGE, D1_PAGE, WORKERS_PAGE)))
+        self.assertEqual(self.sources("storage_and_databases"), sorted([KV_PAGE[0], D1_PAGE[0]]))
+        # The kv page is attributed to kv's own export, but developer-platform bundles it too
+        self.assertEqual(self.sources("core_context_pack"), sorted([KV_PAGE[0], WORKERS_PAGE[0]]))
+        self.assertEqual(self.sources("ai_and_rag"), [])
+
+    def test_identical_pack_is_cached(self):
+        first = build_pack(self.base, "kv namespace", 4000)
+        second = build_pack(self.base, "kv namespace", 4000)
+        self.assertFalse(first["cached"])
+        self.assertTrue(second["cached"])
+        self.assertEqual(first["pages"], second["pages"])
+
+
+if __name__ == "__main__":
+    unittest.main()
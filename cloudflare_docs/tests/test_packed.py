@@ -0,0 +1,66 @@
+import io
+import tempfile
+import unittest
+from pathlib import Path
+
+from llms_corpus import iter_corpus_pages
+from llms_packed import PackedCorpus, available_codecs, write_packed
+from llms_pages import iter_pages
+from tests import make_mirror, write_export
+
+DOCS = "https://developers.cloudflare.com"
+
+
+class PackedCorpusTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base = make_mirror(Path(self.tmp.name) / "mirror")
+        # One page shared by two exports: its block is stored once
+        shared = (f"{DOCS}/kv/", "KV", "Key-value storage.")
+        write_export(self.base, "core_context_pack", f"{DOCS}/developer-platform/llms-full.txt", [shared])
+        write_export(self.base, "storage_and_databases", f"{DOCS}/kv/llms-full.txt", [shared])
+        self.pages = list(iter_corpus_pages(self.base))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_every_codec_round_trips(self):
+        for codec in available_codecs():
+            with self.subTest(codec=codec):
+                out = Path(self.tmp.name) / f"{codec}.llmpack"
+                stats = write_packed(self.base, out, codec=codec)
+                self.assertEqual((stats["exports"], stats["pages"]), (4, len(self.pages)))
+                self.assertEqual(stats["blocks"], len(self.pages) - 1)
+                with PackedCorpus(out) as packed:
+                    self.assertEqual((len(packed), packed.codec), (len(self.pages), codec))
+                    for i, (export, page) in enumerate(self.pages):
+                        block = bytes(packed.page(i))
+                        self.assertEqual(block, export.path.read_bytes()[page.offset : page.offset + page.length])
+                        meta = packed.meta(i)
+                        self.assertEqual((meta["export"], meta["sha"], meta["title"]), (export.url, page.sha, page.title))
+                    self.assertEqual(next(iter_pages(io.BytesIO(block))).sha, page.sha)
+
+    def test_export_lookup_and_zero_copy(self):
+        out = Path(self.tmp.name) / "corpus.llmpack"
+        write_packed(self.base, out)
+        with PackedCorpus(out) as packed:
+            kv = packed.find_export("kv")
+            self.assertEqual((kv["url"], kv["count"]), (f"{DOCS}/kv/llms-full.txt", 1))
+            view = packed.export_page("kv", 0)
+            self.assertIsInstance(view, memoryview)
+            self.assertTrue(bytes(view).startswith(b"<page>"))
+            view.release()
+            with self.assertRaises(IndexError):
+                packed.export_page("kv", 1)
+            with self.assertRaises(KeyError):
+                packed.find_export("nope")
+
+    def test_rejects_other_files(self):
+        path = Path(self.tmp.name) / "not.llmpack"
+        path.write_bytes(b"x" * 100)
+        with self.assertRaises(ValueError):
+            PackedCorpus(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
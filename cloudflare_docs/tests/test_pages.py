@@ -0,0 +1,69 @@
+import hashlib
+import io
+import tempfile
+import unittest
+from pathlib import Path
+
+from llms_archive import archive_existing
+from llms_header import build_header
+from llms_pages import iter_file_pages, iter_pages, parse_frontmatter
+from tests import FIXTURE_EXPORTS, HERE
+
+PAGE = b"""<page>
+---
+title: "Bindings \\"env\\" \xc2\xb7 Workers"
+description: >-
+  Bindings let a Worker talk to
+  other resources.
+lastUpdated: 2025-06-05T13:25:05.000Z
+tags: AI, Storage
+source_url:
+  html: https://developers.cloudflare.com/workers/bindings/
+  md: https://developers.cloudflare.com/workers/bindings/index.md
+---
+
+# Bindings
+
+Text with a --- line below.
+---
+</page>
+"""
+
+
+class PageParserTest(unittest.TestCase):
+    def test_frontmatter_fields(self):
+        stream = io.BytesIO(build_header("u", "c", "s", "llms-full", "t", "x").encode("utf-8") + b"\n" + PAGE * 2)
+        first, second = iter_pages(stream)
+        self.assertEqual(first.title, 'Bindings "env" \xb7 Workers')
+        self.assertEqual(first.description, "Bindings let a Worker talk to other resources.")
+        self.assertEqual(first.last_updated, "2025-06-05T13:25:05.000Z")
+        self.assertEqual(first.tags, ["AI", "Storage"])
+        self.assertEqual(first.source_html, "https://developers.cloudflare.com/workers/bindings/")
+        self.assertEqual(first.source_md, "https://developers.cloudflare.com/workers/bindings/index.md")
+        self.assertEqual(first.body, "# Bindings\n\nText with a --- line below.\n---")
+
+        # Offsets address the exact <page> block, and sha is its hash
+        data = stream.getvalue()
+        self.assertEqual(data[second.offset : second.offset + second.length], PAGE)
+        self.assertEqual((first.index, second.index), (0, 1))
+        self.assertEqual(first.sha, hashlib.sha256(PAGE).hexdigest())
+        self.assertEqual(second.offset, first.offset + first.length)
+
+    def test_block_scalars_and_nesting(self):
+        fields = parse_frontmatter(["a: |", "  one", "  two", "b: 'it''s'", "c:", "  d: x", "e: plain"])
+        self.assertEqual(fields, {"a": "one\ntwo", "b": "it's", "c": "", "c.d": "x", "e": "plain"})
+
+    def test_page_without_frontmatter_and_truncated_export(self):
+        pages = list(iter_pages(io.BytesIO(b"<page>\nJust a body.\n</page>\n<page>\n---\ntitle: Cut\n---\n\npartial")))
+        self.assertEqual([(p.title, p.body) for p in pages], [("", "Just a body."), ("Cut", "partial")])
+
+    def test_archived_versions_parse_like_the_original(self):
+        original = HERE / FIXTURE_EXPORTS[0]
+        with tempfile.TemporaryDirectory() as tmp:
+            archived = archive_existing(original, Path(tmp), keep_source=True)
+            self.assertEqual([p.sha for p in iter_file_pages(archived)], [p.sha for p in iter_file_pages(original)])
+        self.assertGreater(len(list(iter_file_pages(original))), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import os
+import unittest
+
+from llms_changes import index_pages
+from llms_pipeline import CPU_COUNT, batched, ordered_map, workers_arg
+from tests import FIXTURE_EXPORTS, HERE
+
+
+def square_and_pid(n: int):
+    return n * n, os.getpid()
+
+
+class OrderedMapTest(unittest.TestCase):
+    def test_inline_and_pooled_results_match(self):
+        inline = list(ordered_map(square_and_pid, range(20)))
+        self.assertEqual({pid for _, pid in inline}, {os.getpid()})
+        pooled = list(ordered_map(square_and_pid, range(20), workers=2))
+        self.assertEqual([r for r, _ in pooled], [r for r, _ in inline])
+        self.assertNotIn(os.getpid(), {pid for _, pid in pooled})
+
+    def test_input_is_consumed_lazily(self):
+        consumed = []
+
+        def items():
+            for n in range(100):
+                consumed.append(n)
+                yield n
+
+        results = ordered_map(square_and_pid, items(), workers=2, max_pending=3)
+        self.assertEqual(next(results)[0], 0)
+        self.assertLessEqual(len(consumed), 4)
+        self.assertEqual([r for r, _ in results], [n * n for n in range(1, 100)])
+
+    def test_page_hashing_in_workers(self):
+        paths = [HERE / rel for rel in FIXTURE_EXPORTS]
+        self.assertEqual(list(ordered_map(index_pages, paths, workers=2)), [index_pages(p) for p in paths])
+
+    def test_batched_and_workers_arg(self):
+        self.assertEqual(list(batched(range(5), 2)), [[0, 1], [2, 3], [4]])
+        self.assertEqual(list(batched([], 2)), [])
+        self.assertEqual((workers_arg("3"), workers_arg("0")), (3, CPU_COUNT))
+        with self.assertRaises(ValueError):
+            workers_arg("-1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from llms_archive import archive_existing
+from llms_stats import build_report
+from tests import write_export
+
+DOCS = "https://developers.cloudflare.com/x/"
+URL = "https://developers.cloudflare.com/x/llms-full.txt"
+
+
+class StatsReportTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base = Path(self.tmp.name)
+        january = [(DOCS + "a/", "A", "alpha"), (DOCS + "b/", "B", "beta"), (DOCS + "c/", "C", "gamma")]
+        path = write_export(self.base, "ai_and_rag", URL, january, "2026-01-10T00:00:00+00:00")
+        archive_existing(path, path.parent / "_archive")
+        # February: a edited, c removed, d added
+        february = [(DOCS + "a/", "A", "alpha, edited"), (DOCS + "b/", "B", "beta"), (DOCS + "d/", "D", "delta")]
+        write_export(self.base, "ai_and_rag", URL, february, "2026-02-10T00:00:00+00:00")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_groups_history_and_timeline(self):
+        report = build_report(self.base)
+        self.assertEqual((report["total"]["files"], report["total"]["pages"]), (1, 3))
+        rows = {(r["category"], r["service"]): r for r in report["groups"]}
+        self.assertEqual(set(rows), {("ai_and_rag", ""), ("ai_and_rag", "x")})
+        row = rows[("ai_and_rag", "x")]
+        self.assertEqual((row["versions"], row["changes"], row["pages_per_change"]), (2, 1, 3.0))
+        self.assertEqual(row["dup_ratio"], 0.0)
+
+        months = {m["start"]: m for m in report["timeline"]}
+        self.assertEqual((months["2026-01-01"]["pages"], months["2026-01-01"]["changes"]), (3, 0))
+        self.assertEqual((months["2026-02-01"]["changes"], months["2026-02-01"]["pages_changed"]), (1, 3))
+        self.assertTrue((self.base / "_stats/report.json").exists())
+
+    def test_unchanged_files_come_from_the_cache(self):
+        self.assertEqual(build_report(self.base)["scan"]["parsed"], 2)
+        scan = build_report(self.base, bucket="week")["scan"]
+        self.assertEqual((scan["parsed"], scan["cached"], scan["versions"]), (0, 2, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+import requests
+
+from llms_header import read_header
+from llms_stub_server import Faults, serve
+from tests import FIXTURE_EXPORTS, HERE, make_mirror
+
+PATH = "/vectorize/llms-full.txt"
+
+
+class StubServerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = make_mirror(Path(self.tmp.name))
+        export = self.root / FIXTURE_EXPORTS[0]
+        _, offset = read_header(export)
+        self.body = export.read_bytes()[offset:]
+        self.session = requests.Session()
+        self.servers = []
+
+    def tearDown(self):
+        self.session.close()
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+        self.tmp.cleanup()
+
+    def stub(self, **faults):
+        server = serve(self.root, faults=Faults(**faults))
+        self.servers.append(server)
+        return server
+
+    def test_serves_bodies_at_their_source_url_path(self):
+        server = self.stub()
+        self.assertEqual(sorted(server.routes), ["/autorag/llms-full.txt", PATH])
+        resp = self.session.get(server.origin + PATH)
+        self.assertEqual((resp.status_code, resp.content), (200, self.body))
+        self.assertEqual(self.session.get(server.origin + "/missing/llms-full.txt").status_code, 404)
+        head = self.session.head(server.origin + PATH)
+        self.assertEqual((head.content, int(head.headers["Content-Length"])), (b"", len(self.body)))
+
+    def test_conditional_and_range_requests(self):
+        server = self.stub()
+        url = server.origin + PATH
+        first = self.session.get(url)
+        etag, last_modified = first.headers["ETag"], first.headers["Last-Modified"]
+        self.assertEqual(self.session.get(url, headers={"If-None-Match": etag}).status_code, 304)
+        self.assertEqual(self.session.get(url, headers={"If-Modified-Since": last_modified}).status_code, 304)
+
+        part = self.session.get(url, headers={"Range": "bytes=100-", "If-Range": etag})
+        self.assertEqual((part.status_code, part.content), (206, self.body[100:]))
+        self.assertEqual(part.headers["Content-Range"], f"bytes 100-{len(self.body) - 1}/{len(self.body)}")
+        # A stale If-Range gets the whole body
+        stale = self.session.get(url, headers={"Range": "bytes=100-", "If-Range": '"old"'})
+        self.assertEqual((stale.status_code, stale.content), (200, self.body))
+
+        # Changed on disk: reload() picks up the new validators
+        export = self.root / FIXTURE_EXPORTS[0]
+        export.write_bytes(export.read_bytes() + b"more\n")
+        server.reload()
+        self.assertEqual(self.session.get(url, headers={"If-None-Match": etag}).content, self.body + b"more\n")
+
+    def test_seeded_faults_are_reproducible(self):
+        outcomes = []
+        for _ in range(2):
+            server = self.stub(fail_rate=0.5, seed=3)
+            outcomes.append([self.session.get(server.origin + PATH).status_code for _ in range(8)])
+        self.assertEqual(outcomes[0], outcomes[1])
+        self.assertEqual(set(outcomes[0]), {200, 503})
+        self.assertEqual(self.stub(fail_first=2).stats()["requests"], 0)
+
+    def test_latency_and_bandwidth(self):
+        # Two seconds' worth of body, sent a second's worth at a time
+        server = self.stub(latency=0.2, bandwidth=len(self.body) // 2)
+        started = time.perf_counter()
+        self.assertEqual(self.session.get(server.origin + PATH).content, self.body)
+        self.assertGreater(time.perf_counter() - started, 1.1)
+        self.assertEqual(server.stats()["bytes_sent"], len(self.body))
+
+
+class BenchSmokeTest(unittest.TestCase):
+    def test_pages_benchmark_runs(self):
+        cmd = [sys.executable, str(HERE / "bench_llms.py"), "pages", "--file", str(HERE / FIXTURE_EXPORTS[0]), "--repeat", "1"]
+        result = subprocess.run(cmd, cwd=HERE, capture_output=True, text=True, timeout=120)
+        self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+        self.assertIn("MB/s", result.stdout)
+
+
+if __name__ == "__main__":
+    unittest.main()
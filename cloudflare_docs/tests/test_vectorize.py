@@ -0,0 +1,83 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from llms_chunks import build_chunks, chunks_path
+from llms_vectorize import (
+    MAX_METADATA_BYTES,
+    STATE_NAME,
+    chunk_metadata,
+    export,
+    export_root,
+    metadata_bytes,
+    verify,
+)
+from llms_vectors import build_vectors
+from tests import make_mirror
+
+
+class VectorizeRoundTripTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base = make_mirror(Path(self.tmp.name))
+        build_chunks(self.base)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_export_and_verify(self):
+        build_vectors(self.base, dim=32)
+        first = export(self.base)
+        self.assertEqual(first["unchanged"], 0)
+        self.assertGreater(first["inserts"], 0)
+        self.assertEqual(verify(self.base), first["inserts"])
+
+        # Nothing changed: nothing to write
+        self.assertEqual(export(self.base)["files"], [])
+
+        # Drop one export: its vectors are deleted
+        (self.base / "ai_and_rag/autorag/autorag-llms-full.txt").unlink()
+        build_chunks(self.base)
+        build_vectors(self.base, dim=32)
+        second = export(self.base)
+        self.assertGreater(second["deletes"], 0)
+        self.assertEqual(verify(self.base), first["inserts"] - second["deletes"])
+
+    def test_full_export_deletes_ids_that_are_gone(self):
+        build_vectors(self.base, dim=32)
+        export(self.base)
+        state_path = export_root(self.base, "cf-docs") / STATE_NAME
+        state = json.loads(state_path.read_text(encoding="utf-8"))
+        state["vectors"]["gone"] = "0" * 16
+        state_path.write_text(json.dumps(state), encoding="utf-8")
+
+        full = export(self.base, full=True)
+        self.assertTrue(full["full"])
+        self.assertEqual(full["deletes"], 1)
+        self.assertEqual(full["inserts"], len(state["vectors"]) - 1)
+        self.assertEqual(verify(self.base), full["inserts"])
+
+    def test_metadata_stays_under_the_limit(self):
+        record = {
+            "source_url": "https://developers.cloudflare.com/x/",
+            "title": "T" * 50_000,
+            "category": "ai_and_rag",
+            "service": "x",
+            "headings": ["H" * 50_000, "é" * 20_000],
+            "chunk_index": 0,
+            "page_sha": "0" * 64,
+            "text": "word " * 10_000,
+        }
+        metadata = chunk_metadata(record)
+        self.assertLessEqual(metadata_bytes(metadata), MAX_METADATA_BYTES)
+        self.assertTrue(metadata["text"])
+        self.assertLess(len(metadata["title"]), 2048)
+
+    def test_empty_corpus_exports_nothing(self):
+        chunks_path(self.base).write_text("", encoding="utf-8")
+        build_vectors(self.base)
+        self.assertEqual(export(self.base)["files"], [])
+
+if __name__ == "__main__":
+    unittest.main()
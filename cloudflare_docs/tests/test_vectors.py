@@ -0,0 +1,51 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from llms_chunks import build_chunks, chunks_path
+from llms_vectors import VectorIndex, build_vectors, vectors_dir
+from tests import make_mirror
+
+
+class VectorsRoundTripTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base = make_mirror(Path(self.tmp.name))
+        build_chunks(self.base)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_build_and_search(self):
+        stats = build_vectors(self.base, dim=32)
+        self.assertEqual(stats["dim"], 32)
+        index = VectorIndex(vectors_dir(self.base))
+        hits = index.search("vector database", k=3, nprobe=stats["nlist"])
+        self.assertEqual(len(hits), 3)
+        # Probing every list is exact
+        query = index.embed("vector database")
+        exact = [position for _, position in index.brute_force(query, 5)]
+        self.assertEqual([position for _, position in index.search_vector(query, 5, stats["nlist"])], exact)
+        # A rebuild reuses the fitted model
+        self.assertFalse(build_vectors(self.base, dim=32)["refit"])
+
+    def test_small_corpus_keeps_its_model(self):
+        # Two exports' chunks support fewer components than asked for; that alone must not force a refit
+        first = build_vectors(self.base, dim=4096)
+        self.assertLess(first["dim"], 4096)
+        projection = (vectors_dir(self.base) / "projection.npy").stat().st_ino
+        second = build_vectors(self.base, dim=4096)
+        self.assertFalse(second["refit"])
+        self.assertEqual(second["dim"], first["dim"])
+        self.assertEqual((vectors_dir(self.base) / "projection.npy").stat().st_ino, projection)
+        self.assertTrue(build_vectors(self.base, dim=32)["refit"])
+
+    def test_empty_corpus(self):
+        chunks_path(self.base).write_text("", encoding="utf-8")
+        stats = build_vectors(self.base)
+        self.assertEqual((stats["chunks"], stats["nlist"]), (0, 0))
+        self.assertEqual(VectorIndex(vectors_dir(self.base)).search("anything"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
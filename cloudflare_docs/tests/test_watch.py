@@ -0,0 +1,65 @@
+import random
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from llms_watch import RETRY_DELAY, Schedule, parse_intervals, retry_delay, watch_loop
+
+
+class ScheduleTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "_watch.json"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_parse_intervals(self):
+        self.assertEqual(parse_intervals(["a=900", "b=1.5"]), {"a": 900.0, "b": 1.5})
+        for bad in ("a", "=5", "a=0", "a=x"):
+            with self.assertRaises(ValueError):
+                parse_intervals([bad])
+
+    def test_jittered_schedule_persists(self):
+        schedule = Schedule(self.path, interval=1000, intervals={"b": 100}, jitter=0.1, rng=random.Random(0))
+        self.assertEqual(schedule.due(["a", "b"], now=0), ["a", "b"])
+        schedule.done(["a", "b"], started=0, seconds=5, ok=True)
+        self.assertTrue(900 <= schedule.next_run["a"] <= 1100)
+        self.assertTrue(90 <= schedule.next_run["b"] <= 110)
+        self.assertEqual(schedule.due(["a", "b"], now=500), ["b"])
+
+        reloaded = Schedule(self.path)
+        self.assertEqual(reloaded.next_run, schedule.next_run)
+        self.assertEqual(reloaded.categories(), ["a", "b"])
+        self.assertTrue(reloaded.last_run["a"]["ok"])
+
+    def test_failures_back_off_up_to_the_interval(self):
+        self.assertEqual([retry_delay(n, 1000) for n in (1, 2, 3)], [RETRY_DELAY, 2 * RETRY_DELAY, 4 * RETRY_DELAY])
+        self.assertEqual(retry_delay(10, 1000), 1000)
+        schedule = Schedule(self.path, interval=1000, jitter=0.0)
+        for failures in (1, 2):
+            schedule.done(["a"], started=0, seconds=5, ok=False)
+            self.assertEqual(schedule.next_run["a"], 5 + retry_delay(failures, 1000))
+            self.assertEqual(schedule.last_run["a"]["failures"], failures)
+        schedule.done(["a"], started=0, seconds=5, ok=True)
+        self.assertEqual((schedule.next_run["a"], schedule.last_run["a"]["failures"]), (1000, 0))
+
+    def test_loop_refreshes_categories_as_they_come_due(self):
+        schedule = Schedule(self.path, interval=60, intervals={"fast": 0.05}, jitter=0.0)
+        stop = threading.Event()
+        calls = []
+
+        def refresh(due):
+            calls.append(due)
+            if len(calls) == 3:
+                stop.set()
+            return due or ["fast", "slow"]
+
+        self.assertEqual(watch_loop(refresh, schedule, None, stop), 3)
+        # Everything first (categories learned from the refresh), then only the fast category
+        self.assertEqual(calls, [None, ["fast"], ["fast"]])
+
+
+if __name__ == "__main__":
+    unittest.main()